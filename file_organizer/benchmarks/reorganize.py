@@ -0,0 +1,190 @@
+"""
+End to end reorganize_directory on synthetic trees of 10^2 to 10^6 files on tmpfs,
+in each mode:
+    - serial: source and target on the same device, files renamed one at a time
+    - parallel: same as serial, with --jobs threads moving the files
+    - copy: every file copied and deleted, as across devices (FileMover.same_device forced)
+
+The OS calls made per file are counted with an audit hook (sys.addaudithook), installed
+on the first count_os_calls(): open, rename, mkdir, scandir, remove... are audited, stat
+calls are not, so these are "audited OS calls", not every system call.
+
+Usage (from the file_organizer directory):
+    $ python benchmarks/reorganize.py --files 100 10000 1000000 --depth 1 4 --output results.json
+"""
+import json
+import os
+import sys
+from argparse import ArgumentParser
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from os.path import dirname, join
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional
+
+sys.path.insert(0, dirname(dirname(os.path.abspath(__file__))))
+
+from file_organizer import (  # noqa: E402
+    DirectoryConfigurationStream,
+    DirectoryFormatConfig,
+    FileMover,
+    reorganize_directory,
+)
+
+# tmpfs, so that the benchmark measures file_organizer and not the disk
+TMPFS = "/dev/shm"
+MODES = ("serial", "parallel", "copy")
+
+# audit events counted while a reorganization runs, see count_os_calls
+_os_calls: Optional[Counter] = None
+# audit hooks can't be removed, so the hook is installed once, when first needed
+_audit_hook_installed = False
+
+
+def _audit(event: str, args: tuple) -> None:
+    if _os_calls is not None and (event == "open" or event.startswith(("os.", "shutil."))):
+        _os_calls[event] += 1
+
+
+@contextmanager
+def count_os_calls() -> Iterator[Counter]:
+    """Count the audit events of the OS calls made inside the block, by event"""
+    global _os_calls, _audit_hook_installed
+    if not _audit_hook_installed:
+        sys.addaudithook(_audit)
+        _audit_hook_installed = True
+    _os_calls = Counter()
+    try:
+        yield _os_calls
+    finally:
+        _os_calls = None
+
+
+@contextmanager
+def forced_copy() -> Iterator[None]:
+    """Make every FileMover created inside the block copy the files, as across devices"""
+    original_init = FileMover.__init__
+
+    def init(self: FileMover, root_directory: str, target_dir: str) -> None:
+        original_init(self, root_directory, target_dir)
+        self.same_device = False
+
+    FileMover.__init__ = init
+    try:
+        yield
+    finally:
+        FileMover.__init__ = original_init
+
+
+def generate_configuration(files: int, depth: int, fanout: int = 10) -> DirectoryFormatConfig:
+    """Configuration spreading file0.txt ... file{files - 1}.txt over the directories
+    of a tree depth levels deep (each directory with fanout subdirectories)"""
+    configuration: DirectoryFormatConfig = {"root": {}}
+    leaves = [configuration["root"]]
+    for _ in range(depth - 1):
+        leaves = [leaf.setdefault(f"dir{index}", {}) for leaf in leaves for index in range(fanout)]
+    for leaf in leaves:
+        leaf["content"] = []
+    for index in range(files):
+        leaves[index % len(leaves)]["content"].append(f"file{index}.txt")
+    return configuration
+
+
+def generate_files(root: str, files: int, size: int = 0) -> None:
+    content = b"x" * size
+    for index in range(files):
+        with open(join(root, f"file{index}.txt"), "wb") as file:
+            file.write(content)
+
+
+def run_benchmark(
+    files: int,
+    depth: int,
+    mode: str,
+    jobs: int = 8,
+    size: int = 0,
+    directory: Optional[str] = None,
+) -> Dict:
+    """Reorganize files files of size bytes into a configuration depth levels deep in
+    mode (see MODES), inside a temporary directory created in directory (tmpfs if available).
+    Generating the tree and the configuration is not timed, loading the configuration is
+
+    Returns:
+        Dict: parameters, seconds, files/s, audited OS calls per file and files moved by each
+        strategy
+    """
+    if directory is None and os.path.isdir(TMPFS):
+        directory = TMPFS
+    with TemporaryDirectory(dir=directory) as root:
+        source, target = join(root, "source"), join(root, "target")
+        os.makedirs(source)
+        os.makedirs(target)
+        generate_files(source, files, size)
+        config_path = join(root, "config.json")
+        with open(config_path, "w", encoding="utf-8") as config_file:
+            json.dump(generate_configuration(files, depth), config_file)
+
+        with count_os_calls() as os_calls, forced_copy() if mode == "copy" else nullcontext():
+            start = perf_counter()
+            statistics = reorganize_directory(
+                source,
+                target,
+                DirectoryConfigurationStream(config_path),
+                False,
+                jobs if mode == "parallel" else 1,
+            )
+            seconds = perf_counter() - start
+        moved = sum(strategy.files for strategy in statistics.values())
+        if moved != files:
+            raise RuntimeError(f"{mode}: moved {moved} files of {files}")
+    return {
+        "files": files,
+        "depth": depth,
+        "mode": mode,
+        "jobs": jobs if mode == "parallel" else 1,
+        "size": size,
+        "seconds": round(seconds, 6),
+        "files_per_second": round(files / seconds, 1),
+        "audited_os_calls_per_file": round(sum(os_calls.values()) / files, 2),
+        "audited_os_calls": dict(os_calls.most_common()),
+        "strategies": {name: strategy.files for name, strategy in statistics.items()},
+    }
+
+
+def run_suite(
+    files: List[int],
+    depths: List[int],
+    modes: List[str],
+    jobs: int = 8,
+    size: int = 0,
+    directory: Optional[str] = None,
+) -> List[Dict]:
+    return [
+        run_benchmark(number_of_files, depth, mode, jobs, size, directory)
+        for number_of_files in files
+        for depth in depths
+        for mode in modes
+    ]
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--depth", type=int, nargs="+", default=[1, 3])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--size", type=int, default=0, help="bytes of each file")
+    parser.add_argument(
+        "--directory", help=f"where the trees are generated, defaults to {TMPFS} if available"
+    )
+    parser.add_argument("--output", help="write the results here instead of stdout")
+    args = parser.parse_args()
+
+    results = run_suite(args.files, args.depth, args.modes, args.jobs, args.size, args.directory)
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=4)
+        print()
+    else:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=4)
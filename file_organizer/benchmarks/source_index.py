@@ -0,0 +1,94 @@
+"""
+Lookup of files in a nested source tree: SourceIndex (lazy, os.scandir) against
+a full name -> path index built with os.walk.
+
+Usage (from the file_organizer directory):
+    $ python benchmarks/source_index.py --files 100000 --depth 3
+"""
+import os
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from os.path import dirname, join
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, dirname(dirname(os.path.abspath(__file__))))
+
+from file_organizer import SourceIndex  # noqa: E402
+
+# tmpfs, so that the benchmark measures the walk and not the disk
+TMPFS = "/dev/shm"
+
+
+def generate_tree(root: str, files: int, depth: int, fanout: int = 10) -> List[str]:
+    """Create files empty files in a tree of directories depth levels deep,
+    return the names of the files in creation order"""
+    directories = [""]
+    for _ in range(depth):
+        directories = [
+            join(directory, f"dir{index}") for directory in directories for index in range(fanout)
+        ]
+    names = []
+    for index in range(files):
+        directory = join(root, directories[index % len(directories)])
+        os.makedirs(directory, exist_ok=True)
+        name = f"file{index}.txt"
+        open(join(directory, name), "w").close()
+        names.append(name)
+    return names
+
+
+def walk_index(root: str, wanted: List[str]) -> Dict[str, str]:
+    """naive: index every file of the tree, then look up the wanted ones"""
+    paths = {}
+    for directory, _, files in os.walk(root):
+        for name in files:
+            paths.setdefault(name, join(directory, name))
+    return {name: paths[name] for name in wanted if name in paths}
+
+
+def source_index(root: str, wanted: List[str]) -> Dict[str, str]:
+    with os.scandir(root) as entries:
+        directories = [entry.name for entry in entries if entry.is_dir()]
+    index = SourceIndex(root, directories, wanted)
+    return {name: index.get(name) for name in wanted if index.get(name) is not None}
+
+
+def measure(function: Callable, root: str, wanted: List[str]) -> Tuple[float, int]:
+    """seconds taken and peak of memory allocated by function(root, wanted),
+    measured in two runs since tracing the allocations slows down the walk"""
+    start = perf_counter()
+    function(root, wanted)
+    seconds = perf_counter() - start
+    tracemalloc.start()
+    function(root, wanted)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--lookups", type=int, default=100)
+    args = parser.parse_args()
+
+    with TemporaryDirectory(dir=TMPFS if os.path.isdir(TMPFS) else None) as root:
+        names = generate_tree(root, args.files, args.depth)
+        cases = {
+            "first files": names[: args.lookups],
+            # the last files created are in the last directories walked
+            "last files": names[-args.lookups :],
+        }
+        for case, wanted in cases.items():
+            for label, function in (("os.walk", walk_index), ("SourceIndex", source_index)):
+                seconds, peak = measure(function, root, wanted)
+                print(f"{case:<12} {label:<12} {seconds:8.3f} s {peak / 2**20:8.1f} MiB peak")
+    # --files 100000 --depth 3
+    # first files  os.walk         0.243 s     18.9 MiB peak
+    # first files  SourceIndex     0.027 s      0.1 MiB peak
+    # last files   os.walk         0.273 s     18.9 MiB peak
+    # last files   SourceIndex     0.271 s      0.1 MiB peak
@@ -61,14 +61,36 @@ Cli:
     $ python.exe file_organizer.py -h
 
 """
+import ctypes
+import errno
+import os
+import re
+import select
+import signal
+import stat
+import struct
 import warnings
 from argparse import ArgumentParser, Namespace
-from json import JSONDecodeError, load
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from ctypes.util import find_library
+from fnmatch import translate
+from hashlib import blake2b
+from itertools import chain
+from json import JSONDecodeError, dump, dumps, load, loads
+from json.decoder import scanstring
 from os import getcwd, makedirs
 from os.path import basename, exists, join, splitext
-from shutil import move, rmtree
+from shutil import copyfileobj, copystat, move, rmtree
 from sys import argv
-from typing import Dict, List, Union, Callable
+from threading import Event, Lock
+from time import monotonic, perf_counter, sleep
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union, Callable
+
+try:
+    from fcntl import ioctl
+except ImportError:  # not available on Windows, reflinks are never made
+    ioctl = None
 
 
 class FileExtensionError(OSError):
@@ -79,6 +101,10 @@ class JsonContentError(RuntimeError):
     pass
 
 
+class ConfigSchemaError(JsonContentError):
+    """The configuration is a JSON but not a DirectoryFormatConfig"""
+
+
 YELLOW: str = "\033[2;33m"
 RED: str = "\033[2;31m"
 RESET: str = "\033[0m\n"
@@ -96,10 +122,178 @@ warnings.formatwarning = custom_warning_formatter
 
 FilesToMove = List[str]
 DirectoryFormatConfig = Dict[str, Union[FilesToMove, "DirectoryFormatConfig"]]
+MoveFunction = Callable[[str, str], object]
+
+# bytes copied by each copy_file_range/sendfile call
+COPY_CHUNK_SIZE: int = 64 * 1024 * 1024
+# errors of copy_file_range/sendfile meaning the call is not supported for these files
+_UNSUPPORTED_COPY_ERRNOS = frozenset(
+    code
+    for code in (
+        errno.EXDEV,
+        errno.ENOSYS,
+        errno.EINVAL,
+        errno.EBADF,
+        getattr(errno, "EOPNOTSUPP", None),
+        getattr(errno, "ENOTSUP", None),
+    )
+    if code is not None
+)
+
+
+class SizeMismatchError(OSError):
+    pass
+
+
+def _copy_with(copy_range: Callable[[int, int, int, int], int], fsrc: int, fdst: int) -> int:
+    copied = 0
+    while True:
+        sent = copy_range(fsrc, fdst, COPY_CHUNK_SIZE, copied)
+        if sent == 0:
+            return copied
+        copied += sent
+
+
+def _copy_file_range(fsrc: int, fdst: int, count: int, offset: int) -> int:
+    return os.copy_file_range(fsrc, fdst, count)
+
+
+def _sendfile(fsrc: int, fdst: int, count: int, offset: int) -> int:
+    return os.sendfile(fdst, fsrc, offset, count)
+
+
+def copy_file(source: str, destination: str) -> int:
+    """Copy content and metadata of source to destination, the content is copied
+    in the kernel by os.copy_file_range, or os.sendfile where not supported,
+    falling back to a read/write loop with COPY_CHUNK_SIZE buffers
+
+    Args:
+        source (str): path of the file to be copied
+        destination (str): path of the copy
+
+    Raises:
+        SizeMismatchError: if the size of the copy differs from the size of source,
+            the copy is removed
+
+    Returns:
+        int: bytes copied
+    """
+    with open(source, "rb") as fsrc, open(destination, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        copied = None
+        for copy_range, available in (
+            (_copy_file_range, hasattr(os, "copy_file_range")),
+            (_sendfile, hasattr(os, "sendfile")),
+        ):
+            if not available:
+                continue
+            try:
+                copied = _copy_with(copy_range, fsrc.fileno(), fdst.fileno())
+                break
+            except OSError as err:
+                # nothing has been written if the first call fails
+                if err.errno not in _UNSUPPORTED_COPY_ERRNOS or os.fstat(fdst.fileno()).st_size:
+                    raise
+        if copied is None:
+            copyfileobj(fsrc, fdst, COPY_CHUNK_SIZE)
+        fdst.flush()
+        copied_size = os.fstat(fdst.fileno()).st_size
+    if copied_size != size:
+        os.unlink(destination)
+        raise SizeMismatchError(
+            f"copied {copied_size} bytes of {size} from {source} to {destination}"
+        )
+    copystat(source, destination)
+    return size
+
+
+class MoveStatistics:
+    """Files moved by a strategy and time spent, updated by concurrent moves"""
+
+    def __init__(self, strategy: str) -> None:
+        self.strategy = strategy
+        self.files = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self._lock = Lock()
+
+    def record(self, size: int, seconds: float) -> None:
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+            self.seconds += seconds
+
+    def __str__(self) -> str:
+        seconds = self.seconds or float("inf")
+        report = (
+            f"{self.strategy}: {self.files} files in {self.seconds:.3f}s "
+            f"({self.files / seconds:.0f} files/s"
+        )
+        if self.bytes:
+            report += f", {self.bytes / 2**20 / seconds:.1f} MiB/s"
+        return report + ")"
+
+
+class FileMover:
+    """Move files from root_directory to target_dir, the strategy is chosen comparing
+    the devices of the two directories once:\n
+        - "rename": same device, each move is a single os.replace\n
+        - "copy": different devices, copy_file then unlink the source\n
+        - "shutil": directories and links across devices, shutil.move\n
+    A file on a different device than its directory (mount points) falls back from
+    rename to copy. Time spent by each strategy is recorded in statistics.
+    """
+
+    def __init__(self, root_directory: str, target_dir: str) -> None:
+        self.same_device = os.stat(root_directory).st_dev == os.stat(target_dir).st_dev
+        self.statistics: Dict[str, MoveStatistics] = {
+            strategy: MoveStatistics(strategy) for strategy in ("rename", "copy", "shutil")
+        }
+
+    def move(self, source: str, destination: str) -> None:
+        start = perf_counter()
+        if self.same_device:
+            try:
+                os.replace(source, destination)
+            except OSError as err:
+                if err.errno != errno.EXDEV:
+                    raise
+            else:
+                self.statistics["rename"].record(0, perf_counter() - start)
+                return
+        if stat.S_ISREG(os.lstat(source).st_mode):
+            size = copy_file(source, destination)
+            os.unlink(source)
+            self.statistics["copy"].record(size, perf_counter() - start)
+        else:
+            move(source, destination)
+            self.statistics["shutil"].record(0, perf_counter() - start)
+
+
+def move_file(source: str, destination: str, move_function: MoveFunction = move) -> Optional[str]:
+    """Move source to destination
+
+    Args:
+        source (str): path of the file to be moved
+        destination (str): path where the file will be moved
+        move_function (MoveFunction, optional): function moving the file. Defaults to shutil.move
+
+    Returns:
+        Optional[str]: warning message if source wasn't found, else None
+    """
+    try:
+        move_function(source, destination)
+    except FileNotFoundError:
+        return f"tried to move file {source} but wasn't found, skipping."
+    return None
 
 
 def move_files(
-    root_directory: str, target_dir: str, relative_destination_path: str, files_to_move: list[str]
+    root_directory: str,
+    target_dir: str,
+    relative_destination_path: str,
+    files_to_move: list[str],
+    move_function: MoveFunction = move,
 ) -> None:
     """Move files in files_to_move into the directory root_path/relative_destination_path
 
@@ -108,73 +302,1035 @@ def move_files(
         target_directory (str): directory where all files will be moved and reogranized
         relative_destination_path (str): destination directory where to copy all the files
         files_to_move (list[str]): files to be moved
+        move_function (MoveFunction, optional): function moving each file. Defaults to shutil.move
     """
     makedirs(join(target_dir, relative_destination_path), exist_ok=True)
     for file in files_to_move:
+        warning = move_file(
+            join(root_directory, file),
+            join(target_dir, relative_destination_path, file),
+            move_function,
+        )
+        if warning is not None:
+            warnings.warn(warning)
+
+
+def iterate_directory_configuration(
+    relative_destination_path: str, json_slice: dict
+) -> Iterator[Tuple[str, FilesToMove]]:
+    """Iterate the directories of a configuration slice in the same order (depth-first)
+    reorganize_directory_recursively visits them, without recursion
+
+    Args:
+        relative_destination_path (str): position in fs of json_slice relative to target_dir
+        json_slice (dict): slice of interest contained in configuration file
+
+    Yields:
+        Iterator[Tuple[str, FilesToMove]]: relative path of each directory and files to move in it
+    """
+    stack = [(relative_destination_path, json_slice)]
+    while stack:
+        relative_path, current_slice = stack.pop()
+        yield relative_path, current_slice.get("content", [])
+        subdirectories = [
+            (join(relative_path, dir_name), dir_content)
+            for dir_name, dir_content in current_slice.items()
+            if dir_name != "content"
+        ]
+        stack.extend(reversed(subdirectories))
+
+
+def run_moves(
+    moves: List[Tuple[str, str]], jobs: int = 1, move_function: MoveFunction = move
+) -> None:
+    """Move each source to its destination, with a pool of jobs threads if jobs > 1.
+
+    Warnings are emitted in the same order of a serial execution, once the moves are done
+    if they run in parallel; the first error (in the same order) is raised after cancelling
+    the moves not yet started
+
+    Args:
+        moves (List[Tuple[str, str]]): source and destination path of each file
+        jobs (int, optional): number of files moved concurrently. Defaults to 1
+        move_function (MoveFunction, optional): function moving each file. Defaults to shutil.move
+    """
+    if jobs <= 1:
+        for source, destination in moves:
+            warning = move_file(source, destination, move_function)
+            if warning is not None:
+                warnings.warn(warning)
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures: List[Future] = [
+            executor.submit(move_file, source, destination, move_function)
+            for source, destination in moves
+        ]
         try:
-            move(join(root_directory, file), join(target_dir, relative_destination_path, file))
-        except FileNotFoundError:
-            warnings.warn(
-                f"tried to move file {join(root_directory, file)} but wasn't found, skipping."
-            )
+            warning_messages = [future.result() for future in futures]
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+    for warning in warning_messages:
+        if warning is not None:
+            warnings.warn(warning)
+
+
+def move_files_in_parallel(
+    root_directory: str,
+    target_dir: str,
+    directories: List[Tuple[str, FilesToMove]],
+    jobs: int,
+    move_function: MoveFunction = move,
+) -> None:
+    """Create all the directories, then move their files with a pool of jobs threads (see run_moves)
+
+    Args:
+        root_directory (str): directory where all files are stored
+        target_dir (str): directory where all files will be moved and reogranized
+        directories (List[Tuple[str, FilesToMove]]): relative path of each destination directory
+            and files to be moved in it
+        jobs (int): number of files moved concurrently
+        move_function (MoveFunction, optional): function moving each file. Defaults to shutil.move
+    """
+    for relative_destination_path, _ in directories:
+        makedirs(join(target_dir, relative_destination_path), exist_ok=True)
+    run_moves(
+        [
+            (join(root_directory, file), join(target_dir, relative_destination_path, file))
+            for relative_destination_path, files_to_move in directories
+            for file in files_to_move
+        ],
+        jobs,
+        move_function,
+    )
 
 
 def reorganize_directory_recursively(
-    root_directory: str, target_dir: str, relative_destination_path: str, json_slice: dict
+    root_directory: str,
+    target_dir: str,
+    relative_destination_path: str,
+    json_slice: dict,
+    move_function: MoveFunction = move,
 ) -> None:
-    """Move all files to be moved to current directory (if any), then recurse the operation to all subdirectories
+    """Move all files to be moved to current directory (if any), then do the same for all
+    subdirectories, depth-first (see iterate_directory_configuration)
 
     Args:
         root_directory (str): directory where all files are stored
         target_directory (str): directory where all files will be moved and reogranized
         relative_destination_path (str): current position in fs relative to root_directory
         json_slice (dict): slice of interest contained in configuration file
+        move_function (MoveFunction, optional): function moving each file. Defaults to shutil.move
+    """
+    for relative_path, files_to_move in iterate_directory_configuration(
+        relative_destination_path, json_slice
+    ):
+        move_files(root_directory, target_dir, relative_path, files_to_move, move_function)
+
+
+class PlanValidationError(RuntimeError):
+    pass
+
+
+REGEX_PREFIX: str = "re:"
+_GLOB_CHARACTERS = frozenset("*?[")
+
+
+def is_pattern(content_entry: str) -> bool:
+    """True if an entry of a content list is a glob or a regex (REGEX_PREFIX) pattern"""
+    return content_entry.startswith(REGEX_PREFIX) or not _GLOB_CHARACTERS.isdisjoint(content_entry)
+
+
+class ContentMatcher:
+    """Patterns of the content lists compiled in a single regular expression,
+    each pattern is an alternative in its own named group:\n
+        - glob patterns, "*.log" (fnmatch syntax)\n
+        - regex patterns, "re:^build_\\d+\\.tar$", matching the whole file name\n
+    A file name is matched once against all the patterns, the first matching one wins.
+    If a regex pattern has groups or global inline flags ("(?i)"), which don't survive being
+    an alternative, the patterns are matched one after the other instead.
+    """
+
+    def __init__(self, patterns: List[str]) -> None:
+        """
+        Raises:
+            JsonContentError: if a regex pattern is not valid
+        """
+        self.patterns = patterns
+        self._regexes: List[re.Pattern] = []
+        for pattern in patterns:
+            if pattern.startswith(REGEX_PREFIX):
+                try:
+                    self._regexes.append(re.compile(pattern[len(REGEX_PREFIX) :]))
+                except re.error as err:
+                    raise JsonContentError(
+                        f"content pattern {pattern} is not valid: {err}"
+                    ) from err
+            else:
+                self._regexes.append(re.compile(translate(pattern)))
+        self._regex: Optional[re.Pattern] = None
+        # group numbers and names would be shifted or repeated in the alternatives
+        if all(regex.groups == 0 for regex in self._regexes):
+            alternatives = [
+                f"(?P<_pattern{index}>{regex.pattern})\\Z"
+                for index, regex in enumerate(self._regexes)
+            ]
+            try:
+                self._regex = re.compile("|".join(alternatives))
+            except re.error:
+                # global inline flags are only allowed at the start of the expression
+                pass
+
+    def match(self, file_name: str) -> Optional[int]:
+        """Index in patterns of the first pattern matching file_name, None if none matches"""
+        if self._regex is None:
+            for index, regex in enumerate(self._regexes):
+                if regex.fullmatch(file_name) is not None:
+                    return index
+            return None
+        match = self._regex.match(file_name)
+        if match is None:
+            return None
+        return int(match.lastgroup[len("_pattern") :])
+
+
+class MovePlan:
+    """Everything reorganize_directory does, computed before touching any file:\n
+        - clean_directories: directories (relative to target_dir) deleted first\n
+        - directories: directories (relative to target_dir) created before moving the files\n
+        - moves: (file, directory relative to target_dir) of each file to be moved\n
+        - missing: files of the configuration not found in root_directory\n
+        - duplicates: (file, directory) of files listed more than once, only the first
+          destination of a file is kept in moves\n
+        - unmatched_patterns: patterns of the configuration not matching any file\n
+        - sources: file -> path relative to root_directory of the files found in its
+          subdirectories (see plan_reorganization recursive)\n
+    A plan can be printed (dry run), saved as JSON and loaded to be executed later.
     """
-    files_to_move: list[str] = []
+
+    def __init__(
+        self,
+        root_directory: str,
+        target_dir: str,
+        clean_directories: List[str],
+        directories: List[str],
+        moves: List[Tuple[str, str]],
+        missing: List[str],
+        duplicates: List[Tuple[str, str]],
+        unmatched_patterns: Optional[List[str]] = None,
+        sources: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.root_directory = root_directory
+        self.target_dir = target_dir
+        self.clean_directories = clean_directories
+        self.directories = directories
+        self.moves = moves
+        self.missing = missing
+        self.duplicates = duplicates
+        self.unmatched_patterns = unmatched_patterns or []
+        self.sources = sources or {}
+
+    def to_dict(self) -> dict:
+        return {
+            "root_directory": self.root_directory,
+            "target_dir": self.target_dir,
+            "clean_directories": self.clean_directories,
+            "directories": self.directories,
+            "moves": [list(file_move) for file_move in self.moves],
+            "missing": self.missing,
+            "duplicates": [list(duplicate) for duplicate in self.duplicates],
+            "unmatched_patterns": self.unmatched_patterns,
+            "sources": self.sources,
+        }
+
+    @classmethod
+    def from_dict(cls, plan: dict) -> "MovePlan":
+        """
+        Raises:
+            JsonContentError: if a field is missing or has a wrong type
+        """
+        try:
+            return cls(
+                str(plan["root_directory"]),
+                str(plan["target_dir"]),
+                [str(directory) for directory in plan["clean_directories"]],
+                [str(directory) for directory in plan["directories"]],
+                [(str(file), str(directory)) for file, directory in plan["moves"]],
+                [str(file) for file in plan["missing"]],
+                [(str(file), str(directory)) for file, directory in plan["duplicates"]],
+                [str(pattern) for pattern in plan.get("unmatched_patterns", [])],
+                {str(file): str(source) for file, source in plan.get("sources", {}).items()},
+            )
+        except (AttributeError, KeyError, TypeError, ValueError) as err:
+            raise JsonContentError(f"move plan is not valid: {err!r}") from err
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as plan_file:
+            dump(self.to_dict(), plan_file, indent=4)
+
+    @classmethod
+    def load(cls, path: str) -> "MovePlan":
+        """
+        Raises:
+            FileNotFoundError: if path doesn't exist
+            JsonContentError: if path is not a JSON move plan
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as plan_file:
+                plan = load(plan_file)
+        except JSONDecodeError as err:
+            raise JsonContentError(f"move plan {path} content is not a JSON") from err
+        return cls.from_dict(plan)
+
+    def file_moves(self) -> List[Tuple[str, str]]:
+        """source and destination path of each file to be moved"""
+        return [
+            (
+                join(self.root_directory, self.sources.get(file, file)),
+                join(self.target_dir, directory, file),
+            )
+            for file, directory in self.moves
+        ]
+
+    def __str__(self) -> str:
+        lines = [
+            f"delete {join(self.target_dir, directory)}" for directory in self.clean_directories
+        ]
+        lines += [f"create {join(self.target_dir, directory)}" for directory in self.directories]
+        lines += [f"move {source} -> {destination}" for source, destination in self.file_moves()]
+        lines += [f"missing {join(self.root_directory, file)}" for file in self.missing]
+        lines += [
+            f"duplicate {join(self.root_directory, file)} -> {join(self.target_dir, directory)}"
+            for file, directory in self.duplicates
+        ]
+        lines += [f"unmatched {pattern}" for pattern in self.unmatched_patterns]
+        return "\n".join(lines)
+
+
+def _check_directories_exist(root_directory: str, target_dir: str) -> None:
+    if not exists(root_directory):
+        raise FileNotFoundError(f"specified root_directory doesn't exist: {root_directory}")
+    if not exists(target_dir):
+        raise FileNotFoundError(f"specified target_dir doesn't exist: {target_dir}")
+
+
+def walk_files(
+    root_directory: str, directories: Iterable[str], excluded: Iterable[str] = ()
+) -> Iterator[Tuple[str, str]]:
+    """Breadth first walk of directories (relative to root_directory) and of their
+    subdirectories, with one os.scandir per directory and without following symlinks.
+    Only the directories still to be listed are kept in memory, not the files listed
+
+    Args:
+        root_directory (str): directory containing directories
+        directories (Iterable[str]): directories to be walked, relative to root_directory
+        excluded (Iterable[str], optional): directories not walked, relative to root_directory
+
+    Yields:
+        Iterator[Tuple[str, str]]: name and path relative to root_directory of each file,
+            the files of a directory in name order
+    """
+    excluded = set(excluded)
+    pending = deque(sorted(directories))
+    while pending:
+        directory = pending.popleft()
+        if directory in excluded:
+            continue
+        try:
+            with os.scandir(join(root_directory, directory)) as entries:
+                listing = sorted(
+                    (entry.name, entry.is_dir(follow_symlinks=False)) for entry in entries
+                )
+        except OSError as err:
+            warnings.warn(f"can't list directory {join(root_directory, directory)}: {err}")
+            continue
+        for name, is_dir in listing:
+            if is_dir:
+                pending.append(join(directory, name))
+            else:
+                yield name, join(directory, name)
+
+
+class SourceIndex:
+    """Lazy index name -> path relative to root_directory of the wanted files below the
+    subdirectories of root_directory, see walk_files.\n
+    The walk is advanced only until the file looked up is found, and only the wanted names
+    are indexed, so the memory used doesn't grow with the number of files in the tree.
+    If a name is found more than once the first file walked is kept: the one closest to
+    root_directory, then the one in the first directory in name order.
+    """
+
+    def __init__(
+        self,
+        root_directory: str,
+        directories: Iterable[str],
+        wanted: Iterable[str],
+        excluded: Iterable[str] = (),
+    ) -> None:
+        self.paths: Dict[str, str] = {}
+        self._wanted = set(wanted)
+        self._files = walk_files(root_directory, directories, excluded)
+
+    def files(self) -> Iterator[Tuple[str, str]]:
+        """Continue the walk, yielding name and relative path of the files not walked yet"""
+        for name, path in self._files:
+            if name in self._wanted and name not in self.paths:
+                self.paths[name] = path
+            yield name, path
+
+    def get(self, name: str) -> Optional[str]:
+        """Path relative to root_directory of the wanted file name, None if not found"""
+        if name in self.paths or name not in self._wanted:
+            return self.paths.get(name)
+        for file, _ in self.files():
+            if file == name:
+                return self.paths[name]
+        return None
+
+
+def _directories_below(
+    root_directory: str, target_dir: str, root_directories: List[str]
+) -> Set[str]:
+    """Root directories (relative to target_dir) created below root_directory,
+    relative to root_directory"""
+    real_root = os.path.realpath(root_directory)
+    directories = set()
+    for root_key in root_directories:
+        directory = os.path.relpath(os.path.realpath(join(target_dir, root_key)), real_root)
+        if directory != os.pardir and not directory.startswith(os.pardir + os.sep):
+            directories.add(directory)
+    return directories
+
+
+def _configuration_directories(
+    directory_configuration: Union[DirectoryFormatConfig, "DirectoryConfigurationStream"],
+) -> Iterator[Tuple[str, FilesToMove]]:
+    """(relative path, files to move) of each directory of a configuration, validated
+    up front if it's a dict, while it's read if it's a stream"""
+    if not isinstance(directory_configuration, dict):
+        return iter(directory_configuration)
+    validate_directory_configuration(directory_configuration)
+    return (
+        configuration_directory
+        for root_key, json_slice in directory_configuration.items()
+        for configuration_directory in iterate_directory_configuration(root_key, json_slice)
+    )
+
+
+def _directory_collisions(
+    target_dir: str, directories: List[str], clean_directories: Iterable[str]
+) -> List[str]:
+    """Directories (or their parents) to be created in target_dir that exist as files,
+    each path is checked once: nothing is checked below a directory that doesn't exist
+    yet or that is deleted first (clean_directories)"""
+    clean_directories = set(clean_directories)
+    collisions: List[str] = []
+    checked: Set[str] = set()
+    # directories created from scratch
+    fresh: Set[str] = set()
+    for directory in directories:
+        prefix = ""
+        for part in os.path.normpath(directory).split(os.sep):
+            prefix = join(prefix, part) if prefix else part
+            if prefix in fresh:
+                break
+            if prefix in checked:
+                continue
+            checked.add(prefix)
+            path = join(target_dir, prefix)
+            if os.path.isdir(path):
+                if prefix in clean_directories:
+                    fresh.add(prefix)
+                    break
+            elif os.path.lexists(path):
+                collisions.append(prefix)
+                break
+            else:
+                fresh.add(prefix)
+                break
+    return collisions
+
+
+def plan_reorganization(
+    root_directory: str,
+    target_dir: str,
+    directory_configuration: Union[DirectoryFormatConfig, "DirectoryConfigurationStream"],
+    clean_directories: bool,
+    recursive: bool = False,
+) -> MovePlan:
+    """Flatten directory_configuration into a MovePlan and validate it against a single
+    os.scandir listing of root_directory, nothing is created, moved or deleted.
+    Content entries can be glob or regex patterns (see ContentMatcher), matched against
+    the files of the listing in a single pass: a file listed by name is never moved
+    by a pattern, a file matching more patterns is moved by the first one.
+    If recursive, the files not found in root_directory are looked up in its subdirectories
+    with a SourceIndex, patterns are matched against the files of the subdirectories too;
+    the directories created by directory_configuration are never looked into
+
+    Args:
+        root_directory (str): directory containing all the files to be reogranized
+        target_dir (str): directory where all files will be moved and reogranized
+        directory_configuration (DirectoryFormatConfig | DirectoryConfigurationStream): JSON where is specified how the files will be reorganized, or its stream
+        clean_directories (bool): delete root directories(keys) specified in directory_configuration
+        recursive (bool, optional): look for the files in the subdirectories of root_directory. Defaults to False
+
+    Raises:
+        FileNotFoundError: if root_directory file doesn't exist
+        FileNotFoundError: if target_dir file doesn't exist
+        PlanValidationError: if a directory to be created, or one of its parents,
+            is a file in target_dir
+        ConfigSchemaError: if directory_configuration is not a valid DirectoryFormatConfig
+        JsonContentError: if a regex pattern is not valid
+
+    Returns:
+        MovePlan: the plan, to be executed by execute_plan
+    """
+    _check_directories_exist(root_directory, target_dir)
+    configuration_directories = _configuration_directories(directory_configuration)
+    with os.scandir(root_directory) as entries:
+        listing = {entry.name: entry.is_dir() for entry in entries}
+
+    directories: List[str] = []
+    listed: List[Tuple[str, str]] = []
+    patterns: List[str] = []
+    pattern_directories: List[str] = []
+    for relative_destination_path, files_to_move in configuration_directories:
+        directories.append(relative_destination_path)
+        for file in files_to_move:
+            # a file named like a glob pattern is moved by name
+            if is_pattern(file) and file not in listing:
+                patterns.append(file)
+                pattern_directories.append(relative_destination_path)
+            else:
+                listed.append((file, relative_destination_path))
+    # known once the stream is consumed
+    root_directories = list(
+        directory_configuration
+        if isinstance(directory_configuration, dict)
+        else directory_configuration.root_directories
+    )
+
+    index: Optional[SourceIndex] = None
+    if recursive:
+        excluded = _directories_below(root_directory, target_dir, root_directories)
+        index = SourceIndex(
+            root_directory,
+            [name for name, is_dir in listing.items() if is_dir],
+            [file for file, _ in listed if file not in listing and basename(file) == file],
+            excluded,
+        )
+
+    # (file, directory, source) of the files matched by a pattern, patterns are matched
+    # first so that the subdirectories are walked only once
+    matched_files: List[Tuple[str, str, str]] = []
+    unmatched_patterns: List[str] = []
+    if patterns:
+        matcher = ContentMatcher(patterns)
+        matched = [False] * len(patterns)
+        files = ((file, file) for file in sorted(listing) if not listing[file])
+        if index is not None:
+            files = chain(files, index.files())
+        for file, source in files:
+            pattern_index = matcher.match(file)
+            if pattern_index is not None:
+                matched[pattern_index] = True
+                matched_files.append((file, pattern_directories[pattern_index], source))
+        unmatched_patterns = [
+            pattern for pattern, pattern_matched in zip(patterns, matched) if not pattern_matched
+        ]
+
+    moves: List[Tuple[str, str]] = []
+    missing: List[str] = []
+    duplicates: List[Tuple[str, str]] = []
+    destinations: Dict[str, str] = {}
+    sources: Dict[str, str] = {}
+    for file, relative_destination_path in listed:
+        if file in destinations:
+            duplicates.append((file, relative_destination_path))
+            continue
+        destinations[file] = relative_destination_path
+        found = file in listing
+        if not found and basename(file) != file:
+            # paths below root_directory are not in the listing
+            found = os.path.lexists(join(root_directory, file))
+        elif not found and index is not None:
+            source = index.get(file)
+            if source is not None:
+                sources[file] = source
+                found = True
+        if found:
+            moves.append((file, relative_destination_path))
+        else:
+            missing.append(file)
+    listed_files = set(destinations)
+    for file, relative_destination_path, source in matched_files:
+        if file in listed_files:
+            continue
+        if file in destinations:
+            # files with the same name found in different subdirectories
+            duplicates.append((source, relative_destination_path))
+            continue
+        destinations[file] = relative_destination_path
+        if source != file:
+            sources[file] = source
+        moves.append((file, relative_destination_path))
+
+    collisions = _directory_collisions(
+        target_dir, directories, root_directories if clean_directories else []
+    )
+    if collisions:
+        raise PlanValidationError(
+            f"directories to be created are files in {target_dir}: {', '.join(collisions)}"
+        )
+    # absolute paths, a saved plan can be executed from another working directory
+    return MovePlan(
+        os.path.abspath(root_directory),
+        os.path.abspath(target_dir),
+        root_directories if clean_directories else [],
+        directories,
+        moves,
+        missing,
+        duplicates,
+        unmatched_patterns,
+        sources,
+    )
+
+
+class MoveJournal:
+    """Append-only log of the moves completed by execute_plan, one JSON line for each move:
+    [source, destination, size, mtime_ns] of the destination once moved, and a last
+    "finished" line once the whole plan is executed.\n
+    A reorganization interrupted halfway is resumed by executing it again with the same
+    journal: the files already moved are not in root_directory anymore, so they are
+    not in the plan, and the journal tells them apart from the files really missing
+    by comparing the stat of their destination with the recorded one.
+    A finished journal is started over, the next execution is not a resumption.
+    Lines are flushed one by one, a line truncated by an interruption is discarded.
+    """
+
+    FINISHED = "finished"
+
+    def __init__(self, path: str) -> None:
+        """
+        Raises:
+            JsonContentError: if a line of the journal (but the last one) is not valid
+        """
+        self.path = path
+        # source -> (destination, size, mtime_ns), a file is moved once
+        self.completed: Dict[str, Tuple[str, int, int]] = {}
+        self._lock = Lock()
+        finished = False
+        if exists(path):
+            finished = self._read()
+        if finished:
+            self.completed = {}
+        self._file = open(path, "w" if finished else "a", encoding="utf-8")
+
+    @property
+    def resuming(self) -> bool:
+        """True if an execution was interrupted after completing some moves"""
+        return bool(self.completed)
+
+    def _read(self) -> bool:
+        """Load the completed moves, True if the journal is finished"""
+        with open(self.path, "rb+") as journal_file:
+            content = journal_file.read()
+            complete_length = content.rfind(b"\n") + 1
+            if complete_length != len(content):
+                # the last move was interrupted while being recorded
+                journal_file.truncate(complete_length)
+        lines = content[:complete_length].splitlines()
+        for line_number, line in enumerate(lines, 1):
+            try:
+                entry = loads(line)
+                if entry == self.FINISHED and line_number == len(lines):
+                    return True
+                source, destination, size, mtime_ns = entry
+            except (JSONDecodeError, TypeError, ValueError) as err:
+                raise JsonContentError(
+                    f"line {line_number} of journal {self.path} is not valid"
+                ) from err
+            self.completed[source] = (destination, size, mtime_ns)
+        return False
+
+    def is_done(self, source: str, destination: Optional[str] = None) -> bool:
+        """True if source was moved (to destination if given) and its destination didn't
+        change since"""
+        recorded = self.completed.get(source)
+        if recorded is None or destination not in (None, recorded[0]):
+            return False
+        try:
+            destination_stat = os.stat(recorded[0])
+        except FileNotFoundError:
+            return False
+        return (destination_stat.st_size, destination_stat.st_mtime_ns) == recorded[1:]
+
+    def record(self, source: str, destination: str) -> None:
+        destination_stat = os.stat(destination)
+        recorded = (destination, destination_stat.st_size, destination_stat.st_mtime_ns)
+        line = dumps([source, *recorded]) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.completed[source] = recorded
+
+    def finish(self) -> None:
+        """Mark the journal finished: every move of the plan was executed"""
+        with self._lock:
+            self._file.write(dumps(self.FINISHED) + "\n")
+            self._file.flush()
+
+    def journaled(self, move_function: MoveFunction) -> MoveFunction:
+        """move_function recording each completed move"""
+
+        def move_and_record(source: str, destination: str) -> None:
+            move_function(source, destination)
+            self.record(source, destination)
+
+        return move_and_record
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "MoveJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# bytes read at a time when hashing a file, see hash_file
+HASH_CHUNK_SIZE: int = 1024 * 1024
+# ways a duplicate is linked to the file with the same content, see DedupMover
+LINK_MODES = ("hardlink", "reflink")
+# ioctl cloning a whole file (Linux), the copy shares the blocks of the original
+FICLONE: int = 0x40049409
+# errors of os.link/FICLONE meaning the link can't be made for these files
+_UNSUPPORTED_LINK_ERRNOS = frozenset(
+    code
+    for code in (
+        errno.EXDEV,
+        errno.EPERM,
+        errno.EMLINK,
+        errno.EINVAL,
+        errno.ENOTTY,
+        errno.EBADF,
+        getattr(errno, "EOPNOTSUPP", None),
+        getattr(errno, "ENOTSUP", None),
+    )
+    if code is not None
+)
+
+
+def hash_file(path: str) -> str:
+    """blake2b hex digest of the content of path"""
+    digest = blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        while True:
+            chunk = file.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                return digest.hexdigest()
+            digest.update(chunk)
+
+
+class FingerprintCache:
+    """Content hashes of files keyed by (device, inode, mtime_ns, size), optionally saved
+    as JSON: a file unchanged since it was hashed, by a previous run too, isn't hashed again
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        Raises:
+            JsonContentError: if path is not a JSON object
+        """
+        self.path = path
+        self.hashes: Dict[str, str] = {}
+        if path is not None and exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as cache_file:
+                    hashes = load(cache_file)
+            except JSONDecodeError as err:
+                raise JsonContentError(f"hash cache {path} content is not a JSON") from err
+            if not isinstance(hashes, dict):
+                raise JsonContentError(f"hash cache {path} must be a JSON object")
+            self.hashes = hashes
+
+    @staticmethod
+    def key(file_stat: os.stat_result) -> str:
+        return f"{file_stat.st_dev}:{file_stat.st_ino}:{file_stat.st_mtime_ns}:{file_stat.st_size}"
+
+    def get(self, file_stat: os.stat_result) -> Optional[str]:
+        return self.hashes.get(self.key(file_stat))
+
+    def set(self, file_stat: os.stat_result, digest: str) -> None:
+        self.hashes[self.key(file_stat)] = digest
+
+    def save(self) -> None:
+        if self.path is not None:
+            with open(self.path, "w", encoding="utf-8") as cache_file:
+                dump(self.hashes, cache_file)
+
+
+def _hash_if_exists(path: str) -> Optional[str]:
     try:
-        files_to_move = json_slice["content"]
-    except KeyError:
-        # key files not found, this is a directory containing only directories
-        pass
-    move_files(root_directory, target_dir, relative_destination_path, files_to_move)
-    for dir_name, dir_content in json_slice.items():
-        if dir_name == "content":  # ignore content key
+        return hash_file(path)
+    except FileNotFoundError:
+        return None
+
+
+def find_duplicates(
+    sources: List[str], jobs: int = 1, cache: Optional[FingerprintCache] = None
+) -> Dict[str, str]:
+    """Find the sources with the same content of a previous source: the files are
+    bucketed by size, only the non empty files sharing their size with another one are
+    hashed (with a pool of jobs threads, skipping the hashes found in cache).
+    Symbolic links are not followed, they are never duplicates; sources sharing an inode
+    (hardlinks) are the same file, hashed once and not duplicates of each other
+
+    Args:
+        sources (List[str]): paths of the files, missing files, directories and links are ignored
+        jobs (int, optional): number of files hashed concurrently. Defaults to 1
+        cache (FingerprintCache, optional): hashes of the files already hashed, updated
+            with the new ones. Defaults to None
+
+    Returns:
+        Dict[str, str]: duplicate -> first source with its content
+    """
+    if cache is None:
+        cache = FingerprintCache()
+    # (device, inode) -> first source and its stat, each file is considered once
+    files: Dict[Tuple[int, int], Tuple[str, os.stat_result]] = {}
+    for source in sources:
+        try:
+            source_stat = os.lstat(source)
+        except FileNotFoundError:
+            continue
+        if stat.S_ISREG(source_stat.st_mode) and source_stat.st_size:
+            files.setdefault((source_stat.st_dev, source_stat.st_ino), (source, source_stat))
+    by_size: Dict[int, List[Tuple[str, os.stat_result]]] = defaultdict(list)
+    for source, source_stat in files.values():
+        by_size[source_stat.st_size].append((source, source_stat))
+    candidates = {
+        source: source_stat
+        for bucket in by_size.values()
+        if len(bucket) > 1
+        for source, source_stat in bucket
+    }
+    to_hash = [
+        source for source, source_stat in candidates.items() if cache.get(source_stat) is None
+    ]
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        for source, digest in zip(to_hash, executor.map(_hash_if_exists, to_hash)):
+            if digest is not None:
+                cache.set(candidates[source], digest)
+
+    first_sources: Dict[Tuple[int, str], str] = {}
+    duplicates: Dict[str, str] = {}
+    for source in sources:
+        source_stat = candidates.get(source)
+        digest = None if source_stat is None else cache.get(source_stat)
+        if digest is None:
+            continue
+        first_source = first_sources.setdefault((source_stat.st_size, digest), source)
+        if first_source != source:
+            duplicates[source] = first_source
+    return duplicates
+
+
+def link_file(original: str, destination: str, link_mode: str) -> None:
+    """Make destination a hardlink or a reflink (see LINK_MODES) of original,
+    replacing destination if it exists
+
+    Raises:
+        OSError: with errno in _UNSUPPORTED_LINK_ERRNOS if the filesystem can't link them
+    """
+    temporary = f"{destination}.{os.getpid()}.link"
+    if link_mode == "hardlink":
+        os.link(original, temporary)
+    else:
+        if ioctl is None:
+            raise OSError(errno.ENOTSUP, "reflinks are not supported", original)
+        try:
+            with open(original, "rb") as fsrc, open(temporary, "wb") as fdst:
+                ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            copystat(original, temporary)
+        except OSError:
+            os.unlink(temporary)
+            raise
+    os.replace(temporary, destination)
+
+
+class DedupMover:
+    """Move files storing each content once: a duplicate (see find_duplicates) is linked
+    to the destination of the first file with its content, then deleted, the other files
+    are moved by file_mover. A duplicate is moved by file_mover too if the first file
+    wasn't moved or the filesystem can't link them.
+    The first files must be moved before their duplicates.
+    """
+
+    def __init__(self, file_mover: FileMover, duplicates: Dict[str, str], link_mode: str) -> None:
+        self.file_mover = file_mover
+        self.duplicates = duplicates
+        self.link_mode = link_mode
+        self.statistics = MoveStatistics(link_mode)
+        # first source -> its destination
+        self._destinations: Dict[str, str] = {}
+
+    def move(self, source: str, destination: str) -> None:
+        first_source = self.duplicates.get(source, source)
+        first_destination = self._destinations.get(first_source)
+        if first_destination is None:
+            self.file_mover.move(source, destination)
+            # the first file moved with this content
+            self._destinations[first_source] = destination
+            return
+        start = perf_counter()
+        os.stat(source)  # a missing duplicate is not linked
+        try:
+            link_file(first_destination, destination, self.link_mode)
+        except OSError as err:
+            if err.errno not in _UNSUPPORTED_LINK_ERRNOS:
+                raise
+            self.file_mover.move(source, destination)
+            return
+        os.unlink(source)
+        self.statistics.record(0, perf_counter() - start)
+
+
+def execute_plan(
+    plan: MovePlan,
+    jobs: int = 1,
+    journal_path: Optional[str] = None,
+    link_mode: Optional[str] = None,
+    hash_cache_path: Optional[str] = None,
+) -> Dict[str, MoveStatistics]:
+    """Delete plan.clean_directories, create all plan.directories, then move the files
+    with a FileMover: renamed if root_directory and target_dir are on the same device,
+    else copied and then deleted.
+    A warning is emitted for each missing and duplicate file of the plan
+
+    With a journal (see MoveJournal) the completed moves are recorded, and the journal is
+    marked finished at the end; when an unfinished journal already has moves the execution
+    is resumed: plan.clean_directories are not deleted, missing files already moved and
+    unmatched patterns are not reported
+
+    With a link_mode the files with the same content are stored once (see DedupMover):
+    the files are hashed by find_duplicates, the first file with each content is moved,
+    then its duplicates are linked to it
+
+    Args:
+        plan (MovePlan): plan computed by plan_reorganization, or loaded
+        jobs (int, optional): number of files moved (and hashed) concurrently, see run_moves. Defaults to 1
+        journal_path (str, optional): journal of the completed moves. Defaults to None
+        link_mode (str, optional): "hardlink" or "reflink" to deduplicate the files. Defaults to None
+        hash_cache_path (str, optional): JSON file caching the hashes of the files between runs,
+            see FingerprintCache. Defaults to None
+
+    Raises:
+        FileNotFoundError: if root_directory file doesn't exist
+        FileNotFoundError: if target_dir file doesn't exist
+        JsonContentError: if the journal or the hash cache is not valid
+
+    Returns:
+        Dict[str, MoveStatistics]: strategy -> files moved with it and time spent
+    """
+    _check_directories_exist(plan.root_directory, plan.target_dir)
+    journal = MoveJournal(journal_path) if journal_path is not None else None
+    resuming = journal is not None and journal.resuming
+    # name -> source of the files moved, recursive plans move them from subdirectories
+    moved_sources = {basename(source): source for source in journal.completed} if resuming else {}
+    for file in plan.missing:
+        source = join(plan.root_directory, file)
+        if resuming and (
+            journal.is_done(source) or journal.is_done(moved_sources.get(file, source))
+        ):
             continue
-        reorganize_directory_recursively(
-            root_directory, target_dir, join(relative_destination_path, dir_name), dir_content
+        warnings.warn(f"tried to move file {source} but wasn't found, skipping.")
+    for file, directory in plan.duplicates:
+        warnings.warn(
+            f"file {join(plan.root_directory, file)} is listed more than once, "
+            f"not moved to {join(plan.target_dir, directory)}"
         )
+    if not resuming:
+        for pattern in plan.unmatched_patterns:
+            warnings.warn(f"pattern {pattern} didn't match any file in {plan.root_directory}")
+        for directory in plan.clean_directories:
+            rmtree(join(plan.target_dir, directory), ignore_errors=True)
+    for directory in plan.directories:
+        makedirs(join(plan.target_dir, directory), exist_ok=True)
+    file_mover = FileMover(plan.root_directory, plan.target_dir)
+    statistics = file_mover.statistics
+    move_function: MoveFunction = file_mover.move
+    # the first files with each content are moved before their duplicates
+    move_batches = [plan.file_moves()]
+    if link_mode is not None:
+        cache = FingerprintCache(hash_cache_path)
+        duplicates = find_duplicates([source for source, _ in move_batches[0]], jobs, cache)
+        cache.save()
+        dedup_mover = DedupMover(file_mover, duplicates, link_mode)
+        statistics = {**statistics, link_mode: dedup_mover.statistics}
+        move_function = dedup_mover.move
+        move_batches = [
+            [file_move for file_move in move_batches[0] if file_move[0] not in duplicates],
+            [file_move for file_move in move_batches[0] if file_move[0] in duplicates],
+        ]
+    if journal is None:
+        for moves in move_batches:
+            run_moves(moves, jobs, move_function)
+        return statistics
+    with journal:
+        for moves in move_batches:
+            run_moves(moves, jobs, journal.journaled(move_function))
+        journal.finish()
+    return statistics
 
 
 def reorganize_directory(
     root_directory: str,
     target_dir: str,
-    directory_configuration: DirectoryFormatConfig,
+    directory_configuration: Union[DirectoryFormatConfig, "DirectoryConfigurationStream"],
     clean_directories: bool,
-) -> None:
+    jobs: int = 1,
+    journal_path: Optional[str] = None,
+    recursive: bool = False,
+    link_mode: Optional[str] = None,
+    hash_cache_path: Optional[str] = None,
+) -> Dict[str, MoveStatistics]:
     """Given a root_directory and the wanted directory format as a JSON dict,
-    reorganizes all the files as specified in directory_configuration
+    reorganizes all the files as specified in directory_configuration,
+    planning all the moves first (see plan_reorganization and execute_plan)
 
     Args:
         root_directory (str): directory containing all the files to be reogranized
         target_directory (str): directory where all files will be moved and reogranized
-        directory_configuration (DirectoryFormatConfig): JSON where is specified how the files will be reorganized
+        directory_configuration (DirectoryFormatConfig | DirectoryConfigurationStream): JSON where is specified how the files will be reorganized, or its stream
         clean_directories (bool): delete root directories(keys) specified in directory_configuration
+        jobs (int, optional): number of files moved concurrently, see run_moves. Defaults to 1
+        journal_path (str, optional): journal to resume from, see execute_plan. Defaults to None
+        recursive (bool, optional): look for the files in the subdirectories of root_directory. Defaults to False
+        link_mode (str, optional): "hardlink" or "reflink" to deduplicate the files, see execute_plan. Defaults to None
+        hash_cache_path (str, optional): JSON file caching the hashes of the files, see execute_plan. Defaults to None
 
     Raises:
         FileNotFoundError: if root_directory file doesn't exist
         FileNotFoundError: if target_dir file doesn't exist
-    """
-    if not exists(root_directory):
-        raise FileNotFoundError(f"specified root_directory doesn't exist: {root_directory}")
-    if not exists(target_dir):
-        raise FileNotFoundError(f"specified target_dir doesn't exist: {target_dir}")
+        PlanValidationError: if a directory to be created already exists as a file
+        ConfigSchemaError: if directory_configuration is not a valid DirectoryFormatConfig
+        JsonContentError: if the journal or the hash cache is not valid
 
-    for root_key in directory_configuration:
-        if clean_directories:
-            rmtree(join(target_dir, root_key), ignore_errors=True)
-        reorganize_directory_recursively(
-            root_directory, target_dir, root_key, directory_configuration[root_key]
-        )
+    Returns:
+        Dict[str, MoveStatistics]: strategy -> files moved with it and time spent
+    """
+    return execute_plan(
+        plan_reorganization(
+            root_directory, target_dir, directory_configuration, clean_directories, recursive
+        ),
+        jobs,
+        journal_path,
+        link_mode,
+        hash_cache_path,
+    )
 
 
 def check_json_extension(path: str) -> bool:
@@ -192,9 +1348,253 @@ def check_json_extension(path: str) -> bool:
     return False
 
 
+def load_directory_configuration(directory_configuration_path: str) -> DirectoryFormatConfig:
+    """Load the directory configuration from a JSON file
+
+    Args:
+        directory_configuration_path (str): path to JSON file where is specified how the files will be reorganized
+
+    Raises:
+        FileNotFoundError: directory_configuration_path doesn't exist
+        FileExtensionError: directory_configuration_path has no .json extension
+        JsonContentError: parsing json file failed
+        ConfigSchemaError: the JSON is not a valid DirectoryFormatConfig
+
+    Returns:
+        DirectoryFormatConfig: the configuration
+    """
+    _check_configuration_path(directory_configuration_path)
+    try:
+        with open(directory_configuration_path, "r", encoding="utf-8") as config_file:
+            directory_configuration = load(config_file)
+    except JSONDecodeError as err:
+        raise JsonContentError("directory_configuration_path file content is not a JSON") from err
+    validate_directory_configuration(directory_configuration)
+    return directory_configuration
+
+
+def _check_configuration_path(directory_configuration_path: str) -> None:
+    if not check_json_extension(directory_configuration_path):
+        raise FileExtensionError(
+            f"directory_configuration {directory_configuration_path} must have .json extension"
+        )
+    if not exists(directory_configuration_path):
+        raise FileNotFoundError("directory_configuration_path file doesn't exist")
+
+
+def validate_directory_configuration(directory_configuration: DirectoryFormatConfig) -> None:
+    """Check, without recursion, that directory_configuration is a DirectoryFormatConfig:
+    an object of directories, each one an object of subdirectories and of an optional
+    "content" list of file names
+
+    Raises:
+        ConfigSchemaError: describing the first error found
+    """
+    if not isinstance(directory_configuration, dict):
+        raise ConfigSchemaError(
+            f"configuration must be an object, got {type(directory_configuration).__name__}"
+        )
+    stack = list(reversed(directory_configuration.items()))
+    while stack:
+        relative_path, json_slice = stack.pop()
+        if relative_path == "content" or not relative_path:
+            raise ConfigSchemaError(f'"{relative_path}" is not a valid root directory name')
+        if not isinstance(json_slice, dict):
+            raise ConfigSchemaError(
+                f"directory {relative_path} must be an object, got {type(json_slice).__name__}"
+            )
+        subdirectories = []
+        for name, value in json_slice.items():
+            if name != "content":
+                if not name:
+                    raise ConfigSchemaError(f"directory {relative_path} has an empty subdirectory")
+                subdirectories.append((join(relative_path, name), value))
+            elif not isinstance(value, list) or not all(isinstance(file, str) for file in value):
+                raise ConfigSchemaError(
+                    f"content of directory {relative_path} must be a list of file names"
+                )
+        stack.extend(reversed(subdirectories))
+
+
+# characters read from the configuration file at a time by DirectoryConfigurationStream
+CONFIG_CHUNK_SIZE: int = 64 * 1024
+_CONFIG_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_CONFIG_SCALAR = re.compile(r"[-+.\w]+")
+
+
+class DirectoryConfigurationStream:
+    """Read a JSON configuration file chunk by chunk, yielding (relative path, files to move)
+    of each directory as soon as it can be, without loading the whole file nor recursing
+    on its nesting: only the directories being parsed, the content list being read and the
+    subdirectories held back are kept in memory.\n
+    Directories are yielded in the same order as in a dict (parents first, see
+    iterate_directory_configuration): a directory when its "content" list is read, or once
+    its object is closed if it has no "content", the subdirectories listed before its
+    "content" are held back until then.
+    The schema is validated while reading (see validate_directory_configuration), a
+    duplicated directory is an error; once iterated, root_directories are the root
+    directories(keys) of the configuration.
+    """
+
+    def __init__(self, directory_configuration_path: str, chunk_size: int = CONFIG_CHUNK_SIZE):
+        """
+        Raises:
+            FileNotFoundError: directory_configuration_path doesn't exist
+            FileExtensionError: directory_configuration_path has no .json extension
+        """
+        _check_configuration_path(directory_configuration_path)
+        self.path = directory_configuration_path
+        self.chunk_size = chunk_size
+        self.root_directories: List[str] = []
+
+    def _tokens(self, config_file) -> Iterator[Tuple[str, Optional[str], int]]:
+        """(kind, string, position) of each token: one of {}[]:, or "s" for a string,
+        "v" for any other value"""
+        buffer = ""
+        # position in the file of buffer[0]
+        offset = 0
+        position = 0
+        end_of_file = False
+        while True:
+            position = _CONFIG_WHITESPACE.match(buffer, position).end()
+            if position == len(buffer):
+                if end_of_file:
+                    return
+                chunk = config_file.read(self.chunk_size)
+                end_of_file = not chunk
+                offset += position
+                buffer, position = chunk, 0
+                continue
+            character = buffer[position]
+            if character in "{}[]:,":
+                yield character, None, offset + position
+                position += 1
+            elif character == '"':
+                try:
+                    string, end = scanstring(buffer, position + 1)
+                except JSONDecodeError as err:
+                    if end_of_file:
+                        raise JsonContentError(
+                            f"{self.path} content is not a JSON: {err.msg}: "
+                            f"character {offset + err.pos}"
+                        ) from err
+                    # the string continues in the next chunk
+                    chunk = config_file.read(self.chunk_size)
+                    end_of_file = not chunk
+                    offset += position
+                    buffer, position = buffer[position:] + chunk, 0
+                    continue
+                yield "s", string, offset + position
+                position = end
+            else:
+                scalar = _CONFIG_SCALAR.match(buffer, position)
+                if scalar is None:
+                    raise JsonContentError(
+                        f"{self.path} content is not a JSON: unexpected {character!r} "
+                        f"at character {offset + position}"
+                    )
+                # numbers, true, false and null are never valid in a configuration
+                yield "v", None, offset + position
+                position = scalar.end()
+
+    def __iter__(self) -> Iterator[Tuple[str, FilesToMove]]:
+        """
+        Raises:
+            JsonContentError: if the file is not a JSON
+            ConfigSchemaError: if the file is not a DirectoryFormatConfig
+        """
+        self.root_directories = []
+        with open(self.path, "r", encoding="utf-8") as config_file:
+            tokens = self._tokens(config_file)
+
+            def expect(expected: str, description: str) -> Tuple[Optional[str], int]:
+                kind, value, position = next(tokens, (None, None, -1))
+                if kind is None:
+                    raise JsonContentError(f"{self.path} content is not a JSON: truncated")
+                if kind not in expected:
+                    message = f"{self.path}: expected {description} at character {position}"
+                    if kind in "sv{[" and any(value_kind in expected for value_kind in "s{["):
+                        # valid JSON, but not a DirectoryFormatConfig
+                        raise ConfigSchemaError(message)
+                    raise JsonContentError(message)
+                return kind, value
+
+            expect("{", "the configuration object")
+            # relative path and names found in each directory being parsed, "" for the root
+            stack: List[Tuple[str, Set[str]]] = [("", set())]
+            # directory not yielded yet -> directories of its subtree, yielded after it
+            held_back: Dict[str, List[Tuple[str, FilesToMove]]] = {}
+
+            def release(
+                directories: List[Tuple[str, FilesToMove]], ancestors: List[Tuple[str, Set[str]]]
+            ) -> List[Tuple[str, FilesToMove]]:
+                """directories to be yielded now, none if an ancestor is held back"""
+                for ancestor, _ in reversed(ancestors):
+                    if ancestor in held_back:
+                        held_back[ancestor].extend(directories)
+                        return []
+                return directories
+
+            kind, name = expect("s}", 'a directory name or "}"')
+            while stack:
+                if kind == "}":
+                    relative_path, names = stack.pop()
+                    if relative_path and "content" not in names:
+                        yield from release(
+                            [(relative_path, []), *held_back.pop(relative_path)], stack
+                        )
+                    if stack:
+                        kind, name = expect(",}", '"," or "}"')
+                        if kind == ",":
+                            kind, name = expect("s", "a directory name")
+                    continue
+                relative_path, names = stack[-1]
+                if name in names:
+                    raise ConfigSchemaError(
+                        f"{self.path}: {join(relative_path, name)} is listed more than once"
+                    )
+                names.add(name)
+                expect(":", '":"')
+                if name == "content" and relative_path:
+                    expect("[", f"a list of file names as content of {relative_path}")
+                    files: FilesToMove = []
+                    kind, file = expect("s]", "a file name")
+                    while kind != "]":
+                        files.append(file)
+                        kind, _ = expect(",]", '"," or "]"')
+                        if kind == ",":
+                            kind, file = expect("s", "a file name")
+                    yield from release(
+                        [(relative_path, files), *held_back.pop(relative_path)], stack[:-1]
+                    )
+                elif not name or name == "content":
+                    raise ConfigSchemaError(f'{self.path}: "{name}" is not a valid directory name')
+                else:
+                    expect("{", f"an object as directory {join(relative_path, name)}")
+                    if not relative_path:
+                        self.root_directories.append(name)
+                    stack.append((join(relative_path, name), set()))
+                    held_back[join(relative_path, name)] = []
+                    kind, name = expect("s}", 'a directory name or "}"')
+                    continue
+                kind, name = expect(",}", '"," or "}"')
+                if kind == ",":
+                    kind, name = expect("s", "a directory name")
+            if next(tokens, None) is not None:
+                raise JsonContentError(f"{self.path} content is not a JSON: extra data")
+
+
 def reorganize_directory_from_json(
-    root_directory: str, target_dir: str, directory_configuration_path: str, clean_directories: bool
-) -> None:
+    root_directory: str,
+    target_dir: str,
+    directory_configuration_path: str,
+    clean_directories: bool,
+    jobs: int = 1,
+    journal_path: Optional[str] = None,
+    recursive: bool = False,
+    link_mode: Optional[str] = None,
+    hash_cache_path: Optional[str] = None,
+) -> Dict[str, MoveStatistics]:
     """Given a root_directory and the wanted directory format as a JSON dict, reorganizes all the files as specified in directory_configuration
 
     Args:
@@ -202,6 +1602,11 @@ def reorganize_directory_from_json(
         target_directory (str): directory where all files will be moved and reogranized
         directory_configuration_path (str): path to JSON file where is specified how the files will be reorganized
         clean_directories (bool): delete root directories(keys) specified in directory_configuration
+        jobs (int, optional): number of files moved concurrently. Defaults to 1
+        journal_path (str, optional): journal to resume from, see execute_plan. Defaults to None
+        recursive (bool, optional): look for the files in the subdirectories of root_directory. Defaults to False
+        link_mode (str, optional): "hardlink" or "reflink" to deduplicate the files, see execute_plan. Defaults to None
+        hash_cache_path (str, optional): JSON file caching the hashes of the files, see execute_plan. Defaults to None
 
     Raises:
         FileNotFoundError: if root_directory file doesn't exist
@@ -209,25 +1614,274 @@ def reorganize_directory_from_json(
         FileNotFoundError: directory_configuration_path doesn't exist
         FileExtensionError: directory_configuration_path has no .json extension
         JSONDecodeError: parsing json file failed
+
+    Returns:
+        Dict[str, MoveStatistics]: strategy -> files moved with it and time spent
+    """
+    return reorganize_directory(
+        root_directory,
+        target_dir,
+        DirectoryConfigurationStream(directory_configuration_path),
+        clean_directories,
+        jobs,
+        journal_path,
+        recursive,
+        link_mode,
+        hash_cache_path,
+    )
+
+
+class ContentRouter:
+    """Destination directory (relative to target_dir) of a file name according to a
+    configuration, compiled once: a dict of the file names listed, then a ContentMatcher
+    for the patterns. Like plan_reorganization, a file listed by name is never moved by a
+    pattern and the first destination of a file wins; paths below root_directory are ignored
     """
-    if not check_json_extension(directory_configuration_path):
-        raise FileExtensionError(
-            f"directory_configuration {directory_configuration_path} must have .json extension"
-        )
-    if not exists(directory_configuration_path):
-        raise FileNotFoundError("directory_configuration_path file doesn't exist")
 
-    directory_configuration: dict = {}
+    def __init__(
+        self, directory_configuration: Union[DirectoryFormatConfig, "DirectoryConfigurationStream"]
+    ) -> None:
+        """
+        Raises:
+            ConfigSchemaError: if directory_configuration is not a valid DirectoryFormatConfig
+            JsonContentError: if a regex pattern is not valid
+        """
+        self.destinations: Dict[str, str] = {}
+        patterns: List[str] = []
+        self._pattern_directories: List[str] = []
+        for relative_destination_path, files_to_move in _configuration_directories(
+            directory_configuration
+        ):
+            for file in files_to_move:
+                if is_pattern(file):
+                    patterns.append(file)
+                    self._pattern_directories.append(relative_destination_path)
+                if basename(file) == file:
+                    # a file named like a pattern is moved by name too
+                    self.destinations.setdefault(file, relative_destination_path)
+        self._matcher = ContentMatcher(patterns) if patterns else None
+
+    def route(self, file_name: str) -> Optional[str]:
+        """Directory where file_name is moved, None if it's not in the configuration"""
+        destination = self.destinations.get(file_name)
+        if destination is None and self._matcher is not None:
+            pattern_index = self._matcher.match(file_name)
+            if pattern_index is not None:
+                destination = self._pattern_directories[pattern_index]
+        return destination
+
+
+class InotifyWatcher:
+    """Names of the files written or moved into a directory, read from a Linux inotify
+    descriptor bound with ctypes; not recursive, the subdirectories are not watched.
+    An overflow of the inotify queue (events lost) is reported as all the files of directory
+
+    Raises:
+        OSError: if inotify is not available
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    # wd, mask, cookie, len of struct inotify_event, followed by len bytes of name
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        libc = ctypes.CDLL(find_library("c") or None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+        if (
+            libc.inotify_add_watch(
+                self._fd, os.fsencode(directory), self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+            )
+            < 0
+        ):
+            code = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(code, os.strerror(code), directory)
+
+    def wait(self, timeout: float) -> List[str]:
+        """Names of the files arrived, waiting at most timeout seconds for the first one"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        names: List[str] = []
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = self._EVENT.unpack_from(data, offset)
+                offset += self._EVENT.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & self.IN_Q_OVERFLOW:
+                    with os.scandir(self.directory) as entries:
+                        names.extend(entry.name for entry in entries if entry.is_file())
+                elif name and not mask & self.IN_ISDIR:
+                    names.append(name)
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Names of the files arrived in a directory, found comparing os.scandir listings of the
+    directory (not of its subdirectories) taken every interval seconds: a file is reported
+    once its size and mtime are the same in two consecutive listings, so a file still
+    being written is reported when complete. Files already there when created are not reported
+    """
+
+    def __init__(self, directory: str, interval: float = 1.0) -> None:
+        self.directory = directory
+        self.interval = interval
+        self._listing = self._scan()
+        # files reported, with the stat they had
+        self._reported = dict(self._listing)
+        self._next_scan = monotonic() + interval
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        listing = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        entry_stat = entry.stat(follow_symlinks=False)
+                        listing[entry.name] = (entry_stat.st_size, entry_stat.st_mtime_ns)
+                except FileNotFoundError:
+                    continue
+        return listing
+
+    def wait(self, timeout: float) -> List[str]:
+        """Names of the files arrived, waiting at most timeout seconds for the next listing"""
+        delay = self._next_scan - monotonic()
+        if delay > timeout:
+            sleep(timeout)
+            return []
+        sleep(max(delay, 0))
+        self._next_scan = monotonic() + self.interval
+        previous, self._listing = self._listing, self._scan()
+        names = [
+            name
+            for name, file_stat in self._listing.items()
+            if previous.get(name) == file_stat and self._reported.get(name) != file_stat
+        ]
+        self._reported = {
+            name: file_stat
+            for name, file_stat in self._listing.items()
+            if name in names or self._reported.get(name) == file_stat
+        }
+        return names
+
+    def close(self) -> None:
+        pass
+
+
+def watch_directory(
+    root_directory: str,
+    target_dir: str,
+    directory_configuration: Union[DirectoryFormatConfig, "DirectoryConfigurationStream"],
+    clean_directories: bool = False,
+    debounce: float = 0.05,
+    poll_interval: Optional[float] = None,
+    stop: Optional[Event] = None,
+) -> Dict[str, MoveStatistics]:
+    """Reorganize root_directory once, then keep moving the files arriving in it, until stop
+    is set (or forever): each file written or moved into root_directory is routed by a
+    ContentRouter and moved by a FileMover after debounce seconds without events for it, so
+    a burst of writes is moved once. Arrivals are watched with inotify (InotifyWatcher),
+    by polling root_directory every poll_interval seconds (PollingWatcher) if inotify is not
+    available or poll_interval is given; the tree below root_directory is never rescanned
+
+    Args:
+        root_directory (str): directory where the files arrive
+        target_dir (str): directory where all files will be moved and reogranized
+        directory_configuration (DirectoryFormatConfig | DirectoryConfigurationStream): JSON where is specified how the files will be reorganized, or its stream
+        clean_directories (bool, optional): delete root directories(keys) specified in directory_configuration before the first reorganization. Defaults to False
+        debounce (float, optional): seconds without events before a file is moved. Defaults to 0.05
+        poll_interval (float, optional): seconds between two listings, to poll instead of using inotify. Defaults to None
+        stop (Event, optional): set to stop watching. Defaults to None
+
+    Raises:
+        FileNotFoundError: if root_directory file doesn't exist
+        FileNotFoundError: if target_dir file doesn't exist
+        PlanValidationError: if a directory to be created already exists as a file
+        ConfigSchemaError: if directory_configuration is not a valid DirectoryFormatConfig
+        JsonContentError: if a regex pattern is not valid
+
+    Returns:
+        Dict[str, MoveStatistics]: strategy -> files moved with it and time spent
+    """
+    _check_directories_exist(root_directory, target_dir)
+    router = ContentRouter(directory_configuration)
+    if stop is None:
+        stop = Event()
+    watcher: Union[InotifyWatcher, PollingWatcher]
+    if poll_interval is None:
+        try:
+            watcher = InotifyWatcher(root_directory)
+        except (OSError, AttributeError):
+            watcher = PollingWatcher(root_directory)
+    else:
+        watcher = PollingWatcher(root_directory, poll_interval)
     try:
-        with open(directory_configuration_path, "r", encoding="utf-8") as config_file:
-            directory_configuration = load(config_file)
-    except JSONDecodeError as err:
-        raise JsonContentError("directory_configuration_path file content is not a JSON") from err
-    reorganize_directory(root_directory, target_dir, directory_configuration, clean_directories)
+        # the files arriving meanwhile are reported by the watcher, started before
+        plan = plan_reorganization(
+            root_directory, target_dir, directory_configuration, clean_directories
+        )
+        # files not arrived yet are expected
+        plan.missing, plan.unmatched_patterns = [], []
+        statistics = execute_plan(plan)
+        file_mover = FileMover(root_directory, target_dir)
+        file_mover.statistics = statistics
+        created_directories: Set[str] = set()
+        # name -> time of its last event
+        pending: Dict[str, float] = {}
+        while not stop.is_set():
+            timeout = 0.5
+            if pending:
+                timeout = max(min(pending.values()) + debounce - monotonic(), 0)
+            for name in watcher.wait(timeout):
+                if router.route(name) is not None:
+                    pending[name] = monotonic()
+            now = monotonic()
+            for name, last_event in list(pending.items()):
+                if now - last_event < debounce:
+                    continue
+                del pending[name]
+                relative_destination_path = router.route(name)
+                # a file that can't be moved (permissions, destination in the way...) is
+                # skipped with a warning, the next ones are still moved
+                try:
+                    if relative_destination_path not in created_directories:
+                        makedirs(join(target_dir, relative_destination_path), exist_ok=True)
+                        created_directories.add(relative_destination_path)
+                    # a file moved away meanwhile is not found, not worth a warning
+                    move_file(
+                        join(root_directory, name),
+                        join(target_dir, relative_destination_path, name),
+                        file_mover.move,
+                    )
+                except OSError as error:
+                    warnings.warn(
+                        f"tried to move file {join(root_directory, name)}: {error}, skipping."
+                    )
+    finally:
+        watcher.close()
+    return statistics
 
 
 def cli_main(args: list[str]):
-    """main cli endpoint, parse the arguments passed by the user then execute reorganize_directory_from_json
+    """main cli endpoint, parse the arguments passed by the user, plan the reorganization
+    (or load the plan passed with --load_plan) then execute it
 
     Args:
         args (list[str]): user arguments (example argv[1:])
@@ -244,7 +1898,8 @@ def cli_main(args: list[str]):
     ## position arguments
     parser.add_argument(
         "directory_configuration_path",
-        help="json file where is defined the format of the installation folder",
+        nargs="?",
+        help="json file where is defined the format of the installation folder, not needed with --load_plan",
     )
 
     ## optional flags
@@ -264,6 +1919,74 @@ def cli_main(args: list[str]):
         action="store_true",
         help="delete root directories defined in the JSON format before copying",
     )
+    parser.add_argument(
+        "--jobs",
+        default=1,
+        type=int,
+        help="number of files moved concurrently, all the directories are created before moving them. Defaults to 1",
+    )
+    parser.add_argument(
+        "--statistics",
+        default=False,
+        action="store_true",
+        help="print how many files were moved by each strategy (rename, copy, shutil) and their throughput",
+    )
+    parser.add_argument(
+        "--dry_run",
+        default=False,
+        action="store_true",
+        help="print the planned deletions, directories and moves without executing them",
+    )
+    parser.add_argument(
+        "--save_plan",
+        default=None,
+        help="save the planned deletions, directories and moves as JSON, to be executed later with --load_plan",
+    )
+    parser.add_argument(
+        "--load_plan",
+        default=None,
+        help="execute a plan saved with --save_plan, --root_directory, --target_directory and --clean_start are ignored",
+    )
+    parser.add_argument(
+        "--journal",
+        default=None,
+        help="record each completed move in this file, an interrupted reorganization is resumed running it again with the same journal",
+    )
+    parser.add_argument(
+        "--recursive",
+        default=False,
+        action="store_true",
+        help="look for the files not found in --root_directory in its subdirectories",
+    )
+    parser.add_argument(
+        "--dedup",
+        default=None,
+        choices=LINK_MODES,
+        help="store the files with the same content once, linking the duplicates to the first one moved",
+    )
+    parser.add_argument(
+        "--hash_cache",
+        default=None,
+        help="with --dedup, JSON file caching the hashes of the files, unchanged files are not hashed again",
+    )
+    parser.add_argument(
+        "--watch",
+        default=False,
+        action="store_true",
+        help="after reorganizing, keep moving the files arriving in --root_directory until interrupted (Ctrl+C), can't be used with --load_plan, --save_plan, --dry_run, --jobs, --journal, --recursive, --dedup or --hash_cache",
+    )
+    parser.add_argument(
+        "--debounce",
+        default=0.05,
+        type=float,
+        help="with --watch, seconds without changes before an arrived file is moved. Defaults to 0.05",
+    )
+    parser.add_argument(
+        "--poll_interval",
+        default=None,
+        type=float,
+        help="with --watch, list --root_directory every POLL_INTERVAL seconds instead of using inotify (used anyway where inotify is not available, every second)",
+    )
 
     # extracting cli arguments and checking validity
     parsed_args: Namespace = parser.parse_args(args)
@@ -279,19 +2002,126 @@ def cli_main(args: list[str]):
     ## --clean_start
     clean_start: bool = parsed_args.clean_start
 
+    ## --jobs
+    jobs: int = parsed_args.jobs
+    if jobs < 1:
+        parser.error(f"{RED}--jobs must be at least 1, got {jobs}{RESET}")
+
+    ## --statistics
+    show_statistics: bool = parsed_args.statistics
+
+    ## --dry_run
+    dry_run: bool = parsed_args.dry_run
+
+    ## --save_plan
+    save_plan_path: Optional[str] = parsed_args.save_plan
+
+    ## --load_plan
+    load_plan_path: Optional[str] = parsed_args.load_plan
+
+    ## --journal
+    journal_path: Optional[str] = parsed_args.journal
+
+    ## --recursive
+    recursive: bool = parsed_args.recursive
+
+    ## --dedup
+    link_mode: Optional[str] = parsed_args.dedup
+
+    ## --hash_cache
+    hash_cache_path: Optional[str] = parsed_args.hash_cache
+
+    ## --watch
+    watch: bool = parsed_args.watch
+    if watch:
+        # options the watch doesn't honor, neither in the first reorganization nor afterwards
+        unsupported = [
+            option
+            for option, given in (
+                ("--load_plan", load_plan_path is not None),
+                ("--save_plan", save_plan_path is not None),
+                ("--dry_run", dry_run),
+                ("--jobs", jobs != 1),
+                ("--journal", journal_path is not None),
+                ("--recursive", recursive),
+                ("--dedup", link_mode is not None),
+                ("--hash_cache", hash_cache_path is not None),
+            )
+            if given
+        ]
+        if unsupported:
+            parser.error(f"{RED}--watch can't be used with {', '.join(unsupported)}{RESET}")
+
+    ## --debounce
+    debounce: float = parsed_args.debounce
+
+    ## --poll_interval
+    poll_interval: Optional[float] = parsed_args.poll_interval
+    if poll_interval is not None and poll_interval <= 0:
+        parser.error(f"{RED}--poll_interval must be positive, got {poll_interval}{RESET}")
+
     # POSITIONAL ARGUMENTS
 
     ## directory_configuration_path
-    directory_configuration_path: str = parsed_args.directory_configuration_path
-    try:
-        reorganize_directory_from_json(
-            root_directory,
-            target_directory,
-            directory_configuration_path,
-            clean_start,
-        )
-    except (FileNotFoundError, FileExtensionError, JsonContentError) as err:
-        parser.error(f"{RED}{err}{RESET}")
+    directory_configuration_path: Optional[str] = parsed_args.directory_configuration_path
+    if directory_configuration_path is None and load_plan_path is None:
+        parser.error(f"{RED}directory_configuration_path or --load_plan is required{RESET}")
+    if watch:
+        stop = Event()
+        # Ctrl+C or kill stop watching, the files being moved are completed
+        previous_handlers = {
+            signal_number: signal.signal(signal_number, lambda *_: stop.set())
+            for signal_number in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            statistics = watch_directory(
+                root_directory,
+                target_directory,
+                DirectoryConfigurationStream(directory_configuration_path),
+                clean_start,
+                debounce,
+                poll_interval,
+                stop,
+            )
+        except (
+            FileNotFoundError,
+            FileExtensionError,
+            JsonContentError,
+            PlanValidationError,
+        ) as err:
+            parser.error(f"{RED}{err}{RESET}")
+        finally:
+            for signal_number, handler in previous_handlers.items():
+                signal.signal(signal_number, handler)
+    else:
+        try:
+            if load_plan_path is not None:
+                plan = MovePlan.load(load_plan_path)
+            else:
+                plan = plan_reorganization(
+                    root_directory,
+                    target_directory,
+                    DirectoryConfigurationStream(directory_configuration_path),
+                    clean_start,
+                    recursive,
+                )
+            if save_plan_path is not None:
+                plan.save(save_plan_path)
+            if dry_run:
+                print(plan)
+                return
+            statistics = execute_plan(plan, jobs, journal_path, link_mode, hash_cache_path)
+        except (
+            FileNotFoundError,
+            FileExtensionError,
+            JsonContentError,
+            PlanValidationError,
+        ) as err:
+            parser.error(f"{RED}{err}{RESET}")
+    if show_statistics:
+        for strategy_statistics in statistics.values():
+            if strategy_statistics.files:
+                print(strategy_statistics)
 
 
 if __name__ == "__main__":
@@ -1,18 +1,43 @@
-from json import load
-from os import listdir, makedirs
-from os.path import join
+from json import dumps, load
+from os import listdir, makedirs, stat
+from os.path import exists, join
 from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Event, Thread
+from time import monotonic, sleep
+from warnings import catch_warnings, simplefilter
 
 import pytest
 
+import file_organizer
+from benchmarks.reorganize import MODES, generate_configuration, run_benchmark
 from file_organizer import (
+    ConfigSchemaError,
+    ContentMatcher,
+    ContentRouter,
+    DirectoryConfigurationStream,
     DirectoryFormatConfig,
+    FileMover,
+    FingerprintCache,
+    JsonContentError,
+    MoveJournal,
+    MovePlan,
+    PlanValidationError,
+    SizeMismatchError,
+    SourceIndex,
     check_json_extension,
     cli_main,
+    copy_file,
+    find_duplicates,
+    iterate_directory_configuration,
+    load_directory_configuration,
     move_files,
+    plan_reorganization,
     reorganize_directory,
     reorganize_directory_from_json,
     reorganize_directory_recursively,
+    validate_directory_configuration,
+    watch_directory,
 )
 
 
@@ -123,3 +148,737 @@ def test_cli_main(directory_and_config: tuple[Path, Path]):
     json_slice = directory_configuration[relative_destination_root_path]
     assert listdir(tmp_destination) == [relative_destination_root_path]
     check_subdir_organization(join(tmp_destination, relative_destination_root_path), json_slice)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [["--recursive"], ["--jobs", "4"], ["--journal", "moves.jsonl", "--dedup", "hardlink"]],
+)
+def test_cli_main_watch_unsupported_options(
+    tmp_path: Path, options: list[str], capsys: pytest.CaptureFixture
+):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(dumps({"logs": {"content": ["*.log"]}}))
+    with pytest.raises(SystemExit):
+        cli_main(["--root_directory", str(tmp_path), "--watch", *options, str(config_path)])
+    assert f"--watch can't be used with {options[0]}" in capsys.readouterr().err
+
+
+def test_iterate_directory_configuration(configuration_slice: tuple[str, DirectoryFormatConfig]):
+    relative_destination_path, json_slice = configuration_slice
+    assert list(iterate_directory_configuration(relative_destination_path, json_slice)) == [
+        ("root_directory", ["file1.txt", "file2.txt"]),
+        (join("root_directory", "sub_dir"), ["file3.txt"]),
+    ]
+
+
+@pytest.mark.parametrize("number_of_files", [6])
+def test_reorganize_directory_jobs(
+    default_directory: Path, default_directory_configuration: DirectoryFormatConfig
+):
+    tmp_destination = join(default_directory, "test_out")
+    makedirs(tmp_destination)
+    reorganize_directory(
+        default_directory, tmp_destination, default_directory_configuration, True, jobs=4
+    )
+    root_path = join(tmp_destination, "root_directory")
+    assert sorted(listdir(join(root_path, "sub_dir1"))) == ["file1.txt", "file2.txt", "file3.txt"]
+    assert sorted(listdir(join(root_path, "sub_dir2"))) == [
+        "file4.txt",
+        "file5.txt",
+        "sub_sub_dir1",
+    ]
+    assert listdir(join(root_path, "sub_dir2", "sub_sub_dir1")) == ["file6.txt"]
+
+
+@pytest.mark.parametrize("number_of_files", [2])
+def test_reorganize_directory_jobs_warnings_order(default_directory: Path):
+    tmp_destination = join(default_directory, "test_out")
+    makedirs(tmp_destination)
+    missing_files = [f"missing{i}.txt" for i in range(20)]
+    configuration = {"root_directory": {"content": ["file1.txt", *missing_files, "file2.txt"]}}
+    with pytest.warns(UserWarning) as warnings_record:
+        reorganize_directory(default_directory, tmp_destination, configuration, False, jobs=8)
+    assert [str(warning.message) for warning in warnings_record] == [
+        f"tried to move file {join(default_directory, file)} but wasn't found, skipping."
+        for file in missing_files
+    ]
+    assert sorted(listdir(join(tmp_destination, "root_directory"))) == ["file1.txt", "file2.txt"]
+
+
+@pytest.mark.parametrize("number_of_files", [6])
+def test_reorganize_directory_statistics(
+    default_directory: Path, default_directory_configuration: DirectoryFormatConfig
+):
+    tmp_destination = join(default_directory, "test_out")
+    makedirs(tmp_destination)
+    statistics = reorganize_directory(
+        default_directory, tmp_destination, default_directory_configuration, True
+    )
+    assert statistics["rename"].files == 6
+    assert statistics["copy"].files == 0
+
+
+def test_copy_file(tmp_path: Path):
+    source = tmp_path / "source.bin"
+    source.write_bytes(bytes(range(256)) * 4099)
+    destination = tmp_path / "destination.bin"
+    assert copy_file(str(source), str(destination)) == 256 * 4099
+    assert destination.read_bytes() == source.read_bytes()
+    assert stat(destination).st_mtime == stat(source).st_mtime
+
+
+def test_copy_file_size_mismatch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    source = tmp_path / "source.bin"
+    source.write_bytes(b"content")
+    destination = tmp_path / "destination.bin"
+    # the copy strategies write nothing
+    monkeypatch.setattr(file_organizer, "_copy_with", lambda copy_range, fsrc, fdst: 0)
+    monkeypatch.setattr(file_organizer, "copyfileobj", lambda fsrc, fdst, length: None)
+    with pytest.raises(SizeMismatchError):
+        copy_file(str(source), str(destination))
+    assert not exists(destination)
+    assert source.read_bytes() == b"content"
+
+
+def test_file_mover_across_devices(tmp_path: Path):
+    if not exists("/dev/shm") or stat("/dev/shm").st_dev == stat(tmp_path).st_dev:
+        pytest.skip("needs a directory on another device")
+    source = tmp_path / "source.txt"
+    source.write_text("moved")
+    with TemporaryDirectory(dir="/dev/shm") as target_dir:
+        file_mover = FileMover(str(tmp_path), target_dir)
+        assert not file_mover.same_device
+        file_mover.move(str(source), join(target_dir, "source.txt"))
+        assert not exists(source)
+        assert Path(target_dir, "source.txt").read_text() == "moved"
+    assert file_mover.statistics["copy"].files == 1
+    assert file_mover.statistics["copy"].bytes == len("moved")
+
+
+@pytest.mark.parametrize("number_of_files", [3])
+def test_plan_reorganization(default_directory: Path):
+    makedirs(join(default_directory, "nested"))
+    (default_directory / "nested" / "file4.txt").write_text("")
+    tmp_destination = join(default_directory, "test_out")
+    makedirs(tmp_destination)
+    configuration = {
+        "root_directory": {
+            "content": ["file1.txt", "missing.txt"],
+            "sub_dir": {"content": ["file2.txt", "file1.txt", join("nested", "file4.txt")]},
+        }
+    }
+    plan = plan_reorganization(default_directory, tmp_destination, configuration, True)
+    sub_dir = join("root_directory", "sub_dir")
+    assert plan.clean_directories == ["root_directory"]
+    assert plan.directories == ["root_directory", sub_dir]
+    assert plan.moves == [
+        ("file1.txt", "root_directory"),
+        ("file2.txt", sub_dir),
+        (join("nested", "file4.txt"), sub_dir),
+    ]
+    assert plan.missing == ["missing.txt"]
+    assert plan.duplicates == [("file1.txt", sub_dir)]
+    # nothing is touched while planning
+    assert listdir(tmp_destination) == []
+
+
+@pytest.mark.parametrize("number_of_files", [3])
+def test_plan_reorganization_collision(default_directory: Path):
+    (default_directory / "root_directory").write_text("")
+    with pytest.raises(PlanValidationError):
+        plan_reorganization(
+            default_directory,
+            default_directory,
+            {"root_directory": {"content": ["file1.txt"]}},
+            False,
+        )
+
+
+@pytest.mark.parametrize("number_of_files", [2])
+def test_plan_reorganization_collision_in_target(default_directory: Path):
+    target = default_directory / "target"
+    makedirs(target / "cleaned" / "sub")
+    (target / "root_directory").write_text("")
+    (target / "existing").mkdir()
+    (target / "existing" / "sub").write_text("")
+    configuration = {
+        "root_directory": {"content": ["file1.txt"]},
+        "existing": {"sub": {"deeper": {"content": ["file2.txt"]}}},
+        "cleaned": {"sub": {"content": []}},
+    }
+    with pytest.raises(PlanValidationError) as error:
+        plan_reorganization(default_directory, target, configuration, False)
+    assert str(error.value).endswith(f"root_directory, {join('existing', 'sub')}")
+    # existing is deleted first, root_directory is a file and can't be deleted as a directory
+    with pytest.raises(PlanValidationError) as error:
+        reorganize_directory(default_directory, target, configuration, True)
+    assert str(error.value).endswith("root_directory")
+    # nothing was deleted
+    assert exists(target / "cleaned" / "sub")
+    assert exists(target / "existing" / "sub")
+
+    # a file in a directory deleted first is not a collision
+    (target / "cleaned" / "sub").rmdir()
+    (target / "cleaned" / "sub").write_text("")
+    plan_reorganization(default_directory, target, {"cleaned": {"sub": {"content": []}}}, True)
+    with pytest.raises(PlanValidationError):
+        plan_reorganization(default_directory, target, {"cleaned": {"sub": {"content": []}}}, False)
+
+
+@pytest.mark.parametrize("number_of_files", [6])
+def test_cli_main_dry_run_and_load_plan(
+    directory_and_config: tuple[Path, Path], capsys: pytest.CaptureFixture
+):
+    default_directory, config_path = directory_and_config
+    tmp_destination = join(default_directory, "test_out")
+    makedirs(tmp_destination)
+    plan_path = join(default_directory, "plan.json")
+    cli_main(
+        [
+            "--root_directory",
+            str(default_directory),
+            "--target_directory",
+            str(tmp_destination),
+            "--dry_run",
+            "--save_plan",
+            plan_path,
+            str(config_path),
+        ]
+    )
+    assert listdir(tmp_destination) == []
+    printed = capsys.readouterr().out
+    destination = join(tmp_destination, "root_directory", "sub_dir1", "file1.txt")
+    assert f"move {join(default_directory, 'file1.txt')} -> {destination}" in printed
+
+    plan = MovePlan.load(plan_path)
+    assert len(plan.moves) == 6
+    cli_main(["--load_plan", plan_path])
+    assert sorted(listdir(join(tmp_destination, "root_directory", "sub_dir1"))) == [
+        "file1.txt",
+        "file2.txt",
+        "file3.txt",
+    ]
+
+
+def test_content_matcher():
+    matcher = ContentMatcher(["*.log", r"re:^build_\d+\.tar$", "build_*"])
+    assert matcher.match("server.log") == 0
+    assert matcher.match("build_12.tar") == 1
+    assert matcher.match("build_x.tar") == 2
+    assert matcher.match("server.log.1") is None
+    with pytest.raises(JsonContentError):
+        ContentMatcher(["re:build_(\\d"])
+
+
+def test_content_matcher_regex_groups_and_flags():
+    # patterns that can't be alternatives of a single regular expression
+    matcher = ContentMatcher(
+        ["*.log", "re:(?i)readme.*", r"re:(a)\1b", "re:(?P<x>c)", "re:(?P<x>d)"]
+    )
+    assert matcher.match("README.md") == 1
+    assert matcher.match("aab") == 2
+    assert matcher.match("d") == 4
+    assert matcher.match("server.log") == 0
+    assert matcher.match("ab") is None
+
+
+@pytest.mark.parametrize("number_of_files", [3])
+def test_reorganize_directory_patterns(default_directory: Path):
+    for name in ("a.log", "b.log", "build_1.tar", "build_22.tar", "build_x.tar"):
+        (default_directory / name).write_text("")
+    tmp_destination = join(default_directory, "test_out")
+    makedirs(tmp_destination)
+    configuration = {
+        "root_directory": {
+            "content": ["*.txt", "a.log"],
+            "logs": {"content": ["*.log"]},
+            "builds": {"content": [r"re:^build_\d+\.tar$", "*.zip"]},
+        }
+    }
+    with pytest.warns(UserWarning, match=r"pattern \*\.zip didn't match any file"):
+        reorganize_directory(default_directory, tmp_destination, configuration, False)
+    root_path = join(tmp_destination, "root_directory")
+    assert sorted(listdir(root_path)) == [
+        "a.log",
+        "builds",
+        "file1.txt",
+        "file2.txt",
+        "file3.txt",
+        "logs",
+    ]
+    assert listdir(join(root_path, "logs")) == ["b.log"]
+    assert sorted(listdir(join(root_path, "builds"))) == ["build_1.tar", "build_22.tar"]
+    assert exists(join(default_directory, "build_x.tar"))
+
+
+@pytest.mark.parametrize("number_of_files", [6])
+def test_reorganize_directory_resumed_from_journal(
+    default_directory: Path,
+    default_directory_configuration: DirectoryFormatConfig,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    tmp_destination = join(default_directory, "test_out")
+    makedirs(tmp_destination)
+    journal_path = join(default_directory, "moves.jsonl")
+    original_move = FileMover.move
+    moved = []
+
+    def interrupted_move(self, source, destination):
+        if len(moved) == 3:
+            raise KeyboardInterrupt()
+        original_move(self, source, destination)
+        moved.append(destination)
+
+    monkeypatch.setattr(FileMover, "move", interrupted_move)
+    with pytest.raises(KeyboardInterrupt):
+        reorganize_directory(
+            default_directory,
+            tmp_destination,
+            default_directory_configuration,
+            True,
+            journal_path=journal_path,
+        )
+    monkeypatch.setattr(FileMover, "move", original_move)
+    with open(journal_path, encoding="utf-8") as journal_file:
+        assert len(journal_file.readlines()) == 3
+
+    # resuming neither deletes the moved files nor reports them as missing
+    with catch_warnings():
+        simplefilter("error")
+        reorganize_directory(
+            default_directory,
+            tmp_destination,
+            default_directory_configuration,
+            True,
+            journal_path=journal_path,
+        )
+    with open(journal_path, encoding="utf-8") as journal_file:
+        assert journal_file.readlines()[-1] == '"finished"\n'
+    # the journal is finished, running again is not a resumption
+    with pytest.warns(UserWarning, match="wasn't found"):
+        reorganize_directory(
+            default_directory,
+            tmp_destination,
+            default_directory_configuration,
+            False,
+            journal_path=journal_path,
+        )
+    with open(journal_path, encoding="utf-8") as journal_file:
+        assert journal_file.readlines() == ['"finished"\n']
+    root_path = join(tmp_destination, "root_directory")
+    assert sorted(listdir(join(root_path, "sub_dir1"))) == [
+        "file1.txt",
+        "file2.txt",
+        "file3.txt",
+    ]
+    assert sorted(listdir(join(root_path, "sub_dir2"))) == [
+        "file4.txt",
+        "file5.txt",
+        "sub_sub_dir1",
+    ]
+    assert listdir(join(root_path, "sub_dir2", "sub_sub_dir1")) == ["file6.txt"]
+
+
+def test_reorganize_directory_recursive_resumed_from_journal(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    source, target = tmp_path / "source", tmp_path / "target"
+    (source / "sub").mkdir(parents=True)
+    target.mkdir()
+    for name in ("a.txt", "b.txt"):
+        (source / "sub" / name).write_text(name)
+    configuration = {"dest": {"content": ["a.txt", "b.txt"]}}
+    journal_path = str(tmp_path / "moves.jsonl")
+    original_move = FileMover.move
+
+    def interrupted_move(self, source, destination):
+        if destination.endswith("b.txt"):
+            raise KeyboardInterrupt()
+        original_move(self, source, destination)
+
+    monkeypatch.setattr(FileMover, "move", interrupted_move)
+    with pytest.raises(KeyboardInterrupt):
+        reorganize_directory(
+            source, target, configuration, False, journal_path=journal_path, recursive=True
+        )
+    monkeypatch.setattr(FileMover, "move", original_move)
+
+    # a.txt was moved from sub, it's not reported as missing
+    with catch_warnings():
+        simplefilter("error")
+        reorganize_directory(
+            source, target, configuration, False, journal_path=journal_path, recursive=True
+        )
+    assert sorted(listdir(target / "dest")) == ["a.txt", "b.txt"]
+    assert listdir(source / "sub") == []
+
+
+def test_move_journal_truncated_line(tmp_path: Path):
+    destination = tmp_path / "moved.txt"
+    destination.write_text("moved")
+    journal_path = tmp_path / "moves.jsonl"
+    with MoveJournal(journal_path) as journal:
+        journal.record("source.txt", str(destination))
+    with open(journal_path, "a", encoding="utf-8") as journal_file:
+        journal_file.write('["other.txt", "oth')
+
+    with MoveJournal(journal_path) as journal:
+        assert journal.is_done("source.txt", str(destination))
+        assert not journal.is_done("other.txt", str(destination))
+    assert journal_path.read_text().endswith("]\n")
+    destination.write_text("changed")
+    with MoveJournal(journal_path) as journal:
+        assert not journal.is_done("source.txt", str(destination))
+
+    with MoveJournal(journal_path) as journal:
+        journal.finish()
+    with MoveJournal(journal_path) as journal:
+        assert not journal.resuming
+        assert not journal.is_done("source.txt")
+    assert journal_path.read_text() == ""
+
+    journal_path.write_text('"finished"\n["source.txt", "moved.txt", 1, 1]\n')
+    with pytest.raises(JsonContentError):
+        MoveJournal(journal_path)
+    journal_path.write_text("not a journal\n")
+    with pytest.raises(JsonContentError):
+        MoveJournal(journal_path)
+
+
+def test_source_index(tmp_path: Path):
+    for directory, name in [("b", "x.txt"), ("a/deep", "x.txt"), ("a", "y.txt"), ("c", "z.txt")]:
+        makedirs(tmp_path / directory, exist_ok=True)
+        (tmp_path / directory / name).write_text("")
+    index = SourceIndex(tmp_path, ["a", "b", "c"], ["x.txt", "y.txt", "w.txt"], ["c"])
+    # the file closest to the root wins
+    assert index.get("x.txt") == join("b", "x.txt")
+    assert index.get("y.txt") == join("a", "y.txt")
+    assert index.get("z.txt") is None
+    assert index.get("w.txt") is None
+    assert index.paths == {"x.txt": join("b", "x.txt"), "y.txt": join("a", "y.txt")}
+
+
+@pytest.mark.parametrize("number_of_files", [2])
+def test_reorganize_directory_recursive(default_directory: Path):
+    makedirs(default_directory / "nested" / "deeper")
+    (default_directory / "nested" / "file3.txt").write_text("")
+    (default_directory / "nested" / "deeper" / "a.log").write_text("")
+    (default_directory / "nested" / "deeper" / "file1.txt").write_text("")
+    configuration = {
+        "root_directory": {
+            "content": ["file1.txt", "file3.txt"],
+            "logs": {"content": ["*.log"]},
+        }
+    }
+    plan = plan_reorganization(default_directory, default_directory, configuration, False)
+    assert plan.missing == ["file3.txt"]
+    assert plan.unmatched_patterns == ["*.log"]
+
+    plan = plan_reorganization(
+        default_directory, default_directory, configuration, False, recursive=True
+    )
+    assert plan.moves == [
+        ("file1.txt", "root_directory"),
+        ("file3.txt", "root_directory"),
+        ("a.log", "root_directory/logs"),
+    ]
+    # the file listed by name is found in the root directory first
+    assert plan.sources == {
+        "file3.txt": join("nested", "file3.txt"),
+        "a.log": join("nested", "deeper", "a.log"),
+    }
+    assert MovePlan.from_dict(plan.to_dict()).file_moves() == plan.file_moves()
+
+    reorganize_directory(default_directory, default_directory, configuration, False, recursive=True)
+    root_path = join(default_directory, "root_directory")
+    assert sorted(listdir(root_path)) == ["file1.txt", "file3.txt", "logs"]
+    assert listdir(join(root_path, "logs")) == ["a.log"]
+    assert listdir(join(default_directory, "nested", "deeper")) == ["file1.txt"]
+
+    # the directories of the configuration are not looked into
+    plan = plan_reorganization(
+        default_directory, default_directory, configuration, False, recursive=True
+    )
+    assert plan.moves == [("file1.txt", "root_directory")]
+    assert plan.sources == {"file1.txt": join("nested", "deeper", "file1.txt")}
+    assert plan.missing == ["file3.txt"]
+
+
+def test_directory_configuration_stream(
+    tmp_path: Path, default_directory_configuration: DirectoryFormatConfig
+):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(dumps(default_directory_configuration, indent=4))
+    expected = [
+        configuration_directory
+        for root_key, json_slice in default_directory_configuration.items()
+        for configuration_directory in iterate_directory_configuration(root_key, json_slice)
+    ]
+    # tokens and strings split across chunks
+    for chunk_size in (1, 7, 4096):
+        stream = DirectoryConfigurationStream(config_path, chunk_size)
+        # root_directory has no content, its subdirectories are held back until it's closed
+        assert list(stream) == expected
+        assert stream.root_directories == ["root_directory"]
+
+    # deeper than the interpreter recursion limit
+    depth = 5000
+    config_path.write_text('{"d": ' * depth + '{"content": ["file.txt"]}' + "}" * depth)
+    directories = list(DirectoryConfigurationStream(config_path, 1024))
+    assert len(directories) == depth
+    assert directories[0] == ("d", [])
+    assert directories[-1] == (join(*["d"] * depth), ["file.txt"])
+
+    # a subdirectory listed before the content of its parent comes after it, as in a dict
+    configuration = {"root": {"sub": {"content": ["a.txt"]}, "content": ["a.txt"]}}
+    config_path.write_text(dumps(configuration))
+    assert list(DirectoryConfigurationStream(config_path)) == [
+        ("root", ["a.txt"]),
+        (join("root", "sub"), ["a.txt"]),
+    ]
+    for directory_configuration in (configuration, DirectoryConfigurationStream(config_path)):
+        plan = plan_reorganization(tmp_path, tmp_path, directory_configuration, False)
+        assert plan.duplicates == [("a.txt", join("root", "sub"))]
+
+
+@pytest.mark.parametrize(
+    "content, error",
+    [
+        ('{"root": {"content": ["a.txt"]', JsonContentError),
+        ('{"root": {"content": ["a.txt"]}} {}', JsonContentError),
+        ('{"root": {"content": [a.txt]}}', JsonContentError),
+        ('{"root": []}', ConfigSchemaError),
+        ('{"root": {"content": ["a.txt", 1]}}', ConfigSchemaError),
+        ('{"root": {"content": "a.txt"}}', ConfigSchemaError),
+        ('{"content": ["a.txt"]}', ConfigSchemaError),
+        ('{"root": {"sub": {}, "sub": {}}}', ConfigSchemaError),
+        ("[]", ConfigSchemaError),
+    ],
+)
+def test_directory_configuration_stream_errors(tmp_path: Path, content: str, error: type):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(content)
+    with pytest.raises(error):
+        list(DirectoryConfigurationStream(config_path))
+
+
+def test_validate_directory_configuration(
+    tmp_path: Path, default_directory_configuration: DirectoryFormatConfig
+):
+    validate_directory_configuration(default_directory_configuration)
+    for configuration in (
+        [],
+        {"root": []},
+        {"root": {"content": ["a.txt", 1]}},
+        {"root": {"sub": {"": {}}}},
+        {"content": ["a.txt"]},
+    ):
+        with pytest.raises(ConfigSchemaError):
+            validate_directory_configuration(configuration)
+
+    config_path = tmp_path / "config.json"
+    config_path.write_text(dumps({"root": {"content": "a.txt"}}))
+    with pytest.raises(ConfigSchemaError):
+        load_directory_configuration(config_path)
+
+
+@pytest.mark.parametrize("number_of_files", [2])
+def test_reorganize_directory_invalid_configuration(default_directory: Path):
+    tmp_destination = join(default_directory, "test_out")
+    makedirs(tmp_destination)
+    config_path = default_directory / "config.json"
+    config_path.write_text('{"root_directory": {"content": ["file1.txt"]}, "other": 1}')
+    with pytest.raises(ConfigSchemaError):
+        reorganize_directory_from_json(default_directory, tmp_destination, config_path, False)
+    # the files listed before the error are not moved
+    assert listdir(tmp_destination) == []
+    assert exists(default_directory / "file1.txt")
+
+
+def test_generate_configuration():
+    configuration = generate_configuration(25, 2, fanout=2)
+    assert configuration == {
+        "root": {
+            "dir0": {"content": [f"file{index}.txt" for index in range(0, 25, 2)]},
+            "dir1": {"content": [f"file{index}.txt" for index in range(1, 25, 2)]},
+        }
+    }
+    validate_directory_configuration(configuration)
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("depth", [1, 3])
+def test_benchmark_reorganize(tmp_path: Path, mode: str, depth: int):
+    result = run_benchmark(100, depth, mode, jobs=4, size=16, directory=tmp_path)
+    strategy = "copy" if mode == "copy" else "rename"
+    assert result["strategies"][strategy] == 100
+    assert result["audited_os_calls"]["os.remove" if mode == "copy" else "os.rename"] == 100
+    assert result["audited_os_calls_per_file"] >= 1
+
+
+def test_find_duplicates(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    contents = {"a": "same", "b": "diff", "c": "same", "d": "", "e": "", "f": "other content"}
+    for name, content in contents.items():
+        (tmp_path / name).write_text(content)
+    sources = [str(tmp_path / name) for name in [*contents, "missing"]]
+    cache_path = tmp_path / "cache.json"
+    cache = FingerprintCache(cache_path)
+    # empty files are never duplicates, f has a size of its own and is not hashed
+    assert find_duplicates(sources, jobs=2, cache=cache) == {sources[2]: sources[0]}
+    assert len(cache.hashes) == 3
+    cache.save()
+
+    hashed = []
+    monkeypatch.setattr(file_organizer, "hash_file", lambda path: hashed.append(path) or "")
+    assert find_duplicates(sources, cache=FingerprintCache(cache_path)) == {sources[2]: sources[0]}
+    assert hashed == []
+    (tmp_path / "b").write_text("same")
+    find_duplicates(sources, cache=FingerprintCache(cache_path))
+    assert hashed == [sources[1]]
+
+
+def test_find_duplicates_links(tmp_path: Path):
+    (tmp_path / "a").write_text("same")
+    (tmp_path / "b").hardlink_to(tmp_path / "a")
+    (tmp_path / "c").write_text("same")
+    (tmp_path / "link").symlink_to(tmp_path / "a")
+    sources = [str(tmp_path / name) for name in ("a", "link", "b", "c")]
+    # b is a, link is moved as a link
+    assert find_duplicates(sources) == {sources[3]: sources[0]}
+    # hardlinks of a single file are not hashed
+    assert find_duplicates(sources[:3]) == {}
+
+
+def test_reorganize_directory_dedup_symlink(tmp_path: Path):
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "a.bin").write_text("blob")
+    (source / "link.bin").symlink_to("a.bin")
+    configuration = {"first": {"content": ["a.bin"]}, "second": {"content": ["link.bin"]}}
+    statistics = reorganize_directory(source, tmp_path, configuration, False, link_mode="hardlink")
+    assert statistics["hardlink"].files == 0
+    assert (tmp_path / "second" / "link.bin").is_symlink()
+    assert stat(tmp_path / "first" / "a.bin").st_nlink == 1
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_reorganize_directory_dedup(tmp_path: Path, jobs: int):
+    source = tmp_path / "source"
+    source.mkdir()
+    contents = {"a.bin": "blob", "b.bin": "blob", "c.bin": "other", "d.bin": "blob"}
+    for name, content in contents.items():
+        (source / name).write_text(content)
+    configuration = {
+        "first": {"content": ["b.bin", "c.bin"]},
+        "second": {"content": ["a.bin"], "third": {"content": ["d.bin"]}},
+    }
+    statistics = reorganize_directory(
+        source, tmp_path, configuration, False, jobs=jobs, link_mode="hardlink"
+    )
+    assert listdir(source) == []
+    assert statistics["rename"].files == 2
+    assert statistics["hardlink"].files == 2
+    first = stat(tmp_path / "first" / "b.bin")
+    assert first.st_nlink == 3
+    for duplicate in ("second/a.bin", "second/third/d.bin"):
+        assert stat(tmp_path / duplicate).st_ino == first.st_ino
+    assert (tmp_path / "second" / "a.bin").read_text() == "blob"
+    assert stat(tmp_path / "first" / "c.bin").st_nlink == 1
+
+
+def test_reorganize_directory_dedup_reflink(tmp_path: Path):
+    source = tmp_path / "source"
+    source.mkdir()
+    for name in ("a.bin", "b.bin"):
+        (source / name).write_text("blob")
+    configuration = {"first": {"content": ["a.bin"]}, "second": {"content": ["b.bin"]}}
+    statistics = reorganize_directory(source, tmp_path, configuration, False, link_mode="reflink")
+    # moved if the filesystem has no reflinks
+    assert statistics["rename"].files + statistics["reflink"].files == 2
+    assert (tmp_path / "second" / "b.bin").read_text() == "blob"
+    assert stat(tmp_path / "second" / "b.bin").st_nlink == 1
+    assert listdir(source) == []
+
+
+def test_content_router():
+    router = ContentRouter(
+        {
+            "logs": {"content": ["*.log", "main.txt"], "old": {"content": ["re:^old_.*"]}},
+            "docs": {"content": ["main.txt", "old_notes.log", "sub/path.txt"]},
+        }
+    )
+    assert router.route("main.txt") == "logs"
+    assert router.route("old_notes.log") == "docs"
+    assert router.route("a.log") == "logs"
+    assert router.route("old_a.txt") == join("logs", "old")
+    assert router.route("*.log") == "logs"
+    assert router.route("path.txt") is None
+    assert router.route("other.txt") is None
+
+
+def wait_for(path: Path, timeout: float = 5) -> bool:
+    deadline = monotonic() + timeout
+    while not path.exists():
+        if monotonic() > deadline:
+            return False
+        sleep(0.01)
+    return True
+
+
+@pytest.mark.parametrize("poll_interval", [None, 0.05])
+def test_watch_directory(tmp_path: Path, poll_interval: float):
+    source, target = tmp_path / "source", tmp_path / "target"
+    source.mkdir()
+    target.mkdir()
+    (source / "before.log").write_text("")
+    configuration = {"logs": {"content": ["*.log"]}, "data": {"content": ["data.csv"]}}
+    stop = Event()
+    statistics = {}
+    watcher = Thread(
+        target=lambda: statistics.update(
+            watch_directory(source, target, configuration, poll_interval=poll_interval, stop=stop)
+        )
+    )
+    watcher.start()
+    try:
+        # reorganized when the watch starts
+        assert wait_for(target / "logs" / "before.log")
+        (source / "data.csv").write_text("a,b\n")
+        (source / "unknown.txt").write_text("")
+        (tmp_path / "moved.log").write_text("")
+        (tmp_path / "moved.log").rename(source / "moved.log")
+        assert wait_for(target / "data" / "data.csv")
+        assert wait_for(target / "logs" / "moved.log")
+    finally:
+        stop.set()
+        watcher.join()
+    assert (target / "data" / "data.csv").read_text() == "a,b\n"
+    assert listdir(source) == ["unknown.txt"]
+    assert statistics["rename"].files == 3
+
+
+def test_watch_directory_move_error(tmp_path: Path):
+    source, target = tmp_path / "source", tmp_path / "target"
+    source.mkdir()
+    (target / "logs" / "blocked.log").mkdir(parents=True)
+    (source / "before.log").write_text("")
+    configuration = {"logs": {"content": ["*.log"]}}
+    stop = Event()
+    watcher = Thread(
+        target=lambda: watch_directory(source, target, configuration, poll_interval=0.05, stop=stop)
+    )
+    with pytest.warns(UserWarning, match="blocked.log"):
+        watcher.start()
+        try:
+            # blocked.log arrives once the watch is started
+            assert wait_for(target / "logs" / "before.log")
+            (source / "blocked.log").write_text("")
+            sleep(0.2)
+            # the watch goes on after a file that can't be moved
+            (source / "after.log").write_text("")
+            assert wait_for(target / "logs" / "after.log")
+        finally:
+            stop.set()
+            watcher.join()
+    assert listdir(source) == ["blocked.log"]
@@ -1,216 +1,3088 @@
-from copy import copy
-import random
-from time import time_ns
-import itertools
-
-counter = itertools.count()
-
-
-class Element:
-    __id: int
-    ordering_value: int
-    string_content: str
-
-    def __init__(self, ordering_value: int, string_content: str) -> None:
-        self.__id = next(counter)
-        self.ordering_value = ordering_value
-        self.string_content = string_content
-
-    def get_id(self):
-        return self.__id
-
-    def __str__(self) -> str:
-        return f"{self.string_content} -> {self.ordering_value}"
-
-    def __repr__(self) -> str:
-        return f"<SmartElement({self.ordering_value}, {self.string_content}) and __id = {self.__id}>"
-
-
-class SmartElement(Element):
-    def __eq__(self, __o: Element | int) -> bool:
-        if type(__o) == int:
-            return self.ordering_value == __o
-        return self.ordering_value == __o.ordering_value
-
-    def __ne__(self, __o: Element | int) -> bool:
-        return not self.__eq__(__o)
-
-    def __gt__(self, __o: Element | int) -> bool:
-        if type(__o) == int:
-            return self.ordering_value > __o
-        return self.ordering_value > __o.ordering_value
-
-    def __lt__(self, __o: Element | int) -> bool:
-        if type(__o) == int:
-            return self.ordering_value < __o
-        return self.ordering_value < __o.ordering_value
-
-    def __ge__(self, __o: Element | int) -> bool:
-        if type(__o) == int:
-            return self.ordering_value >= __o
-        return self.ordering_value >= __o.ordering_value
-
-    def __le__(self, __o: Element | int) -> bool:
-        if type(__o) == int:
-            return self.ordering_value <= __o
-        return self.ordering_value <= __o.ordering_value
-
-    def __mod__(self, __o: Element | int) -> int:
-        if type(__o) == int:
-            return self.ordering_value % __o
-        return self.ordering_value % __o.ordering_value
-
-
-class IdSeries(tuple):
-    def __contains__(self, key) -> bool:
-        key_type = type(key)
-        if key_type == int:
-            return super().__contains__(key)
-        elif issubclass(key.__class__, Element):
-            return super().__contains__(key.get_id())
-        else:
-            raise ValueError(f"Not yet implemented for {key_type.__name__}")
-
-
-class ElementList:
-    elements: list[SmartElement] = []
-
-    def __init__(self, list: list[SmartElement]) -> None:
-        self.elements = list
-
-
-class SmartElementList(ElementList):
-    def get_id_series(self) -> IdSeries:
-        return IdSeries(el.get_id() for el in self.elements)
-
-    def __contains__(self, key) -> bool:
-        key_type = type(key)
-        if issubclass(key_type, SmartElement):
-            for el in self.elements:
-                if el.get_id() == key.get_id():
-                    return True
-            return False
-        else:
-            raise ValueError(f"Not yet implemented for {key_type.__name__}")
-
-    def __getitem__(self, key) -> "SmartElementList":
-        key_type = type(key)
-        if key_type == int:
-            return self.__class__([self.elements[key]])
-        elif key_type == slice:
-            return self.__class__(self.elements[key])
-        elif key_type == IdSeries:
-            return self.__class__([el for el in self.elements if el in key])
-        elif issubclass(key.__class__, ElementList):
-            return self.__class__([el for el in self.elements if el in key])
-        else:
-            raise ValueError(f"Not yet implemented for {key_type.__name__}")
-
-    def __add__(self, __o: SmartElement) -> "SmartElementList":
-        key_type = type(__o)
-        if issubclass(key_type, SmartElement):
-            out = self.copy()
-            out.elements.append(__o)
-            return out
-        else:
-            raise ValueError(f"Not yet implemented for {key_type.__name__}")
-
-    def __sub__(self, __o: SmartElement) -> "SmartElementList":
-        key_type = type(__o)
-        if issubclass(key_type, SmartElement):
-            out_ids = self.get_id_series()
-            indx = out_ids.index(__o.get_id())
-            return self[IdSeries(out_ids[:indx] + out_ids[indx + 1 :])]
-        else:
-            raise ValueError(f"Not yet implemented for {key_type.__name__}")
-
-    def __eq__(self, __o: int) -> "IdSeries":
-        return IdSeries(el.get_id() for el in self.elements if el == __o)
-
-    def __ne__(self, __o: int) -> "IdSeries":
-        return IdSeries(el.get_id() for el in self.elements if el != __o)
-
-    def __gt__(self, __o: int) -> "IdSeries":
-        return IdSeries(el.get_id() for el in self.elements if el > __o)
-
-    def __lt__(self, __o: int) -> "IdSeries":
-        return IdSeries(el.get_id() for el in self.elements if el < __o)
-
-    def __ge__(self, __o: int) -> "IdSeries":
-        return IdSeries(el.get_id() for el in self.elements if el >= __o)
-
-    def __le__(self, __o: int) -> "IdSeries":
-        return IdSeries(el.get_id() for el in self.elements if el <= __o)
-
-    def eq(self, __o: int | Element) -> "SmartElementList":
-        return self.__class__([el for el in self.elements if el == __o])
-
-    def ne(self, __o: int | Element) -> "SmartElementList":
-        return self.__class__([el for el in self.elements if el != __o])
-
-    def gt(self, __o: int | Element) -> "SmartElementList":
-        return self.__class__([el for el in self.elements if el > __o])
-
-    def lt(self, __o: int | Element) -> "SmartElementList":
-        return self.__class__([el for el in self.elements if el < __o])
-
-    def ge(self, __o: int | Element) -> "SmartElementList":
-        return self.__class__([el for el in self.elements if el >= __o])
-
-    def le(self, __o: int | Element) -> "SmartElementList":
-        return self.__class__([el for el in self.elements if el <= __o])
-
-    def copy(self) -> "SmartElementList":
-        return self.__class__([copy(el) for el in self.elements])
-
-    def __mod__(self, __o: int) -> "SmartElementList":
-        out = []
-        for el in self.copy().elements:
-            el.ordering_value = el % __o
-            out.append(el)
-        return self.__class__(out)
-
-    def __str__(self) -> str:
-        return f"{[str(e) for e in self.elements]}"
-
-    def __repr__(self) -> str:
-        return f"{[repr(e) for e in self.elements]}"
-
-    def scramble(self) -> None:
-        random.seed(time_ns())
-        random.shuffle(self.elements)
-
-    def sort(self, reverse: bool = False) -> None:
-        self.elements.sort(reverse=reverse)
-
-
-element_list = [
-    SmartElement(1, "Hey"),
-    SmartElement(2, "Hey"),
-    SmartElement(3, "You"),
-    SmartElement(4, "Hello"),
-    SmartElement(5, "Rock"),
-    SmartElement(6, "World"),
-]
-
-
-def _example():
-    elements = SmartElementList(element_list)
-    el = SmartElement(9, "Added later")
-    els = elements + el
-    print(els)
-    el2 = SmartElement(9, "Added later 2")
-    try:
-        els = els - el2
-    except ValueError:
-        print("Can't do that, those items have different ids!!")
-        print(f"{repr(el)} != {repr(el2)}")
-    els += el2
-    els -= el
-    print(els)
-    print(elements[elements % 2 == 1])
-    print(elements[elements == 1])
-
-
-if __name__ == "__main__":
-    _example()
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+import csv
+import json
+import mmap
+import multiprocessing
+import operator
+import os
+import random
+import struct
+import tracemalloc
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress, repeat
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from sys import argv, byteorder
+from threading import Lock
+from time import perf_counter, time_ns
+import itertools
+from typing import Any, Callable, Iterable, Iterator
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, columns fall back to the array module
+    np = None
+
+
+class IdCounter:
+    """
+    Source of the element ids, like itertools.count, but a range of ids can be
+    reserved at once by the bulk constructors instead of calling next() for each row
+    """
+
+    __slots__ = ("_count", "_lock")
+
+    def __init__(self, start: int = 0) -> None:
+        self._count = itertools.count(start)
+        self._lock = Lock()
+
+    def __iter__(self) -> "IdCounter":
+        return self
+
+    def __next__(self) -> int:
+        with self._lock:
+            return next(self._count)
+
+    def reserve(self, number_of_ids: int) -> range:
+        """number_of_ids consecutive ids, never returned again"""
+        with self._lock:
+            start = next(self._count)
+            self._count = itertools.count(start + number_of_ids)
+        return range(start, start + number_of_ids)
+
+    def advance(self, past: int) -> None:
+        """Make sure the next ids are greater than past, for rows loaded with their ids"""
+        with self._lock:
+            start = next(self._count)
+            self._count = itertools.count(max(start, past + 1))
+
+
+counter = IdCounter()
+
+
+class Element:
+    __id: int
+    ordering_value: int
+    string_content: str
+
+    def __init__(self, ordering_value: int, string_content: str) -> None:
+        self.__id = next(counter)
+        self.ordering_value = ordering_value
+        self.string_content = string_content
+
+    def get_id(self):
+        return self.__id
+
+    def __str__(self) -> str:
+        return f"{self.string_content} -> {self.ordering_value}"
+
+    def __repr__(self) -> str:
+        return f"<SmartElement({self.ordering_value}, {self.string_content}) and __id = {self.__id}>"
+
+
+class SmartElement(Element):
+    def __eq__(self, __o: Element | int) -> bool:
+        if type(__o) == int:
+            return self.ordering_value == __o
+        return self.ordering_value == __o.ordering_value
+
+    def __ne__(self, __o: Element | int) -> bool:
+        return not self.__eq__(__o)
+
+    def __gt__(self, __o: Element | int) -> bool:
+        if type(__o) == int:
+            return self.ordering_value > __o
+        return self.ordering_value > __o.ordering_value
+
+    def __lt__(self, __o: Element | int) -> bool:
+        if type(__o) == int:
+            return self.ordering_value < __o
+        return self.ordering_value < __o.ordering_value
+
+    def __ge__(self, __o: Element | int) -> bool:
+        if type(__o) == int:
+            return self.ordering_value >= __o
+        return self.ordering_value >= __o.ordering_value
+
+    def __le__(self, __o: Element | int) -> bool:
+        if type(__o) == int:
+            return self.ordering_value <= __o
+        return self.ordering_value <= __o.ordering_value
+
+    def __mod__(self, __o: Element | int) -> int:
+        if type(__o) == int:
+            return self.ordering_value % __o
+        return self.ordering_value % __o.ordering_value
+
+
+class CompactSmartElement:
+    """
+    SmartElement without a per instance __dict__, its fields are __slots__.
+    Rows materialized from a SmartElementList are CompactSmartElement.\n
+    Comparisons test the class of the operand by identity, int first then
+    CompactSmartElement, any other operand goes through _ordering_operand.
+    """
+
+    __slots__ = ("_id", "ordering_value", "string_content")
+
+    def __init__(self, ordering_value: int, string_content: str) -> None:
+        self._id = next(counter)
+        self.ordering_value = ordering_value
+        self.string_content = string_content
+
+    @classmethod
+    def _from_row(
+        cls, id: int, ordering_value: int, string_content: str
+    ) -> "CompactSmartElement":
+        element = cls.__new__(cls)
+        element._id = id
+        element.ordering_value = ordering_value
+        element.string_content = string_content
+        return element
+
+    def get_id(self) -> int:
+        return self._id
+
+    def __str__(self) -> str:
+        return f"{self.string_content} -> {self.ordering_value}"
+
+    def __repr__(self) -> str:
+        return (
+            f"<SmartElement({self.ordering_value}, {self.string_content}) and __id = {self._id}>"
+        )
+
+    def __eq__(self, __o: "CompactSmartElement | Element | int") -> bool:
+        if __o.__class__ is int:
+            return self.ordering_value == __o
+        if __o.__class__ is CompactSmartElement:
+            return self.ordering_value == __o.ordering_value
+        return self.ordering_value == _ordering_operand(__o)
+
+    def __ne__(self, __o: "CompactSmartElement | Element | int") -> bool:
+        if __o.__class__ is int:
+            return self.ordering_value != __o
+        if __o.__class__ is CompactSmartElement:
+            return self.ordering_value != __o.ordering_value
+        return self.ordering_value != _ordering_operand(__o)
+
+    def __gt__(self, __o: "CompactSmartElement | Element | int") -> bool:
+        if __o.__class__ is int:
+            return self.ordering_value > __o
+        if __o.__class__ is CompactSmartElement:
+            return self.ordering_value > __o.ordering_value
+        return self.ordering_value > _ordering_operand(__o)
+
+    def __lt__(self, __o: "CompactSmartElement | Element | int") -> bool:
+        if __o.__class__ is int:
+            return self.ordering_value < __o
+        if __o.__class__ is CompactSmartElement:
+            return self.ordering_value < __o.ordering_value
+        return self.ordering_value < _ordering_operand(__o)
+
+    def __ge__(self, __o: "CompactSmartElement | Element | int") -> bool:
+        if __o.__class__ is int:
+            return self.ordering_value >= __o
+        if __o.__class__ is CompactSmartElement:
+            return self.ordering_value >= __o.ordering_value
+        return self.ordering_value >= _ordering_operand(__o)
+
+    def __le__(self, __o: "CompactSmartElement | Element | int") -> bool:
+        if __o.__class__ is int:
+            return self.ordering_value <= __o
+        if __o.__class__ is CompactSmartElement:
+            return self.ordering_value <= __o.ordering_value
+        return self.ordering_value <= _ordering_operand(__o)
+
+    def __mod__(self, __o: "CompactSmartElement | Element | int") -> int:
+        if __o.__class__ is int:
+            return self.ordering_value % __o
+        if __o.__class__ is CompactSmartElement:
+            return self.ordering_value % __o.ordering_value
+        return self.ordering_value % _ordering_operand(__o)
+
+
+# accepted wherever an element is expected
+_ELEMENT_TYPES = (Element, CompactSmartElement)
+_SMART_ELEMENT_TYPES = (SmartElement, CompactSmartElement)
+
+
+class IdSeries:
+    """
+    Ids selected by a SmartElementList comparison, stored sorted and unique in an int column.
+    Membership of a single id is a set lookup, selections use the sorted column.
+    """
+
+    __slots__ = ("ids", "_id_set")
+
+    def __init__(self, ids: Iterable[int] = ()) -> None:
+        self.ids = _BACKEND.unique(ids)
+        self._id_set = None
+
+    def id_set(self) -> frozenset[int]:
+        if self._id_set is None:
+            self._id_set = frozenset(_BACKEND.to_list(self.ids))
+        return self._id_set
+
+    def __contains__(self, key) -> bool:
+        key_type = type(key)
+        if key_type == int:
+            return key in self.id_set()
+        elif isinstance(key, _ELEMENT_TYPES):
+            return key.get_id() in self.id_set()
+        else:
+            raise ValueError(f"Not yet implemented for {key_type.__name__}")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(_BACKEND.to_list(self.ids))
+
+    def __getitem__(self, key: int) -> int:
+        return int(self.ids[key])
+
+    def __eq__(self, __o: object) -> bool:
+        if not isinstance(__o, IdSeries):
+            return NotImplemented
+        return _BACKEND.to_list(self.ids) == _BACKEND.to_list(__o.ids)
+
+    def __repr__(self) -> str:
+        return f"IdSeries({_BACKEND.to_list(self.ids)})"
+
+
+# Columns storage
+#
+# SmartElementList keeps ids, ordering_values and string_contents in three contiguous
+# columns instead of a list of SmartElement, operators work on whole columns:
+# comparisons produce boolean masks and filters compress the columns with them.
+# Columns shared between lists are never modified in place, see ElementColumns.
+# IntColumn: numpy int64 array or array("q"), StrColumn: numpy object array or list
+# Mask: numpy bool array or bytearray of 0/1
+
+
+_OPERATOR_SYMBOLS = {
+    operator.eq: "==",
+    operator.ne: "!=",
+    operator.gt: ">",
+    operator.lt: "<",
+    operator.ge: ">=",
+    operator.le: "<=",
+    operator.mod: "%",
+}
+
+
+class PlanStep:
+    """
+    Operation on ordering_value recorded by a LazySmartElementList, either:
+        - a transform, v = op(v, operand)
+        - a filter, rows where op(v, operand) is False are dropped
+    """
+
+    __slots__ = ("op", "operand", "is_filter")
+
+    def __init__(self, op: Callable[[int, int], Any], operand: int, is_filter: bool) -> None:
+        self.op = op
+        self.operand = operand
+        self.is_filter = is_filter
+
+    def __str__(self) -> str:
+        symbol = _OPERATOR_SYMBOLS[self.op]
+        if self.is_filter:
+            return f"filter v {symbol} {self.operand}"
+        return f"v = v {symbol} {self.operand}"
+
+
+class ColumnBackend(ABC):
+    """Operations on the columns, implemented with numpy or with the array module"""
+
+    @abstractmethod
+    def int_column(self, values: Iterable[int]) -> Any:
+        """int64 column from values, ordering_values must fit 64 bits"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def str_column(self, values: Iterable[str]) -> Any:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def compare(self, column: Any, op: Callable[[Any, Any], bool], value: Any) -> Any:
+        """Mask of the positions where op(column[i], value) is True"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def mod(self, column: Any, value: int) -> Any:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def isin(self, column: Any, values: Iterable[Any]) -> Any:
+        """Mask of the positions where column[i] is in values"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def isin_sorted(self, column: Any, sorted_values: Any) -> Any:
+        """Mask of the positions where column[i] is in sorted_values, a column made by unique"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def unique(self, values: Iterable[int]) -> Any:
+        """Sorted int column of the distinct values"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def compress(self, column: Any, mask: Any) -> Any:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def take(self, column: Any, positions: Iterable[int]) -> Any:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def positions(self, mask: Any) -> Any:
+        """Int column of the positions set in mask"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def select_positions(self, positions: range | Any, mask: Any) -> Any:
+        """positions compressed by mask, positions is a range or an int column"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def take_positions(self, positions: range | Any, indexes: Iterable[int]) -> Any:
+        """positions[i] for i in indexes, positions is a range or an int column"""
+        raise NotImplementedError()
+
+    def gather(self, column: Any, positions: range | Any) -> Any:
+        """Values of column at positions, a range is gathered with a slice"""
+        if isinstance(positions, range):
+            stop = positions.stop if positions.stop >= 0 else None
+            return column[positions.start : stop : positions.step]
+        return self.take(column, positions)
+
+    @abstractmethod
+    def concat(self, column: Any, other: Any) -> Any:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def prefix(self, buffer: Any, length: int) -> Any:
+        """First length values of a buffer which may have spare capacity"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def extend(self, buffer: Any, length: int, values: Any) -> Any:
+        """Write values after the first length values of buffer, in place if there is capacity
+
+        Returns:
+            Any: buffer, or a bigger buffer containing its first length values and values
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def delete(self, buffer: Any, position: int, length: int) -> Any:
+        """Delete in place the value at position from the first length values of buffer"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def copy(self, column: Any) -> Any:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def fused_pass(
+        self, values: Any, steps: list[PlanStep], first_position: int = 0
+    ) -> tuple[Any, Any]:
+        """Apply all the steps to the int column values in a single pass,
+        positions are numbered from first_position
+
+        Returns:
+            tuple[Any, Any]: int column of the positions kept by the filters and int column
+                of their values after the transforms, None if there are no transforms
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def explain_fused_pass(self, steps: list[PlanStep]) -> str:
+        """How fused_pass executes steps"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def group_by(
+        self, keys: Any, values: Any, aggregations: Iterable[str]
+    ) -> tuple[list, dict[str, list]]:
+        """Group values by the key at the same position, groups are in order of first appearance
+
+        Args:
+            keys (Any): int or str column
+            values (Any): int column
+            aggregations (Iterable[str]): names in AGGREGATIONS
+
+        Returns:
+            tuple[list, dict[str, list]]: keys of the groups, aggregation -> value of each group
+        """
+        raise NotImplementedError()
+
+    def hash_join(
+        self, left_keys: Any, right_keys: Any, how: str, table: dict[Any, int] | None = None
+    ) -> tuple[Any, Any]:
+        """
+        Join the rows of two columns with equal keys: a hash table of right_keys
+        is built (table if given, key -> position of unique keys) and probed with each left key
+
+        Returns:
+            tuple[Any, Any]: int columns of the left and right positions of the pairs, in left
+                order then right order; -1 as right position of the unmatched rows of a left
+                join, right positions are None for an anti join
+        """
+        duplicated = {}  # type: dict[Any, list[int]]
+        if table is None:
+            table = {}
+            for position, key in enumerate(self.to_list(right_keys)):
+                first = table.setdefault(key, position)
+                if first != position:
+                    duplicated.setdefault(key, [first]).append(position)
+        left_positions = array("q")
+        if how == "anti":
+            left_positions.extend(
+                position
+                for position, key in enumerate(self.to_list(left_keys))
+                if key not in table
+            )
+            return self.int_column(left_positions), None
+        right_positions = array("q")
+        for position, key in enumerate(self.to_list(left_keys)):
+            match = table.get(key)
+            if match is None:
+                if how == "left":
+                    left_positions.append(position)
+                    right_positions.append(-1)
+            elif duplicated and key in duplicated:
+                matches = duplicated[key]
+                left_positions.extend(repeat(position, len(matches)))
+                right_positions.extend(matches)
+            else:
+                left_positions.append(position)
+                right_positions.append(match)
+        return self.int_column(left_positions), self.int_column(right_positions)
+
+    @abstractmethod
+    def prefer_merge_join(self, left_length: int, right_length: int) -> bool:
+        """True if merge_join is expected to be faster than hash_join"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def merge_join(
+        self, left_keys: Any, sorted_keys: Any, sorted_positions: Any, how: str
+    ) -> tuple[Any, Any]:
+        """
+        Like hash_join, but the right side is given sorted by key (ties by position)
+        with its positions: matches of each left key are found by binary search
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def int_column_to_bytes(self, column: Any) -> bytes:
+        """int64 little endian"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def int_column_from_bytes(self, buffer: Any, offset: int, count: int) -> Any:
+        """Int column copied from count int64 little endian at offset of buffer"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def sorted_column(self, column: Any) -> Any:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def argsort(self, column: Any, reverse: bool = False) -> Any:
+        """Positions sorting the column, stable also when reverse"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def to_list(self, column: Any) -> list:
+        """Column values as python objects"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def shared_int_column(self, buffer: memoryview, length: int) -> Any:
+        """Int column of length native int64 over buffer (shared memory), without copying it"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def int_column_from_shared(self, column: Any, ranges: Iterable[tuple[int, int]]) -> Any:
+        """Int column copied from the (start, stop) ranges of a shared_int_column"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def summarize(self, column: Any) -> tuple[int, int, int | None, int | None]:
+        """count, sum, min and max of an int column, min and max are None if it's empty"""
+        raise NotImplementedError()
+
+
+class NumpyColumnBackend(ColumnBackend):
+    def __init__(self) -> None:
+        # ufuncs writing into preallocated buffers, used by fused_pass
+        self._ufuncs = {
+            operator.eq: np.equal,
+            operator.ne: np.not_equal,
+            operator.gt: np.greater,
+            operator.lt: np.less,
+            operator.ge: np.greater_equal,
+            operator.le: np.less_equal,
+            operator.mod: np.remainder,
+        }
+
+    def int_column(self, values: Iterable[int]) -> "np.ndarray":
+        if isinstance(values, range):
+            return np.arange(values.start, values.stop, values.step, dtype=np.int64)
+        if isinstance(values, (list, tuple, np.ndarray, array)):
+            return np.asarray(values, dtype=np.int64)
+        return np.fromiter(values, dtype=np.int64)
+
+    def str_column(self, values: Iterable[str]) -> "np.ndarray":
+        values = values if isinstance(values, list) else list(values)
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+
+    def compare(self, column: "np.ndarray", op: Callable[[Any, Any], bool], value: Any):
+        return op(column, value)
+
+    def mod(self, column: "np.ndarray", value: int) -> "np.ndarray":
+        if value == 0:
+            # numpy would return 0 with a RuntimeWarning
+            raise ZeroDivisionError("integer modulo by zero")
+        return column % value
+
+    def isin(self, column: "np.ndarray", values: Iterable[Any]) -> "np.ndarray":
+        return np.isin(column, self.int_column(values))
+
+    def isin_sorted(self, column: "np.ndarray", sorted_values: "np.ndarray") -> "np.ndarray":
+        if not len(sorted_values):
+            return np.zeros(len(column), dtype=bool)
+        # binary search of every value, no need to sort column like np.isin does
+        positions = np.searchsorted(sorted_values, column)
+        positions[positions == len(sorted_values)] = 0
+        return sorted_values[positions] == column
+
+    def unique(self, values: Iterable[int]) -> "np.ndarray":
+        # sort + adjacent dedup, faster than np.unique on int64
+        column = np.sort(self.int_column(values))
+        if len(column) < 2:
+            return column
+        return column[np.concatenate(([True], column[1:] != column[:-1]))]
+
+    def compress(self, column: "np.ndarray", mask: "np.ndarray") -> "np.ndarray":
+        return column[mask]
+
+    def take(self, column: "np.ndarray", positions: Iterable[int]) -> "np.ndarray":
+        return column[self.int_column(positions)]
+
+    def positions(self, mask: "np.ndarray") -> "np.ndarray":
+        return np.flatnonzero(mask)
+
+    def select_positions(
+        self, positions: "range | np.ndarray", mask: "np.ndarray"
+    ) -> "np.ndarray":
+        if isinstance(positions, range):
+            return positions.start + np.flatnonzero(mask) * positions.step
+        return positions[mask]
+
+    def take_positions(
+        self, positions: "range | np.ndarray", indexes: Iterable[int]
+    ) -> "np.ndarray":
+        indexes = self.int_column(indexes)
+        if isinstance(positions, range):
+            indexes = np.where(indexes < 0, indexes + len(positions), indexes)
+            return positions.start + indexes * positions.step
+        return positions[indexes]
+
+    def concat(self, column: "np.ndarray", other: "np.ndarray") -> "np.ndarray":
+        return np.concatenate((column, other))
+
+    def prefix(self, buffer: "np.ndarray", length: int) -> "np.ndarray":
+        return buffer if len(buffer) == length else buffer[:length]
+
+    def extend(self, buffer: "np.ndarray", length: int, values: "np.ndarray") -> "np.ndarray":
+        needed = length + len(values)
+        if needed > len(buffer):
+            # grow geometrically so appends are amortized O(1)
+            grown = np.empty(max(needed, 2 * len(buffer), 8), dtype=buffer.dtype)
+            grown[:length] = buffer[:length]
+            buffer = grown
+        buffer[length:needed] = values
+        return buffer
+
+    def delete(self, buffer: "np.ndarray", position: int, length: int) -> "np.ndarray":
+        buffer[position : length - 1] = buffer[position + 1 : length]
+        if buffer.dtype == object:
+            # drop the reference to the string left in the spare capacity
+            buffer[length - 1] = None
+        return buffer
+
+    def copy(self, column: "np.ndarray") -> "np.ndarray":
+        return column.copy()
+
+    def fused_pass(
+        self, values: "np.ndarray", steps: list[PlanStep], first_position: int = 0
+    ) -> "tuple[np.ndarray, np.ndarray | None]":
+        has_transforms = not all(step.is_filter for step in steps)
+        chunk_positions = []
+        chunk_values = []
+        # chunks fit in the cpu cache, each step reads the output of the previous one
+        # from the cache instead of a full size temporary array
+        transformed = np.empty(min(len(values), _FUSED_CHUNK_ROWS), dtype=values.dtype)
+        mask = np.empty(len(transformed), dtype=bool)
+        passed = np.empty(len(transformed), dtype=bool)
+        for start in range(0, len(values), _FUSED_CHUNK_ROWS):
+            chunk = values[start : start + _FUSED_CHUNK_ROWS]
+            size = len(chunk)
+            chunk_mask = mask[:size]
+            chunk_mask.fill(True)
+            for step in steps:
+                if step.is_filter:
+                    self._ufuncs[step.op](chunk, step.operand, out=passed[:size])
+                    np.logical_and(chunk_mask, passed[:size], out=chunk_mask)
+                else:
+                    chunk = self._ufuncs[step.op](chunk, step.operand, out=transformed[:size])
+            kept = np.flatnonzero(chunk_mask)
+            chunk_positions.append(kept + (first_position + start))
+            if has_transforms:
+                chunk_values.append(chunk[kept])
+        if not chunk_positions:
+            return self.int_column(()), self.int_column(()) if has_transforms else None
+        return (
+            np.concatenate(chunk_positions),
+            np.concatenate(chunk_values) if has_transforms else None,
+        )
+
+    def explain_fused_pass(self, steps: list[PlanStep]) -> str:
+        lines = [f"for each chunk of {_FUSED_CHUNK_ROWS} rows:"]
+        for step in steps:
+            if step.is_filter:
+                lines.append(f"    mask &= v {_OPERATOR_SYMBOLS[step.op]} {step.operand}")
+            else:
+                lines.append(f"    v = v {_OPERATOR_SYMBOLS[step.op]} {step.operand}  (in place)")
+        lines.append("    keep positions and v where mask")
+        return "\n".join(lines)
+
+    def group_by(
+        self, keys: "np.ndarray", values: "np.ndarray", aggregations: Iterable[str]
+    ) -> tuple[list, dict[str, list]]:
+        # hash the keys once into group codes, then each aggregation is a single
+        # vectorized pass over the codes
+        group_codes = {}  # type: dict[Any, int]
+        codes = np.fromiter(
+            (group_codes.setdefault(key, len(group_codes)) for key in keys.tolist()),
+            dtype=np.int64,
+            count=len(keys),
+        )
+        number_of_groups = len(group_codes)
+        counts = np.bincount(codes, minlength=number_of_groups)
+        sums = None
+        results = {}
+        for aggregation in aggregations:
+            if aggregation == "count":
+                results[aggregation] = counts.tolist()
+            elif aggregation in ("sum", "mean"):
+                if sums is None:
+                    # np.add.at keeps int64 sums exact, bincount weights are float64
+                    sums = np.zeros(number_of_groups, dtype=np.int64)
+                    np.add.at(sums, codes, values)
+                results[aggregation] = (sums if aggregation == "sum" else sums / counts).tolist()
+            elif aggregation == "min":
+                mins = np.full(number_of_groups, np.iinfo(np.int64).max)
+                np.minimum.at(mins, codes, values)
+                results[aggregation] = mins.tolist()
+            elif aggregation == "max":
+                maxs = np.full(number_of_groups, np.iinfo(np.int64).min)
+                np.maximum.at(maxs, codes, values)
+                results[aggregation] = maxs.tolist()
+        return list(group_codes), results
+
+    def prefer_merge_join(self, left_length: int, right_length: int) -> bool:
+        # vectorized binary searches always beat hashing in a python loop
+        return True
+
+    def merge_join(
+        self,
+        left_keys: "np.ndarray",
+        sorted_keys: "np.ndarray",
+        sorted_positions: "np.ndarray",
+        how: str,
+    ) -> "tuple[np.ndarray, np.ndarray | None]":
+        # left keys are searched in sorted order, so the binary searches walk both
+        # sides forward like a merge instead of jumping around sorted_keys
+        order = np.argsort(left_keys, kind="stable")
+        ordered_keys = left_keys[order]
+        starts = np.empty(len(left_keys), dtype=np.int64)
+        counts = np.empty(len(left_keys), dtype=np.int64)
+        starts[order] = np.searchsorted(sorted_keys, ordered_keys, "left")
+        counts[order] = np.searchsorted(sorted_keys, ordered_keys, "right")
+        counts -= starts
+        if how == "anti":
+            return np.flatnonzero(counts == 0), None
+        if how == "left":
+            # unmatched rows keep one pair, with -1 as right position
+            pairs = np.maximum(counts, 1)
+        else:
+            pairs = counts
+        left_positions = np.repeat(np.arange(len(left_keys)), pairs)
+        # offset of each pair among the pairs of its left row
+        offsets = np.arange(len(left_positions)) - np.repeat(np.cumsum(pairs) - pairs, pairs)
+        sorted_indexes = np.repeat(starts, pairs) + offsets
+        matched = np.repeat(counts > 0, pairs)
+        right_positions = np.full(len(left_positions), -1, dtype=np.int64)
+        right_positions[matched] = sorted_positions[sorted_indexes[matched]]
+        return left_positions, right_positions
+
+    def int_column_to_bytes(self, column: "np.ndarray") -> bytes:
+        return column.astype("<i8", copy=False).tobytes()
+
+    def int_column_from_bytes(self, buffer: Any, offset: int, count: int) -> "np.ndarray":
+        return np.frombuffer(buffer, dtype="<i8", count=count, offset=offset).astype(np.int64)
+
+    def sorted_column(self, column: "np.ndarray") -> "np.ndarray":
+        return np.sort(column)
+
+    def argsort(self, column: "np.ndarray", reverse: bool = False) -> "np.ndarray":
+        if reverse:
+            # sorting the negated values keeps equal values in their original order
+            return np.argsort(-column, kind="stable")
+        return np.argsort(column, kind="stable")
+
+    def to_list(self, column: "np.ndarray") -> list:
+        return column.tolist()
+
+    def shared_int_column(self, buffer: memoryview, length: int) -> "np.ndarray":
+        return np.ndarray(length, dtype=np.int64, buffer=buffer)
+
+    def int_column_from_shared(
+        self, column: "np.ndarray", ranges: Iterable[tuple[int, int]]
+    ) -> "np.ndarray":
+        return np.concatenate([column[start:stop] for start, stop in ranges] or [column[:0]])
+
+    def summarize(self, column: "np.ndarray") -> tuple[int, int, int | None, int | None]:
+        if not len(column):
+            return 0, 0, None, None
+        return len(column), int(column.sum()), int(column.min()), int(column.max())
+
+
+# rows evaluated together by NumpyColumnBackend.fused_pass, 512KB of int64
+_FUSED_CHUNK_ROWS = 1 << 16
+_FUSED_PASSES = {}  # type: dict[tuple[tuple[Callable, bool], ...], Callable]
+
+
+def _compile_fused_pass(shape: tuple[tuple[Callable, bool], ...]) -> Callable:
+    """
+    Generate, once per sequence of (op, is_filter), a loop applying all the steps
+    to each value, so the columns are read once and no intermediate column is built.
+    The operands are passed at each call, plans differing only by them share the loop.
+    """
+    fused_pass = _FUSED_PASSES.get(shape)
+    if fused_pass is not None:
+        return fused_pass
+    has_transforms = not all(is_filter for _, is_filter in shape)
+    lines = ["def fused_pass(values, operands, first_position):"]
+    lines += [f"    c{index} = operands[{index}]" for index in range(len(shape))]
+    lines += [
+        '    positions = array("q")',
+        "    keep_position = positions.append",
+    ]
+    if has_transforms:
+        lines += [
+            '    out = array("q")',
+            "    keep_value = out.append",
+        ]
+    lines.append("    for position, v in enumerate(values, first_position):")
+    for index, (op, is_filter) in enumerate(shape):
+        if is_filter:
+            lines += [
+                f"        if not v {_OPERATOR_SYMBOLS[op]} c{index}:",
+                "            continue",
+            ]
+        else:
+            lines.append(f"        v = v {_OPERATOR_SYMBOLS[op]} c{index}")
+    lines.append("        keep_position(position)")
+    if has_transforms:
+        lines += ["        keep_value(v)", "    return positions, out"]
+    else:
+        lines.append("    return positions, None")
+    namespace = {"array": array}
+    exec("\n".join(lines), namespace)
+    fused_pass = namespace["fused_pass"]
+    fused_pass.__source__ = "\n".join(lines)
+    _FUSED_PASSES[shape] = fused_pass
+    return fused_pass
+
+
+class ArrayColumnBackend(ColumnBackend):
+    def int_column(self, values: Iterable[int]) -> array:
+        return array("q", values)
+
+    def str_column(self, values: Iterable[str]) -> list:
+        return list(values)
+
+    def compare(self, column: array, op: Callable[[Any, Any], bool], value: Any) -> bytearray:
+        return bytearray(map(op, column, repeat(value)))
+
+    def mod(self, column: array, value: int) -> array:
+        return array("q", map(operator.mod, column, repeat(value)))
+
+    def isin(self, column: array, values: Iterable[Any]) -> bytearray:
+        return bytearray(map(frozenset(values).__contains__, column))
+
+    def isin_sorted(self, column: array, sorted_values: array) -> bytearray:
+        return self.isin(column, sorted_values)
+
+    def unique(self, values: Iterable[int]) -> array:
+        return array("q", sorted(set(values)))
+
+    def compress(self, column: array | list, mask: bytearray) -> array | list:
+        if isinstance(column, array):
+            return array(column.typecode, compress(column, mask))
+        return list(compress(column, mask))
+
+    def take(self, column: array | list, positions: Iterable[int]) -> array | list:
+        if isinstance(column, array):
+            return array(column.typecode, map(column.__getitem__, positions))
+        return list(map(column.__getitem__, positions))
+
+    def positions(self, mask: bytearray) -> array:
+        return array("q", compress(range(len(mask)), mask))
+
+    def select_positions(self, positions: range | array, mask: bytearray) -> array:
+        return array("q", compress(positions, mask))
+
+    def take_positions(self, positions: range | array, indexes: Iterable[int]) -> array:
+        return array("q", map(positions.__getitem__, indexes))
+
+    def concat(self, column: array | list, other: array | list) -> array | list:
+        return column + other
+
+    def prefix(self, buffer: array | list, length: int) -> array | list:
+        # array and list grow by themselves, they never have spare capacity
+        return buffer
+
+    def extend(self, buffer: array | list, length: int, values: array | list) -> array | list:
+        buffer.extend(values)
+        return buffer
+
+    def delete(self, buffer: array | list, position: int, length: int) -> array | list:
+        del buffer[position]
+        return buffer
+
+    def copy(self, column: array | list) -> array | list:
+        return column[:]
+
+    def fused_pass(
+        self, values: array | memoryview, steps: list[PlanStep], first_position: int = 0
+    ) -> tuple[array, array | None]:
+        fused_pass = _compile_fused_pass(tuple((step.op, step.is_filter) for step in steps))
+        return fused_pass(values, [step.operand for step in steps], first_position)
+
+    def explain_fused_pass(self, steps: list[PlanStep]) -> str:
+        return _compile_fused_pass(tuple((step.op, step.is_filter) for step in steps)).__source__
+
+    def group_by(
+        self, keys: array | list, values: array, aggregations: Iterable[str]
+    ) -> tuple[list, dict[str, list]]:
+        # single pass: each row is hashed to its group and added to all the aggregations
+        group_codes = {}  # type: dict[Any, int]
+        counts = []  # type: list[int]
+        sums = []  # type: list[int]
+        mins = []  # type: list[int]
+        maxs = []  # type: list[int]
+        for key, value in zip(keys, values):
+            code = group_codes.get(key)
+            if code is None:
+                group_codes[key] = len(counts)
+                counts.append(1)
+                sums.append(value)
+                mins.append(value)
+                maxs.append(value)
+                continue
+            counts[code] += 1
+            sums[code] += value
+            if value < mins[code]:
+                mins[code] = value
+            elif value > maxs[code]:
+                maxs[code] = value
+        results = {
+            "count": counts,
+            "sum": sums,
+            "min": mins,
+            "max": maxs,
+            "mean": [sum_ / count for sum_, count in zip(sums, counts)],
+        }
+        return list(group_codes), {
+            aggregation: results[aggregation] for aggregation in aggregations
+        }
+
+    def prefer_merge_join(self, left_length: int, right_length: int) -> bool:
+        # a binary search costs ~6 hash table inserts + probes, it's worth
+        # only when the hash table of the right side would be way bigger than the left side
+        return left_length * 8 < right_length
+
+    def merge_join(
+        self, left_keys: array, sorted_keys: array, sorted_positions: array, how: str
+    ) -> tuple[array, array | None]:
+        left_positions = array("q")
+        right_positions = array("q")
+        for position, key in enumerate(left_keys):
+            start = bisect_left(sorted_keys, key)
+            stop = bisect_right(sorted_keys, key, start)
+            if start == stop:
+                if how != "inner":
+                    left_positions.append(position)
+                    right_positions.append(-1)
+            elif how != "anti":
+                left_positions.extend(repeat(position, stop - start))
+                right_positions.extend(sorted_positions[start:stop])
+        if how == "anti":
+            return left_positions, None
+        return left_positions, right_positions
+
+    def int_column_to_bytes(self, column: array) -> bytes:
+        if byteorder == "big":
+            column = column[:]
+            column.byteswap()
+        return column.tobytes()
+
+    def int_column_from_bytes(self, buffer: Any, offset: int, count: int) -> array:
+        column = array("q")
+        column.frombytes(buffer[offset : offset + 8 * count])
+        if byteorder == "big":
+            column.byteswap()
+        return column
+
+    def sorted_column(self, column: array) -> array:
+        return array("q", sorted(column))
+
+    def argsort(self, column: array | list, reverse: bool = False) -> array:
+        return array("q", sorted(range(len(column)), key=column.__getitem__, reverse=reverse))
+
+    def to_list(self, column: array | list) -> list:
+        return list(column)
+
+    def shared_int_column(self, buffer: memoryview, length: int) -> memoryview:
+        return buffer[: length * 8].cast("q")
+
+    def int_column_from_shared(
+        self, column: memoryview, ranges: Iterable[tuple[int, int]]
+    ) -> array:
+        out = array("q")
+        for start, stop in ranges:
+            out.frombytes(column[start:stop].cast("B"))
+        return out
+
+    def summarize(self, column: array | list) -> tuple[int, int, int | None, int | None]:
+        if not len(column):
+            return 0, 0, None, None
+        return len(column), sum(column), min(column), max(column)
+
+
+_BACKEND: ColumnBackend = NumpyColumnBackend() if np is not None else ArrayColumnBackend()
+
+
+# SortedIndex.query is used when it selects at most 1 / _MAX_SELECTIVITY of the rows
+_MAX_SELECTIVITY = 8
+
+
+class SortedIndex:
+    """
+    Secondary index on ordering_value: (value, position) pairs sorted by value, then position.
+    Pairs are stored in blocks of at most 2 * _LOAD pairs (array("q") for values and positions)
+    with the last value of each block in _maxes, so:\n
+        - a lookup is a bisect on _maxes and a bisect in one block, O(log n)\n
+        - a range query returns its k positions in O(log n + k), plus sorting them
+          back in row order\n
+        - inserting or removing a pair moves at most one block, O(log n + _LOAD)\n
+    Removing a row before the last one also renumbers the following positions, O(n)
+    like the delete of the row from the columns.
+    """
+
+    _LOAD = 1024
+
+    __slots__ = ("_values", "_positions", "_maxes", "_length")
+
+    def __init__(
+        self, values: Iterable[int] | bytes = (), positions: Iterable[int] | bytes = ()
+    ) -> None:
+        """values and positions must be already sorted by value, then position,
+        bytes are int64 in machine order"""
+        values = array("q", values)
+        positions = array("q", positions)
+        load = self._LOAD
+        self._values = [values[start : start + load] for start in range(0, len(values), load)]
+        self._positions = [
+            positions[start : start + load] for start in range(0, len(positions), load)
+        ]
+        self._maxes = array("q", (block[-1] for block in self._values))
+        self._length = len(values)
+
+    @classmethod
+    def from_column(cls, ordering_values: Any) -> "SortedIndex":
+        positions = _BACKEND.argsort(ordering_values)
+        # both backends store int64 columns, copied as bytes without boxing every int
+        return cls(_BACKEND.take(ordering_values, positions).tobytes(), positions.tobytes())
+
+    def copy(self) -> "SortedIndex":
+        out = SortedIndex.__new__(SortedIndex)
+        out._values = [block[:] for block in self._values]
+        out._positions = [block[:] for block in self._positions]
+        out._maxes = self._maxes[:]
+        out._length = self._length
+        return out
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _locate(self, value: int, after_equals: bool) -> tuple[int, int]:
+        """(block, offset) of the first pair with value >= value, or > value if after_equals"""
+        bisect_ = bisect_right if after_equals else bisect_left
+        block = bisect_(self._maxes, value)
+        if block == len(self._maxes):
+            return block, 0
+        return block, bisect_(self._values[block], value)
+
+    def insert(self, value: int, position: int) -> None:
+        """Add a pair, position must be greater than the positions already indexed"""
+        if not self._values:
+            self._values.append(array("q", (value,)))
+            self._positions.append(array("q", (position,)))
+            self._maxes.append(value)
+        else:
+            # equal values are sorted by position, the new pair goes after them
+            block, offset = self._locate(value, True)
+            if block == len(self._values):
+                block -= 1
+                offset = len(self._values[block])
+            self._values[block].insert(offset, value)
+            self._positions[block].insert(offset, position)
+            self._maxes[block] = self._values[block][-1]
+            if len(self._values[block]) > 2 * self._LOAD:
+                self._split(block)
+        self._length += 1
+
+    def _split(self, block: int) -> None:
+        values, positions = self._values[block], self._positions[block]
+        half = len(values) // 2
+        self._values[block : block + 1] = [values[:half], values[half:]]
+        self._positions[block : block + 1] = [positions[:half], positions[half:]]
+        self._maxes[block : block + 1] = array("q", (values[half - 1], values[-1]))
+
+    def remove(self, value: int, position: int) -> None:
+        """Remove the pair, the positions after position are decreased by one"""
+        block, offset = self._locate(value, False)
+        while self._positions[block][offset] != position:
+            offset += 1
+            if offset == len(self._positions[block]):
+                block, offset = block + 1, 0
+        del self._values[block][offset]
+        del self._positions[block][offset]
+        if self._values[block]:
+            self._maxes[block] = self._values[block][-1]
+        else:
+            del self._values[block], self._positions[block], self._maxes[block]
+        self._length -= 1
+        if position != self._length:
+            self._positions = [
+                array("q", [p - (p > position) for p in block]) for block in self._positions
+            ]
+
+    def _count(self, start: tuple[int, int], stop: tuple[int, int]) -> int:
+        """Number of pairs from start (included) to stop (excluded)"""
+        (start_block, start_offset), (stop_block, stop_offset) = start, stop
+        return sum(map(len, self._values[start_block:stop_block])) - start_offset + stop_offset
+
+    def _between(self, start: tuple[int, int], stop: tuple[int, int]) -> array:
+        """Positions of the pairs from start (included) to stop (excluded)"""
+        (start_block, start_offset), (stop_block, stop_offset) = start, stop
+        if start_block == stop_block:
+            if start_block == len(self._positions):
+                return array("q")
+            return self._positions[start_block][start_offset:stop_offset]
+        positions = self._positions[start_block][start_offset:]
+        for block in range(start_block + 1, stop_block):
+            positions.extend(self._positions[block])
+        if stop_block < len(self._positions):
+            positions.extend(self._positions[stop_block][:stop_offset])
+        return positions
+
+    def _ranges(
+        self, op: Callable[[int, int], bool], value: int
+    ) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        first = (0, 0)
+        end = (len(self._values), 0)
+        if op is operator.eq:
+            return [(self._locate(value, False), self._locate(value, True))]
+        elif op is operator.ne:
+            return [(first, self._locate(value, False)), (self._locate(value, True), end)]
+        elif op is operator.gt:
+            return [(self._locate(value, True), end)]
+        elif op is operator.ge:
+            return [(self._locate(value, False), end)]
+        elif op is operator.lt:
+            return [(first, self._locate(value, False))]
+        elif op is operator.le:
+            return [(first, self._locate(value, True))]
+        raise ValueError(f"Not yet implemented for {op.__name__}")
+
+    def query(self, op: Callable[[int, int], bool], value: int) -> Any | None:
+        """
+        Int column of the positions where op(ordering_value, value), in row order.
+        None if they are more than 1 / _MAX_SELECTIVITY of the rows, then a scan
+        of the column is faster than gathering and sorting them.
+        """
+        ranges = self._ranges(op, value)
+        if sum(self._count(*range_) for range_ in ranges) * _MAX_SELECTIVITY > self._length:
+            return None
+        positions = array("q")
+        for range_ in ranges:
+            positions.extend(self._between(*range_))
+        return _BACKEND.sorted_column(_BACKEND.int_column(positions))
+
+    def sorted_positions(self) -> Any:
+        """Int column of all the positions, sorted by ordering_value"""
+        return _BACKEND.int_column(self._between((0, 0), (len(self._values), 0)))
+
+    def sorted_values(self) -> Any:
+        """Int column of all the ordering_values, sorted"""
+        values = array("q")
+        for block in self._values:
+            values.extend(block)
+        return _BACKEND.int_column(values)
+
+    def renumbered(self) -> "SortedIndex":
+        """Index of the rows taken in sorted_positions() order, the values don't move"""
+        out = SortedIndex.__new__(SortedIndex)
+        out._values = [block[:] for block in self._values]
+        out._positions = []
+        start = 0
+        for block in self._values:
+            out._positions.append(array("q", range(start, start + len(block))))
+            start += len(block)
+        out._maxes = self._maxes[:]
+        out._length = self._length
+        return out
+
+
+class ElementColumns:
+    """
+    ids, ordering_values and string_contents of a SmartElementList, one column each.
+
+    Columns are either:
+        - a base, owning its buffers, which can be modified in place by append and delete
+          while it's not shared (with numpy the buffers have spare capacity, so appends
+          are amortized O(1))
+        - a view, positions (range or int column) selected over a base, made by slices,
+          filters and copies; its columns are gathered from the base only when accessed
+    Once a base has views, or buffers in common with other columns, it's marked shared and
+    never modified in place again: SmartElementList copies it before modifying (copy on write).
+
+    The id -> position hash index is built on the first lookup by id and kept
+    up to date by append, so membership checks by id are O(1).
+    The SortedIndex on ordering_values is built only when asked and kept up to date
+    by append and delete.
+    """
+
+    __slots__ = (
+        "_buffers",
+        "_length",
+        "_base",
+        "_positions",
+        "_id_index",
+        "_sorted_index",
+        "shared",
+    )
+
+    def __init__(self, ids: Any, ordering_values: Any, string_contents: Any) -> None:
+        self._buffers = [ids, ordering_values, string_contents]
+        self._length = len(ids)
+        self._base = None  # type: ElementColumns | None
+        self._positions = None  # type: range | Any
+        self._id_index = None  # type: dict[int, int] | None
+        self._sorted_index = None  # type: SortedIndex | None
+        self.shared = False
+
+    @classmethod
+    def _view(cls, base: "ElementColumns", positions: range | Any) -> "ElementColumns":
+        view = cls.__new__(cls)
+        view._buffers = [None, None, None]
+        view._length = len(positions)
+        view._base = base
+        view._positions = positions
+        view._id_index = None
+        view._sorted_index = None
+        view.shared = False
+        base.shared = True
+        return view
+
+    @classmethod
+    def from_elements(cls, elements: Iterable[Element]) -> "ElementColumns":
+        elements = elements if isinstance(elements, list) else list(elements)
+        return cls(
+            _BACKEND.int_column([el.get_id() for el in elements]),
+            _BACKEND.int_column([el.ordering_value for el in elements]),
+            _BACKEND.str_column([el.string_content for el in elements]),
+        )
+
+    def _column(self, index: int) -> Any:
+        buffer = self._buffers[index]
+        if buffer is None:
+            # view column accessed for the first time
+            buffer = _BACKEND.gather(self._base._column(index), self._positions)
+            self._buffers[index] = buffer
+        return _BACKEND.prefix(buffer, self._length)
+
+    @property
+    def ids(self) -> Any:
+        return self._column(0)
+
+    @property
+    def ordering_values(self) -> Any:
+        return self._column(1)
+
+    @property
+    def string_contents(self) -> Any:
+        return self._column(2)
+
+    def is_view(self) -> bool:
+        return self._base is not None
+
+    def id_index(self) -> dict[int, int]:
+        if self._id_index is None:
+            self._id_index = dict(zip(_BACKEND.to_list(self.ids), range(self._length)))
+        return self._id_index
+
+    def has_id_index(self) -> bool:
+        return self._id_index is not None
+
+    def sorted_index(self) -> SortedIndex:
+        if self._sorted_index is None:
+            self._sorted_index = SortedIndex.from_column(self.ordering_values)
+        return self._sorted_index
+
+    def has_sorted_index(self) -> bool:
+        return self._sorted_index is not None
+
+    def set_sorted_index(self, sorted_index: SortedIndex | None) -> None:
+        self._sorted_index = sorted_index
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _all_positions(self) -> range | Any:
+        return self._positions if self._base is not None else range(self._length)
+
+    def _select(self, positions: range | Any) -> "ElementColumns":
+        return ElementColumns._view(self._base or self, positions)
+
+    def compress(self, mask: Any) -> "ElementColumns":
+        return self._select(_BACKEND.select_positions(self._all_positions(), mask))
+
+    def take(self, positions: Iterable[int]) -> "ElementColumns":
+        return self._select(_BACKEND.take_positions(self._all_positions(), positions))
+
+    def take_transformed(self, positions: Iterable[int], ordering_values: Any) -> "ElementColumns":
+        """Rows at positions, with ordering_values replacing theirs if not None"""
+        view = self.take(positions)
+        if ordering_values is None:
+            return view
+        # a base: views of a view are taken from its base, which has the original values
+        out = ElementColumns(view.ids, ordering_values, view.string_contents)
+        out.shared = True
+        return out
+
+    def slice(self, key: slice) -> "ElementColumns":
+        return self._select(self._all_positions()[key])
+
+    def copy(self) -> "ElementColumns":
+        """Copy on write, the copy is a view sharing the buffers and the indexes"""
+        out = self._select(self._all_positions())
+        if self._base is not None:
+            # columns already gathered or transformed (take_transformed) are kept
+            out._buffers = self._buffers.copy()
+        # rows are in the same order, shared columns are never modified in place
+        out._id_index = self._id_index
+        out._sorted_index = self._sorted_index
+        return out
+
+    def with_ordering_values(self, ordering_values: Any) -> "ElementColumns":
+        """Columns sharing ids and string_contents with self"""
+        out = ElementColumns(self.ids, ordering_values, self.string_contents)
+        out.shared = self.shared = True
+        return out
+
+    def concat(self, other: "ElementColumns") -> "ElementColumns":
+        out = ElementColumns(
+            _BACKEND.concat(self.ids, other.ids),
+            _BACKEND.concat(self.ordering_values, other.ordering_values),
+            _BACKEND.concat(self.string_contents, other.string_contents),
+        )
+        if self._id_index is not None:
+            out._id_index = self._id_index.copy()
+            out._id_index.update(
+                zip(_BACKEND.to_list(other.ids), range(len(self), len(self) + len(other)))
+            )
+        return out
+
+    def owned(self) -> "ElementColumns":
+        """self if it can be modified in place, else a base with a private copy of the columns"""
+        if self._base is None and not self.shared:
+            return self
+        out = ElementColumns(
+            _BACKEND.copy(self.ids),
+            _BACKEND.copy(self.ordering_values),
+            _BACKEND.copy(self.string_contents),
+        )
+        if self._id_index is not None:
+            out._id_index = self._id_index.copy()
+        if self._sorted_index is not None:
+            out._sorted_index = self._sorted_index.copy()
+        return out
+
+    def append(self, other: "ElementColumns") -> None:
+        """Append other in place, self must be owned"""
+        length = self._length
+        for index, column in enumerate((other.ids, other.ordering_values, other.string_contents)):
+            self._buffers[index] = _BACKEND.extend(self._buffers[index], length, column)
+        self._length += len(other)
+        if self._id_index is not None:
+            self._id_index.update(zip(_BACKEND.to_list(other.ids), range(length, self._length)))
+        if self._sorted_index is not None:
+            for position, value in enumerate(_BACKEND.to_list(other.ordering_values), length):
+                self._sorted_index.insert(value, position)
+
+    def delete(self, position: int) -> None:
+        """Delete the row at position in place, self must be owned"""
+        id = int(self._buffers[0][position])
+        if self._sorted_index is not None:
+            self._sorted_index.remove(int(self._buffers[1][position]), position)
+        for index, buffer in enumerate(self._buffers):
+            self._buffers[index] = _BACKEND.delete(buffer, position, self._length)
+        self._length -= 1
+        if self._id_index is not None:
+            if position == self._length:
+                del self._id_index[id]
+            else:
+                # positions after the deleted row shifted, rebuilt on the next lookup
+                self._id_index = None
+
+    def chunks(self, chunk_rows: int) -> Iterator["ElementColumns"]:
+        """Views of chunk_rows rows, the last one may be shorter"""
+        for start in range(0, self._length, chunk_rows):
+            yield self.slice(slice(start, start + chunk_rows))
+
+    def _value(self, index: int, position: int) -> Any:
+        buffer = self._buffers[index]
+        if buffer is None:
+            # read from the base, a single row doesn't gather the whole column of a view
+            return self._base._value(index, int(self._positions[position]))
+        return buffer[position]
+
+    def row(self, position: int) -> CompactSmartElement:
+        return CompactSmartElement._from_row(
+            int(self._value(0, position)), int(self._value(1, position)), self._value(2, position)
+        )
+
+    def rows(self) -> list[CompactSmartElement]:
+        return [
+            CompactSmartElement._from_row(id, ordering_value, string_content)
+            for id, ordering_value, string_content in zip(
+                _BACKEND.to_list(self.ids),
+                _BACKEND.to_list(self.ordering_values),
+                _BACKEND.to_list(self.string_contents),
+            )
+        ]
+
+
+# rows materialized at a time while iterating ElementRows
+_ROW_OBJECTS_CHUNK = 1 << 12
+
+
+class ElementRows(Sequence):
+    """
+    Read only sequence of the rows of ElementColumns, returned by SmartElementList.elements.
+    A CompactSmartElement is created only for the row indexed, iterating creates them
+    _ROW_OBJECTS_CHUNK at a time.
+    """
+
+    __slots__ = ("_columns",)
+
+    def __init__(self, columns: ElementColumns) -> None:
+        self._columns = columns
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def __getitem__(self, key: int | slice) -> "CompactSmartElement | ElementRows":
+        if key.__class__ is slice:
+            return ElementRows(self._columns.slice(key))
+        length = len(self._columns)
+        position = key + length if key < 0 else key
+        if not 0 <= position < length:
+            raise IndexError("list index out of range")
+        return self._columns.row(position)
+
+    def __iter__(self) -> Iterator[CompactSmartElement]:
+        for chunk in self._columns.chunks(_ROW_OBJECTS_CHUNK):
+            yield from chunk.rows()
+
+    def __eq__(self, __o: object) -> bool:
+        if not isinstance(__o, (list, ElementRows)):
+            return NotImplemented
+        return list(self) == list(__o)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+def _ordering_operand(__o: int | Element) -> int:
+    """Operators compare ordering_values with an int or with the ordering_value of an Element"""
+    if type(__o) == int:
+        return __o
+    elif isinstance(__o, _ELEMENT_TYPES):
+        return __o.ordering_value
+    else:
+        raise ValueError(f"Not yet implemented for {type(__o).__name__}")
+
+
+class ElementList:
+    elements: list[SmartElement] = []
+
+    def __init__(self, list: list[SmartElement]) -> None:
+        self.elements = list
+
+
+class SmartElementList(ElementList):
+    """
+    List of SmartElement stored as columns, see ColumnBackend.
+    elements is an ElementRows snapshot of the list, a row is materialized as a
+    CompactSmartElement only when accessed, changing it doesn't change the list.
+    """
+
+    _columns: ElementColumns
+
+    def __init__(self, list: list[SmartElement]) -> None:
+        self._columns = ElementColumns.from_elements(list)
+
+    @classmethod
+    def _from_columns(cls, columns: ElementColumns) -> "SmartElementList":
+        out = cls.__new__(cls)
+        out._columns = columns
+        return out
+
+    @property
+    def elements(self) -> ElementRows:
+        # the copy shares the buffers, in place changes of self copy them first
+        return ElementRows(self._columns.copy())
+
+    @elements.setter
+    def elements(self, elements: list[SmartElement]) -> None:
+        self._columns = ElementColumns.from_elements(elements)
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def get_id_series(self) -> IdSeries:
+        return IdSeries(self._columns.ids)
+
+    def __contains__(self, key) -> bool:
+        key_type = type(key)
+        if issubclass(key_type, _SMART_ELEMENT_TYPES):
+            return key.get_id() in self._columns.id_index()
+        else:
+            raise ValueError(f"Not yet implemented for {key_type.__name__}")
+
+    def __getitem__(self, key) -> "SmartElementList":
+        key_type = type(key)
+        if key_type == int:
+            length = len(self._columns)
+            position = key + length if key < 0 else key
+            if not 0 <= position < length:
+                raise IndexError("list index out of range")
+            return self._from_columns(self._columns.slice(slice(position, position + 1)))
+        elif key_type == slice:
+            return self._from_columns(self._columns.slice(key))
+        elif key_type == IdSeries:
+            return self._select_ids(key)
+        elif key_type == LazySmartElementList:
+            if key._source is self:
+                # rows selected by positions, no lookup by id needed
+                positions, _ = key._run()
+                return self._from_columns(self._columns.take(positions))
+            return self._select_ids(key.collect_ids())
+        elif issubclass(key.__class__, SmartElementList):
+            return self._select_ids(key.get_id_series())
+        elif issubclass(key.__class__, ElementList):
+            return self._select_ids(IdSeries(el.get_id() for el in key.elements))
+        else:
+            raise ValueError(f"Not yet implemented for {key_type.__name__}")
+
+    def _select_ids(self, id_series: IdSeries) -> "SmartElementList":
+        columns = self._columns
+        if columns.has_id_index() and len(id_series) * 16 < len(columns):
+            # few ids, look them up in the hash index instead of scanning all the ids
+            id_index = columns.id_index()
+            return self._from_columns(
+                columns.take(sorted(id_index[id] for id in id_series if id in id_index))
+            )
+        return self._from_columns(
+            columns.compress(_BACKEND.isin_sorted(columns.ids, id_series.ids))
+        )
+
+    def __add__(self, __o: SmartElement) -> "SmartElementList":
+        out = self.copy()
+        out += __o
+        return out
+
+    def __sub__(self, __o: SmartElement) -> "SmartElementList":
+        out = self.copy()
+        out -= __o
+        return out
+
+    def _own_columns(self) -> ElementColumns:
+        """Columns that can be modified in place, copied first if shared with other lists"""
+        self._columns = self._columns.owned()
+        return self._columns
+
+    def __iadd__(self, __o: SmartElement) -> "SmartElementList":
+        key_type = type(__o)
+        if issubclass(key_type, _SMART_ELEMENT_TYPES):
+            self._own_columns().append(ElementColumns.from_elements([__o]))
+            return self
+        else:
+            raise ValueError(f"Not yet implemented for {key_type.__name__}")
+
+    def __isub__(self, __o: SmartElement) -> "SmartElementList":
+        key_type = type(__o)
+        if issubclass(key_type, _SMART_ELEMENT_TYPES):
+            indx = self._columns.id_index().get(__o.get_id())
+            if indx is None:
+                raise ValueError(f"{__o!r} is not in list")
+            self._own_columns().delete(indx)
+            return self
+        else:
+            raise ValueError(f"Not yet implemented for {key_type.__name__}")
+
+    def create_sorted_index(self) -> None:
+        """
+        Index ordering_value with a SortedIndex, kept up to date by +, -, += and -=:
+        comparisons and eq/ne/gt/lt/ge/le become bisect lookups instead of full scans,
+        sort() takes the rows in index order instead of sorting them.
+        Lists made by filters, slices and % are not indexed.
+        """
+        self._columns.sorted_index()
+
+    def drop_sorted_index(self) -> None:
+        self._columns.set_sorted_index(None)
+
+    def has_sorted_index(self) -> bool:
+        return self._columns.has_sorted_index()
+
+    def _filter(self, op: Callable[[Any, Any], bool], __o: int | Element) -> ElementColumns:
+        columns = self._columns
+        if columns.has_sorted_index():
+            positions = columns.sorted_index().query(op, _ordering_operand(__o))
+            if positions is not None:
+                return columns.take(positions)
+        return columns.compress(
+            _BACKEND.compare(columns.ordering_values, op, _ordering_operand(__o))
+        )
+
+    def _id_series(self, op: Callable[[Any, Any], bool], __o: int | Element) -> "IdSeries":
+        return IdSeries(self._filter(op, __o).ids)
+
+    def __eq__(self, __o: int) -> "IdSeries":
+        return self._id_series(operator.eq, __o)
+
+    def __ne__(self, __o: int) -> "IdSeries":
+        return self._id_series(operator.ne, __o)
+
+    def __gt__(self, __o: int) -> "IdSeries":
+        return self._id_series(operator.gt, __o)
+
+    def __lt__(self, __o: int) -> "IdSeries":
+        return self._id_series(operator.lt, __o)
+
+    def __ge__(self, __o: int) -> "IdSeries":
+        return self._id_series(operator.ge, __o)
+
+    def __le__(self, __o: int) -> "IdSeries":
+        return self._id_series(operator.le, __o)
+
+    def eq(self, __o: int | Element) -> "SmartElementList":
+        return self._from_columns(self._filter(operator.eq, __o))
+
+    def ne(self, __o: int | Element) -> "SmartElementList":
+        return self._from_columns(self._filter(operator.ne, __o))
+
+    def gt(self, __o: int | Element) -> "SmartElementList":
+        return self._from_columns(self._filter(operator.gt, __o))
+
+    def lt(self, __o: int | Element) -> "SmartElementList":
+        return self._from_columns(self._filter(operator.lt, __o))
+
+    def ge(self, __o: int | Element) -> "SmartElementList":
+        return self._from_columns(self._filter(operator.ge, __o))
+
+    def le(self, __o: int | Element) -> "SmartElementList":
+        return self._from_columns(self._filter(operator.le, __o))
+
+    def copy(self) -> "SmartElementList":
+        return self._from_columns(self._columns.copy())
+
+    def groupby(self, by: str = "string_content") -> "GroupBy":
+        # copy on write, the groups are the rows at the time of the call
+        return GroupBy(self._columns.copy(), by)
+
+    def join(
+        self, other: "SmartElementList", on: str = "id", how: str = "inner"
+    ) -> "JoinResult":
+        """
+        Match the rows of self and other with equal on ("id", "ordering_value" or
+        "string_content"), in O(len(self) + len(other) + pairs):\n
+            - on id other's id index is used as hash table\n
+            - on ordering_value, if other has a sorted index, by binary search of the
+              sorted values (merge join), without building a hash table, when the backend
+              expects it to be faster\n
+            - otherwise hash join, a hash table of other's keys is probed with self's keys
+
+        Args:
+            other (SmartElementList): right side of the join
+            on (str): key compared
+            how (str): one of JOINS, see JoinResult
+
+        Returns:
+            JoinResult: the pairs of rows
+        """
+        if on not in _KEY_COLUMNS:
+            raise ValueError(f"Can't join on {on}, expected one of {', '.join(_KEY_COLUMNS)}")
+        if how not in JOINS:
+            raise ValueError(f"Not yet implemented for {how}")
+        # copy on write, the pairs stay valid if either list is modified in place later
+        left, right = self._columns.copy(), other._columns.copy()
+        left_keys = getattr(left, _KEY_COLUMNS[on])
+        if (
+            on == "ordering_value"
+            and right.has_sorted_index()
+            and _BACKEND.prefer_merge_join(len(left), len(right))
+        ):
+            sorted_index = right.sorted_index()
+            strategy = "merge"
+            left_positions, right_positions = _BACKEND.merge_join(
+                left_keys, sorted_index.sorted_values(), sorted_index.sorted_positions(), how
+            )
+        else:
+            strategy = "hash"
+            left_positions, right_positions = _BACKEND.hash_join(
+                left_keys,
+                getattr(right, _KEY_COLUMNS[on]),
+                how,
+                right.id_index() if on == "id" else None,
+            )
+        return JoinResult(left, right, left_positions, right_positions, strategy)
+
+    @classmethod
+    def from_columns(
+        cls,
+        ordering_values: Iterable[int],
+        string_contents: Iterable[str],
+        ids: Iterable[int] | None = None,
+    ) -> "SmartElementList":
+        """
+        Bulk constructor, no SmartElement is built: if ids are not given a range of
+        new ids is reserved, otherwise counter skips past them
+        """
+        return cls._from_chunks(
+            [
+                (
+                    None if ids is None else _BACKEND.int_column(ids),
+                    _BACKEND.int_column(ordering_values),
+                    _BACKEND.str_column(string_contents),
+                )
+            ],
+            ids is not None,
+        )
+
+    @classmethod
+    def _from_chunks(cls, chunks: Iterable[tuple[Any, Any, Any]], keep_ids: bool):
+        """Rows from chunks of (ids, ordering_values, string_contents) columns,
+        ids are replaced by new ones unless keep_ids"""
+        columns = ElementColumns.from_elements(())
+        for ids, ordering_values, string_contents in chunks:
+            if not keep_ids:
+                ids = _BACKEND.int_column(counter.reserve(len(ordering_values)))
+            elif len(ids) != len(ordering_values) or len(ids) != len(string_contents):
+                raise ValueError("ids, ordering_values and string_contents have different lengths")
+            columns.append(ElementColumns(ids, ordering_values, string_contents))
+        if keep_ids and len(columns):
+            counter.advance(max(_BACKEND.to_list(columns.ids)))
+        return cls._from_columns(columns)
+
+    @classmethod
+    def from_csv(cls, path: str | os.PathLike, keep_ids: bool = False) -> "SmartElementList":
+        """
+        Load a csv with ordering_value and string_content columns (id too if keep_ids),
+        like the ones written by to_csv; rows are read in chunks straight into the columns
+        """
+        return cls._from_chunks(_csv_chunks(path, keep_ids), keep_ids)
+
+    @classmethod
+    def from_jsonl(cls, path: str | os.PathLike, keep_ids: bool = False) -> "SmartElementList":
+        """Load JSON lines with ordering_value and string_content (id too if keep_ids),
+        like the ones written by to_jsonl"""
+        return cls._from_chunks(_jsonl_chunks(path, keep_ids), keep_ids)
+
+    @classmethod
+    def from_binary(cls, path: str | os.PathLike, keep_ids: bool = False) -> "SmartElementList":
+        """Load a column file, see ColumnFileWriter"""
+        with MappedSmartElementList(path) as mapped:
+            return cls._from_chunks(
+                (
+                    (chunk.ids, chunk.ordering_values, chunk.string_contents)
+                    for chunk in mapped.chunks()
+                ),
+                keep_ids,
+            )
+
+    def to_csv(self, path: str | os.PathLike) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(_KEY_COLUMNS_ORDER)
+            for chunk in self._columns.chunks(_CHUNK_ROWS):
+                writer.writerows(
+                    zip(
+                        _BACKEND.to_list(chunk.ids),
+                        _BACKEND.to_list(chunk.ordering_values),
+                        _BACKEND.to_list(chunk.string_contents),
+                    )
+                )
+
+    def to_jsonl(self, path: str | os.PathLike) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            for chunk in self._columns.chunks(_CHUNK_ROWS):
+                file.writelines(
+                    f'{{"id": {id}, "ordering_value": {ordering_value}, '
+                    f'"string_content": {json.dumps(string_content, ensure_ascii=False)}}}\n'
+                    for id, ordering_value, string_content in zip(
+                        _BACKEND.to_list(chunk.ids),
+                        _BACKEND.to_list(chunk.ordering_values),
+                        _BACKEND.to_list(chunk.string_contents),
+                    )
+                )
+
+    def to_binary(self, path: str | os.PathLike) -> None:
+        """Write a column file, it can be loaded with from_binary or MappedSmartElementList"""
+        with ColumnFileWriter(path) as writer:
+            writer.write(self._columns)
+
+    def lazy(self) -> "LazySmartElementList":
+        """Record the next operations, run them fused with collect(), see LazySmartElementList"""
+        return LazySmartElementList(self)
+
+    def __mod__(self, __o: int) -> "SmartElementList":
+        columns = self._columns
+        return self._from_columns(
+            columns.with_ordering_values(
+                _BACKEND.mod(columns.ordering_values, _ordering_operand(__o))
+            )
+        )
+
+    def __str__(self) -> str:
+        return f"{[str(e) for e in self.elements]}"
+
+    def __repr__(self) -> str:
+        return f"{[repr(e) for e in self.elements]}"
+
+    def scramble(self) -> None:
+        random.seed(time_ns())
+        positions = list(range(len(self._columns)))
+        random.shuffle(positions)
+        indexed = self._columns.has_sorted_index()
+        self._columns = self._columns.take(positions)
+        if indexed:
+            self._columns.sorted_index()
+
+    def sort(self, reverse: bool = False) -> None:
+        columns = self._columns
+        if columns.has_sorted_index() and not reverse:
+            # rows taken in index order, ties are already in row order like a stable sort
+            sorted_index = columns.sorted_index()
+            self._columns = columns.take(sorted_index.sorted_positions())
+            self._columns.set_sorted_index(sorted_index.renumbered())
+            return
+        self._columns = columns.take(_BACKEND.argsort(columns.ordering_values, reverse))
+        if columns.has_sorted_index():
+            self._columns.sorted_index()
+
+
+AGGREGATIONS = ("count", "sum", "min", "max", "mean")
+# keys of SmartElementList.groupby and join -> ElementColumns column
+_KEY_COLUMNS = {
+    "string_content": "string_contents",
+    "ordering_value": "ordering_values",
+    "id": "ids",
+}
+
+
+class GroupBy:
+    """
+    Rows of a SmartElementList grouped by string_content, ordering_value or id,
+    made by SmartElementList.groupby():\n
+        elements.groupby("string_content").agg("count", "mean")\n
+        {"string_content": ["Hey", "You"], "count": [2, 1], "mean": [1.5, 3.0]}\n
+    Groups are hashed from the columns in a single pass, no SmartElement is built.
+    Rows given in chunks (MappedSmartElementList) are aggregated chunk by chunk,
+    then the partial aggregations of each group are merged.
+    """
+
+    __slots__ = ("_chunks", "by")
+
+    def __init__(
+        self, chunks: ElementColumns | Callable[[], Iterable[ElementColumns]], by: str
+    ) -> None:
+        if by not in _KEY_COLUMNS:
+            raise ValueError(f"Can't group by {by}, expected one of {', '.join(_KEY_COLUMNS)}")
+        self._chunks = chunks
+        self.by = by
+
+    def agg(self, *aggregations: str) -> dict[str, list]:
+        """
+        Aggregate the ordering_values of each group
+
+        Args:
+            aggregations (str): names in AGGREGATIONS, all of them if empty
+
+        Returns:
+            dict[str, list]: columns of the result, the group keys under self.by
+                followed by one column for each aggregation
+        """
+        aggregations = aggregations or AGGREGATIONS
+        for aggregation in aggregations:
+            if aggregation not in AGGREGATIONS:
+                raise ValueError(f"Not yet implemented for {aggregation}")
+        if isinstance(self._chunks, ElementColumns):
+            keys, results = _BACKEND.group_by(
+                getattr(self._chunks, _KEY_COLUMNS[self.by]),
+                self._chunks.ordering_values,
+                aggregations,
+            )
+            return {self.by: keys, **results}
+        return self._agg_chunks(aggregations)
+
+    def _agg_chunks(self, aggregations: Iterable[str]) -> dict[str, list]:
+        # mean is merged as sum and count
+        partials = {"count", "sum"} if "mean" in aggregations else set()
+        partials.update(aggregation for aggregation in aggregations if aggregation != "mean")
+        group_codes = {}  # type: dict[Any, int]
+        merged = {partial: [] for partial in partials}  # type: dict[str, list]
+        merge = {"count": operator.add, "sum": operator.add, "min": min, "max": max}
+        for chunk in self._chunks():
+            keys, results = _BACKEND.group_by(
+                getattr(chunk, _KEY_COLUMNS[self.by]), chunk.ordering_values, partials
+            )
+            for position, key in enumerate(keys):
+                code = group_codes.get(key)
+                if code is None:
+                    group_codes[key] = len(group_codes)
+                    for partial, values in merged.items():
+                        values.append(results[partial][position])
+                    continue
+                for partial, values in merged.items():
+                    values[code] = merge[partial](values[code], results[partial][position])
+        if "mean" in aggregations:
+            merged["mean"] = [sum_ / count for sum_, count in zip(merged["sum"], merged["count"])]
+        return {self.by: list(group_codes), **{name: merged[name] for name in aggregations}}
+
+    def count(self) -> dict[str, list]:
+        return self.agg("count")
+
+    def sum(self) -> dict[str, list]:
+        return self.agg("sum")
+
+    def min(self) -> dict[str, list]:
+        return self.agg("min")
+
+    def max(self) -> dict[str, list]:
+        return self.agg("max")
+
+    def mean(self) -> dict[str, list]:
+        return self.agg("mean")
+
+
+JOINS = ("inner", "left", "anti")
+
+
+class JoinResult:
+    """
+    Pairs of rows of two SmartElementLists with equal keys, made by SmartElementList.join(),
+    in order of the left rows, then of the right rows:\n
+        - inner: only the matched pairs\n
+        - left: also the unmatched left rows, paired with None\n
+        - anti: only the unmatched left rows, paired with None\n
+    strategy is how the pairs were found, "hash" or "merge" (SortedIndex of the right list)
+    """
+
+    __slots__ = ("_left", "_right", "left_positions", "right_positions", "strategy")
+
+    def __init__(
+        self,
+        left: ElementColumns,
+        right: ElementColumns,
+        left_positions: Any,
+        right_positions: Any,
+        strategy: str,
+    ) -> None:
+        self._left = left
+        self._right = right
+        self.left_positions = left_positions
+        self.right_positions = right_positions
+        self.strategy = strategy
+
+    def __len__(self) -> int:
+        return len(self.left_positions)
+
+    def left(self) -> SmartElementList:
+        """Left row of each pair"""
+        return SmartElementList._from_columns(self._left.take(self.left_positions))
+
+    def _right_positions(self) -> list[int | None]:
+        if self.right_positions is None:
+            return [None] * len(self)
+        return [
+            None if position < 0 else position
+            for position in _BACKEND.to_list(self.right_positions)
+        ]
+
+    def rows(self) -> list[tuple[CompactSmartElement, CompactSmartElement | None]]:
+        right_positions = self._right_positions()
+        # only the matched right rows are built, in order of the pairs
+        right_rows = iter(
+            self._right.take(
+                [position for position in right_positions if position is not None]
+            ).rows()
+        )
+        return [
+            (left_row, None if position is None else next(right_rows))
+            for left_row, position in zip(self.left().elements, right_positions)
+        ]
+
+    def columns(self) -> dict[str, list]:
+        """Combined records as columns, left_ and right_ id/ordering_value/string_content"""
+        out = {}
+        for side, columns, positions in (
+            ("left", self._left, _BACKEND.to_list(self.left_positions)),
+            ("right", self._right, self._right_positions()),
+        ):
+            for key, column in _KEY_COLUMNS.items():
+                values = _BACKEND.to_list(getattr(columns, column))
+                out[f"{side}_{key}"] = [
+                    None if position is None else values[position] for position in positions
+                ]
+        return out
+
+    def __iter__(self):
+        return iter(self.rows())
+
+
+class LazySmartElementList:
+    """
+    Filters and transforms of a SmartElementList recorded as a plan, nothing is computed
+    until collect():\n
+        odd = (elements.lazy() % 2 == 1).collect()\n
+        in_range = elements.lazy().gt(3).lt(10).collect()\n
+        elements[elements.lazy() % 2 == 1]  # rows of elements, with their ordering_value\n
+    collect() runs all the steps fused in a single pass over ordering_values (see
+    ColumnBackend.fused_pass): no intermediate SmartElementList, IdSeries or column is built,
+    ids and string_contents are gathered only for the rows kept.
+    Comparison operators filter like eq/ne/gt/lt/ge/le, instead of returning an IdSeries.
+    collect, collect_ids and agg take workers, to run the pass on shards of the list
+    in a ShardPool of worker processes.
+    """
+
+    __slots__ = ("_source", "_steps")
+
+    def __init__(self, source: SmartElementList, steps: tuple[PlanStep, ...] = ()) -> None:
+        self._source = source
+        self._steps = steps
+
+    def _then(
+        self, op: Callable[[int, int], Any], __o: int | Element, is_filter: bool
+    ) -> "LazySmartElementList":
+        step = PlanStep(op, _ordering_operand(__o), is_filter)
+        return LazySmartElementList(self._source, self._steps + (step,))
+
+    def __mod__(self, __o: int | Element) -> "LazySmartElementList":
+        if _ordering_operand(__o) == 0:
+            raise ZeroDivisionError("integer modulo by zero")
+        return self._then(operator.mod, __o, False)
+
+    def __eq__(self, __o: int | Element) -> "LazySmartElementList":
+        return self._then(operator.eq, __o, True)
+
+    def __ne__(self, __o: int | Element) -> "LazySmartElementList":
+        return self._then(operator.ne, __o, True)
+
+    def __gt__(self, __o: int | Element) -> "LazySmartElementList":
+        return self._then(operator.gt, __o, True)
+
+    def __lt__(self, __o: int | Element) -> "LazySmartElementList":
+        return self._then(operator.lt, __o, True)
+
+    def __ge__(self, __o: int | Element) -> "LazySmartElementList":
+        return self._then(operator.ge, __o, True)
+
+    def __le__(self, __o: int | Element) -> "LazySmartElementList":
+        return self._then(operator.le, __o, True)
+
+    eq = __eq__
+    ne = __ne__
+    gt = __gt__
+    lt = __lt__
+    ge = __ge__
+    le = __le__
+
+    __hash__ = None
+
+    def _run(self, workers: int | None = None) -> tuple[Any, Any]:
+        """positions of the rows of the source kept and their transformed ordering_values"""
+        values = self._source._columns.ordering_values
+        if workers is None or workers < 2:
+            return _BACKEND.fused_pass(values, list(self._steps))
+        return _shard_pool(workers).fused_pass(values, list(self._steps))
+
+    def collect(self, workers: int | None = None) -> SmartElementList:
+        """
+        Args:
+            workers (int, optional): number of worker processes running the plan on shards
+                of the list, None runs it in this process
+        """
+        if not self._steps:
+            return self._source.copy()
+        positions, ordering_values = self._run(workers)
+        return SmartElementList._from_columns(
+            self._source._columns.take_transformed(positions, ordering_values)
+        )
+
+    def collect_ids(self, workers: int | None = None) -> IdSeries:
+        positions, _ = self._run(workers)
+        return IdSeries(_BACKEND.take(self._source._columns.ids, positions))
+
+    def agg(self, *aggregations: str, workers: int | None = None) -> dict[str, Any]:
+        """
+        Aggregate the ordering_values of the rows kept, after the transforms
+
+        Args:
+            aggregations (str): names in AGGREGATIONS, all of them if empty
+            workers (int, optional): see collect, each worker aggregates its shard
+
+        Returns:
+            dict[str, Any]: aggregation -> value, min, max and mean are None if no row is kept
+        """
+        aggregations = aggregations or AGGREGATIONS
+        for aggregation in aggregations:
+            if aggregation not in AGGREGATIONS:
+                raise ValueError(f"Not yet implemented for {aggregation}")
+        values = self._source._columns.ordering_values
+        if workers is None or workers < 2:
+            positions, transformed = _BACKEND.fused_pass(values, list(self._steps))
+            if transformed is None:
+                transformed = _BACKEND.take(values, positions)
+            count, total, minimum, maximum = _BACKEND.summarize(transformed)
+        else:
+            count, total, minimum, maximum = _shard_pool(workers).summarize(
+                values, list(self._steps)
+            )
+        results = {
+            "count": count,
+            "sum": total,
+            "min": minimum,
+            "max": maximum,
+            "mean": total / count if count else None,
+        }
+        return {aggregation: results[aggregation] for aggregation in aggregations}
+
+    def explain(self) -> str:
+        lines = [f"scan SmartElementList of {len(self._source)} elements"]
+        lines += [f"  {step}" for step in self._steps]
+        if self._steps:
+            lines.append(f"fused by {type(_BACKEND).__name__} in a single pass:")
+            lines += [
+                f"  {line}" for line in _BACKEND.explain_fused_pass(list(self._steps)).splitlines()
+            ]
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return f"<LazySmartElementList\n{self.explain()}\n>"
+
+
+# Parallel execution: ordering_values are copied once in shared memory, each worker attaches
+# to it by name and runs the fused pass on its shard, writing the kept positions and values
+# back in shared memory at the offset of the shard: only the plan, the shard bounds and
+# the number of kept rows are pickled
+_MIN_SHARD_ROWS = _FUSED_CHUNK_ROWS
+_CAN_FORK = "fork" in multiprocessing.get_all_start_methods()
+_SHARD_POOL = None  # type: ShardPool | None
+
+
+def _shard_pass(
+    names: tuple[str, ...],
+    length: int,
+    start: int,
+    stop: int,
+    steps: list[PlanStep],
+    summarize: bool,
+) -> int | tuple[int, int, int | None, int | None]:
+    """Executed in the worker process, fused pass over the rows start:stop
+
+    Args:
+        names (tuple[str, ...]): shared memories of the values and, if not summarize,
+            of the output positions and of the output values (if the steps transform them)
+
+    Returns:
+        int | tuple: number of rows kept, or their summary (see ColumnBackend.summarize)
+    """
+    memories = [SharedMemory(name=name) for name in names]
+    try:
+        return _shard_pass_on(
+            [memory.buf for memory in memories], length, start, stop, steps, summarize
+        )
+    finally:
+        for memory in memories:
+            memory.close()
+
+
+def _shard_pass_on(
+    buffers: list[memoryview],
+    length: int,
+    start: int,
+    stop: int,
+    steps: list[PlanStep],
+    summarize: bool,
+) -> int | tuple[int, int, int | None, int | None]:
+    # the columns over the shared memories must be released before closing them
+    values = _BACKEND.shared_int_column(buffers[0], length)
+    positions, transformed = _BACKEND.fused_pass(values[start:stop], steps, start)
+    if summarize:
+        if transformed is None:
+            transformed = _BACKEND.take(values, positions)
+        return _BACKEND.summarize(transformed)
+    kept = len(positions)
+    _BACKEND.shared_int_column(buffers[1], length)[start : start + kept] = positions
+    if transformed is not None:
+        _BACKEND.shared_int_column(buffers[2], length)[start : start + kept] = transformed
+    return kept
+
+
+class ShardPool:
+    """
+    Pool of worker processes running LazySmartElementList plans on shards of a column,
+    the column is shared with the workers through multiprocessing.shared_memory.\n
+    Workers are forked where possible, started on the first call and reused by the next ones.
+    Columns shorter than two shards of _MIN_SHARD_ROWS run in this process.
+    """
+
+    __slots__ = ("workers", "_executor")
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._executor = None  # type: ProcessPoolExecutor | None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # workers attaching a shared memory register it to the resource tracker,
+            # started before forking they share the one of this process
+            resource_tracker.ensure_running()
+            self._executor = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("fork") if _CAN_FORK else None,
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _shards(self, length: int) -> list[tuple[int, int]]:
+        shard_rows = max(_MIN_SHARD_ROWS, -(-length // self.workers))
+        return [(start, min(start + shard_rows, length)) for start in range(0, length, shard_rows)]
+
+    def fused_pass(self, values: Any, steps: list[PlanStep]) -> tuple[Any, Any]:
+        """Same as ColumnBackend.fused_pass, run by the workers"""
+        shards = self._shards(len(values))
+        if len(shards) < 2:
+            return _BACKEND.fused_pass(values, steps)
+        has_transforms = not all(step.is_filter for step in steps)
+        memories = self._share(values, 2 + has_transforms)
+        try:
+            kept = self._map(memories, len(values), shards, steps, False)
+            ranges = [(start, start + rows) for (start, _), rows in zip(shards, kept)]
+            positions = _BACKEND.int_column_from_shared(
+                _BACKEND.shared_int_column(memories[1].buf, len(values)), ranges
+            )
+            if not has_transforms:
+                return positions, None
+            return positions, _BACKEND.int_column_from_shared(
+                _BACKEND.shared_int_column(memories[2].buf, len(values)), ranges
+            )
+        finally:
+            self._release(memories)
+
+    def summarize(
+        self, values: Any, steps: list[PlanStep]
+    ) -> tuple[int, int, int | None, int | None]:
+        """ColumnBackend.summarize of the values kept by the fused pass, by shard then merged"""
+        shards = self._shards(len(values))
+        if len(shards) < 2:
+            positions, transformed = _BACKEND.fused_pass(values, steps)
+            if transformed is None:
+                transformed = _BACKEND.take(values, positions)
+            return _BACKEND.summarize(transformed)
+        memories = self._share(values, 1)
+        try:
+            summaries = self._map(memories, len(values), shards, steps, True)
+        finally:
+            self._release(memories)
+        summaries = [summary for summary in summaries if summary[0]]
+        if not summaries:
+            return 0, 0, None, None
+        return (
+            sum(summary[0] for summary in summaries),
+            sum(summary[1] for summary in summaries),
+            min(summary[2] for summary in summaries),
+            max(summary[3] for summary in summaries),
+        )
+
+    def _share(self, values: Any, number_of_columns: int) -> list[SharedMemory]:
+        """number_of_columns shared int columns as long as values, the first one is values"""
+        memories = []  # type: list[SharedMemory]
+        try:
+            for _ in range(number_of_columns):
+                memories.append(SharedMemory(create=True, size=len(values) * 8))
+            _BACKEND.shared_int_column(memories[0].buf, len(values))[:] = values
+        except BaseException:
+            self._release(memories)
+            raise
+        return memories
+
+    @staticmethod
+    def _release(memories: list[SharedMemory]) -> None:
+        for memory in memories:
+            try:
+                memory.close()
+            except BufferError:
+                # a column over it is still referenced by a traceback, unmapped once collected
+                pass
+            memory.unlink()
+
+    def _map(
+        self,
+        memories: list[SharedMemory],
+        length: int,
+        shards: list[tuple[int, int]],
+        steps: list[PlanStep],
+        summarize: bool,
+    ) -> list:
+        names = tuple(memory.name for memory in memories)
+        executor = self._get_executor()
+        futures = [
+            executor.submit(_shard_pass, names, length, start, stop, steps, summarize)
+            for start, stop in shards
+        ]
+        return [future.result() for future in futures]
+
+
+def _shard_pool(workers: int) -> ShardPool:
+    """ShardPool of workers processes, reused while the number of workers doesn't change"""
+    global _SHARD_POOL
+    if _SHARD_POOL is None or _SHARD_POOL.workers != workers:
+        if _SHARD_POOL is not None:
+            _SHARD_POOL.shutdown()
+        _SHARD_POOL = ShardPool(workers)
+    return _SHARD_POOL
+
+
+# Column file, the binary format of MappedSmartElementList, all ints are int64 little endian:
+#   header: _COLUMN_FILE_MAGIC, padded to the page size
+#   chunks: ids[rows] | ordering_values[rows] | end offset of each string in blob[rows] |
+#           blob of the utf-8 string_contents, each chunk padded to the page size
+#   footer: (offset, rows, blob size) of each chunk
+#   trailer: footer offset | number of chunks | _COLUMN_FILE_MAGIC
+_COLUMN_FILE_MAGIC = b"SELCOL01"
+_COLUMN_FILE_TRAILER = struct.Struct("<qq8s")
+_CHUNK_ROWS = 1 << 16
+
+
+def _encode_strings(strings: list[str]) -> tuple[bytes, list[int]]:
+    """utf-8 blob of strings and the end offset of each string in it"""
+    text = "".join(strings)
+    if text.isascii():
+        # one byte per char, no need to encode the strings one by one
+        return text.encode("ascii"), list(itertools.accumulate(map(len, strings)))
+    encoded = [string.encode() for string in strings]
+    return b"".join(encoded), list(itertools.accumulate(map(len, encoded)))
+
+
+def _decode_strings(blob: bytes, ends: list[int]) -> list[str]:
+    starts = itertools.chain((0,), ends)
+    if blob.isascii():
+        text = blob.decode("ascii")
+        return [text[start:end] for start, end in zip(starts, ends)]
+    return [blob[start:end].decode() for start, end in zip(starts, ends)]
+
+
+class ColumnFileWriter:
+    """
+    Write rows to a column file chunk by chunk, so only one chunk is in memory:\n
+        with ColumnFileWriter("elements.col") as writer:\n
+            writer.write(columns)\n
+    The footer is written by close(), before that the file is not readable.
+    """
+
+    def __init__(self, path: str | os.PathLike, chunk_rows: int = _CHUNK_ROWS) -> None:
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self._file = open(path, "wb")
+        self._chunks = array("q")
+        self._write_padded(_COLUMN_FILE_MAGIC)
+
+    def _write_padded(self, data: bytes) -> None:
+        self._file.write(data)
+        padding = -self._file.tell() % mmap.PAGESIZE
+        self._file.write(bytes(padding))
+
+    def write(self, columns: ElementColumns) -> None:
+        for chunk in columns.chunks(self.chunk_rows):
+            blob, ends = _encode_strings(_BACKEND.to_list(chunk.string_contents))
+            self._chunks.extend((self._file.tell(), len(chunk), len(blob)))
+            self._file.write(_BACKEND.int_column_to_bytes(chunk.ids))
+            self._file.write(_BACKEND.int_column_to_bytes(chunk.ordering_values))
+            self._file.write(_BACKEND.int_column_to_bytes(_BACKEND.int_column(ends)))
+            self._write_padded(blob)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        footer_offset = self._file.tell()
+        self._file.write(_BACKEND.int_column_to_bytes(_BACKEND.int_column(self._chunks)))
+        self._file.write(
+            _COLUMN_FILE_TRAILER.pack(footer_offset, len(self._chunks) // 3, _COLUMN_FILE_MAGIC)
+        )
+        self._file.close()
+
+    def __enter__(self) -> "ColumnFileWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class MappedSmartElementList:
+    """
+    SmartElementList stored in a column file (see ColumnFileWriter) and memory mapped,
+    for datasets larger than RAM:\n
+        elements = MappedSmartElementList.write("elements.col", smart_element_list)\n
+        elements.gt(3)  # SmartElementList\n
+        elements.gt(3, path="gt_3.col")  # MappedSmartElementList\n
+        elements.groupby("string_content").agg("count")\n
+    Filters and aggregations stream the file chunk by chunk: only the chunk being
+    processed is copied in memory, its pages are dropped from the mapping once done,
+    so resident memory stays bounded by the chunk size (plus the results).
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if (
+            len(self._map) < len(_COLUMN_FILE_MAGIC) + _COLUMN_FILE_TRAILER.size
+            or self._map[: len(_COLUMN_FILE_MAGIC)] != _COLUMN_FILE_MAGIC
+        ):
+            self.close()
+            raise ValueError(f"{path} is not a column file")
+        footer_offset, number_of_chunks, magic = _COLUMN_FILE_TRAILER.unpack_from(
+            self._map, len(self._map) - _COLUMN_FILE_TRAILER.size
+        )
+        if magic != _COLUMN_FILE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is truncated, was its ColumnFileWriter closed?")
+        footer = _BACKEND.to_list(
+            _BACKEND.int_column_from_bytes(self._map, footer_offset, 3 * number_of_chunks)
+        )
+        # (offset, rows, blob size) of each chunk
+        self._chunks = list(zip(footer[0::3], footer[1::3], footer[2::3]))
+        self._length = sum(rows for _, rows, _ in self._chunks)
+        if hasattr(self._map, "madvise"):
+            self._map.madvise(mmap.MADV_SEQUENTIAL)
+
+    @classmethod
+    def write(
+        cls,
+        path: str | os.PathLike,
+        elements: SmartElementList | Iterable[SmartElement],
+        chunk_rows: int = _CHUNK_ROWS,
+    ) -> "MappedSmartElementList":
+        """Write elements to a column file at path and map it"""
+        with ColumnFileWriter(path, chunk_rows) as writer:
+            if isinstance(elements, SmartElementList):
+                writer.write(elements._columns)
+            else:
+                chunk = []
+                for element in elements:
+                    chunk.append(element)
+                    if len(chunk) == chunk_rows:
+                        writer.write(ElementColumns.from_elements(chunk))
+                        chunk = []
+                writer.write(ElementColumns.from_elements(chunk))
+        return cls(path)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def chunks(self) -> Iterator[ElementColumns]:
+        """Rows of each chunk, read from the mapping"""
+        for offset, rows, blob_size in self._chunks:
+            ids = _BACKEND.int_column_from_bytes(self._map, offset, rows)
+            ordering_values = _BACKEND.int_column_from_bytes(self._map, offset + 8 * rows, rows)
+            ends = _BACKEND.int_column_from_bytes(self._map, offset + 16 * rows, rows)
+            blob_offset = offset + 24 * rows
+            string_contents = _decode_strings(
+                self._map[blob_offset : blob_offset + blob_size], _BACKEND.to_list(ends)
+            )
+            self._release(offset, blob_offset + blob_size)
+            yield ElementColumns(ids, ordering_values, _BACKEND.str_column(string_contents))
+
+    def _filtered_chunks(
+        self, op: Callable[[Any, Any], bool], value: int
+    ) -> Iterator[ElementColumns]:
+        """Rows of each chunk where op(ordering_value, value),
+        the other columns are read only for the rows kept"""
+        for offset, rows, blob_size in self._chunks:
+            ordering_values = _BACKEND.int_column_from_bytes(self._map, offset + 8 * rows, rows)
+            positions = _BACKEND.positions(_BACKEND.compare(ordering_values, op, value))
+            if len(positions):
+                ids = _BACKEND.int_column_from_bytes(self._map, offset, rows)
+                ends = _BACKEND.to_list(
+                    _BACKEND.int_column_from_bytes(self._map, offset + 16 * rows, rows)
+                )
+                starts = [0] + ends
+                blob_offset = offset + 24 * rows
+                blob = self._map
+                string_contents = [
+                    blob[blob_offset + starts[position] : blob_offset + ends[position]].decode()
+                    for position in _BACKEND.to_list(positions)
+                ]
+                yield ElementColumns(
+                    _BACKEND.take(ids, positions),
+                    _BACKEND.take(ordering_values, positions),
+                    _BACKEND.str_column(string_contents),
+                )
+            self._release(offset, offset + 24 * rows + blob_size)
+
+    def _release(self, start: int, stop: int) -> None:
+        """Drop the pages of the chunk from the resident memory, they were copied"""
+        if (
+            hasattr(mmap, "MADV_DONTNEED")
+            and start % mmap.PAGESIZE == 0
+            and hasattr(self._map, "madvise")
+        ):
+            self._map.madvise(mmap.MADV_DONTNEED, start, stop - start)
+
+    def load(self) -> SmartElementList:
+        """All the rows in memory"""
+        return self._collect(self.chunks())
+
+    def _collect(
+        self, chunks: Iterable[ElementColumns], path: str | os.PathLike | None = None
+    ) -> "SmartElementList | MappedSmartElementList":
+        if path is not None:
+            with ColumnFileWriter(path) as writer:
+                for chunk in chunks:
+                    writer.write(chunk)
+            return MappedSmartElementList(path)
+        out = ElementColumns.from_elements(())
+        for chunk in chunks:
+            out.append(chunk)
+        return SmartElementList._from_columns(out)
+
+    def _filter(
+        self, op: Callable[[Any, Any], bool], __o: int | Element, path: str | os.PathLike | None
+    ) -> "SmartElementList | MappedSmartElementList":
+        return self._collect(self._filtered_chunks(op, _ordering_operand(__o)), path)
+
+    def eq(self, __o: int | Element, path: str | os.PathLike | None = None):
+        """
+        Rows with ordering_value == __o, in a SmartElementList or,
+        if path is given, in a MappedSmartElementList written at path
+        """
+        return self._filter(operator.eq, __o, path)
+
+    def ne(self, __o: int | Element, path: str | os.PathLike | None = None):
+        return self._filter(operator.ne, __o, path)
+
+    def gt(self, __o: int | Element, path: str | os.PathLike | None = None):
+        return self._filter(operator.gt, __o, path)
+
+    def lt(self, __o: int | Element, path: str | os.PathLike | None = None):
+        return self._filter(operator.lt, __o, path)
+
+    def ge(self, __o: int | Element, path: str | os.PathLike | None = None):
+        return self._filter(operator.ge, __o, path)
+
+    def le(self, __o: int | Element, path: str | os.PathLike | None = None):
+        return self._filter(operator.le, __o, path)
+
+    def _id_series(self, op: Callable[[Any, Any], bool], __o: int | Element) -> IdSeries:
+        return IdSeries(self._filter(op, __o, None)._columns.ids)
+
+    def __eq__(self, __o: int) -> IdSeries:
+        return self._id_series(operator.eq, __o)
+
+    def __ne__(self, __o: int) -> IdSeries:
+        return self._id_series(operator.ne, __o)
+
+    def __gt__(self, __o: int) -> IdSeries:
+        return self._id_series(operator.gt, __o)
+
+    def __lt__(self, __o: int) -> IdSeries:
+        return self._id_series(operator.lt, __o)
+
+    def __ge__(self, __o: int) -> IdSeries:
+        return self._id_series(operator.ge, __o)
+
+    def __le__(self, __o: int) -> IdSeries:
+        return self._id_series(operator.le, __o)
+
+    __hash__ = None
+
+    def groupby(self, by: str = "string_content") -> GroupBy:
+        return GroupBy(self.chunks, by)
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "MappedSmartElementList":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"<MappedSmartElementList {self.path!r} of {len(self)} elements>"
+
+
+# header of the csv files, keys of the JSON lines
+_KEY_COLUMNS_ORDER = ("id", "ordering_value", "string_content")
+
+
+def _key_indexes(path: str | os.PathLike, header: list[str], keep_ids: bool) -> list[int]:
+    """Positions in header of the columns loaded, id first if keep_ids"""
+    names = _KEY_COLUMNS_ORDER if keep_ids else _KEY_COLUMNS_ORDER[1:]
+    missing = [name for name in names if name not in header]
+    if missing:
+        raise ValueError(f"{path} has no {', '.join(missing)} column")
+    return [header.index(name) for name in names]
+
+
+def _csv_columns(lines: list[str], number_of_fields: int) -> list[list[str]] | None:
+    """
+    Fields of each column of lines, split with str methods only (C loops, no per row
+    python code). None if lines have quoted fields or rows without number_of_fields fields,
+    they must be parsed by csv.reader
+    """
+    text = "".join(lines)
+    if '"' in text:
+        return None
+    # every line must have its own number_of_fields fields, blank lines are skipped by csv.reader
+    commas_per_line = list(map(str.count, lines, itertools.repeat(",")))
+    if commas_per_line.count(number_of_fields - 1) != len(lines) or any(
+        map(str.isspace, lines)
+    ):
+        return None
+    fields = text.replace("\r\n", ",").replace("\n", ",").split(",")
+    # the last line terminator leaves an empty field
+    fields.pop()
+    if len(fields) != number_of_fields * len(lines):
+        return None
+    return [fields[index::number_of_fields] for index in range(number_of_fields)]
+
+
+def _csv_chunks(path: str | os.PathLike, keep_ids: bool) -> Iterator[tuple[Any, Any, Any]]:
+    with open(path, newline="", encoding="utf-8") as file:
+        header = next(csv.reader([file.readline()]), [])
+        indexes = _key_indexes(path, header, keep_ids)
+        while True:
+            lines = list(itertools.islice(file, _CHUNK_ROWS))
+            if not lines:
+                return
+            columns = _csv_columns(lines, len(header))
+            if columns is None:
+                # a quoted field can contain line terminators, read until its closing quote
+                while sum(line.count('"') for line in lines) % 2:
+                    line = file.readline()
+                    if not line:
+                        raise ValueError(f"{path} ends inside a quoted field")
+                    lines.append(line)
+                rows = [row for row in csv.reader(lines) if row]
+                if any(len(row) != len(header) for row in rows):
+                    raise ValueError(f"{path} has rows with missing fields")
+                columns = list(zip(*rows)) or [()] * len(header)
+            fields = [columns[index] for index in indexes]
+            yield (
+                _BACKEND.int_column(map(int, fields[0])) if keep_ids else None,
+                _BACKEND.int_column(map(int, fields[-2])),
+                _BACKEND.str_column(fields[-1]),
+            )
+
+
+def _jsonl_chunks(path: str | os.PathLike, keep_ids: bool) -> Iterator[tuple[Any, Any, Any]]:
+    names = _KEY_COLUMNS_ORDER if keep_ids else _KEY_COLUMNS_ORDER[1:]
+    with open(path, encoding="utf-8") as file:
+        while True:
+            lines = list(itertools.islice(file, _CHUNK_ROWS))
+            if not lines:
+                return
+            # the lines of a chunk are parsed as a single JSON array, one call to the parser
+            rows = json.loads("[" + ",".join(line for line in lines if not line.isspace()) + "]")
+            try:
+                fields = [[row[name] for row in rows] for name in names]
+            except KeyError as e:
+                raise ValueError(f"{path} has rows without {e.args[0]}") from e
+            yield (
+                _BACKEND.int_column(fields[0]) if keep_ids else None,
+                _BACKEND.int_column(fields[-2]),
+                _BACKEND.str_column(fields[-1]),
+            )
+
+
+element_list = [
+    SmartElement(1, "Hey"),
+    SmartElement(2, "Hey"),
+    SmartElement(3, "You"),
+    SmartElement(4, "Hello"),
+    SmartElement(5, "Rock"),
+    SmartElement(6, "World"),
+]
+
+
+def _example():
+    elements = SmartElementList(element_list)
+    el = SmartElement(9, "Added later")
+    els = elements + el
+    print(els)
+    el2 = SmartElement(9, "Added later 2")
+    try:
+        els = els - el2
+    except ValueError:
+        print("Can't do that, those items have different ids!!")
+        print(f"{repr(el)} != {repr(el2)}")
+    els += el2
+    els -= el
+    print(els)
+    print(elements[elements % 2 == 1])
+    print(elements[elements == 1])
+    joined = elements + el2
+    pairs = joined.join(elements, how="left")
+    joined -= el2
+    # the pairs are those of joined when join() was called, el2 had no match in elements
+    assert [right is None for _, right in pairs.rows()] == [
+        element == el2 for element in pairs.left().elements
+    ]
+    grouped = elements + el2
+    groups = grouped.groupby()
+    grouped += el
+    # the groups are those of grouped when groupby() was called, like its lazy plans
+    assert "Added later" not in groups.agg("count")["string_content"]
+
+
+def _random_elements(number_of_elements: int) -> SmartElementList:
+    return SmartElementList(
+        [SmartElement(random.randrange(1000), "bench") for _ in range(number_of_elements)]
+    )
+
+
+def _benchmark_filter(number_of_elements: int = 10**6) -> None:
+    elements = _random_elements(number_of_elements)
+    start = perf_counter()
+    elements[elements % 2 == 1]
+    print(
+        f"{type(_BACKEND).__name__}: elements[elements % 2 == 1] with {number_of_elements} "
+        f"elements took {perf_counter() - start:.3f}s"
+    )
+    # NumpyColumnBackend: ~0.12s, ArrayColumnBackend: ~0.54s
+    # previous list of SmartElement: way too long, IdSeries membership was a linear scan
+
+
+def _benchmark_ids() -> None:
+    for number_of_elements in (10**5, 10**6):
+        elements = _random_elements(number_of_elements)
+        element = elements[number_of_elements // 2].elements[0]
+        start = perf_counter()
+        elements[elements == 1]
+        select_time = perf_counter() - start
+        start = perf_counter()
+        for _ in range(1000):
+            element in elements
+        contains_time = perf_counter() - start
+        start = perf_counter()
+        elements - element
+        sub_time = perf_counter() - start
+        print(
+            f"{type(_BACKEND).__name__} {number_of_elements} elements: "
+            f"elements[elements == 1] {select_time:.3f}s, "
+            f"1000 x element in elements {contains_time:.3f}s, "
+            f"elements - element {sub_time:.3f}s"
+        )
+    # NumpyColumnBackend 100000 elements: ~0.002s, ~0.02s, ~0.001s
+    # NumpyColumnBackend 1000000 elements: ~0.03s, ~0.19s, ~0.008s
+    # ArrayColumnBackend 1000000 elements: ~0.24s, ~0.19s, ~0.03s
+    # the first lookup by id builds the hash index (~0.19s for 10^6 ids), then it's O(1)
+    # previous tuple IdSeries, elements[elements % 2 == 1]: 0.67s with 10^4 elements,
+    # 5s with 3*10^4 elements (quadratic)
+
+
+def _benchmark_in_place(number_of_elements: int = 10**6, operations: int = 10**4) -> None:
+    elements = _random_elements(number_of_elements)
+    added = [SmartElement(random.randrange(1000), "added") for _ in range(operations)]
+    start = perf_counter()
+    for element in added:
+        elements += element
+    add_time = perf_counter() - start
+    start = perf_counter()
+    for element in reversed(added):
+        elements -= element
+    sub_time = perf_counter() - start
+    start = perf_counter()
+    for _ in range(operations):
+        elements.copy()
+    copy_time = perf_counter() - start
+    print(
+        f"{type(_BACKEND).__name__} {number_of_elements} elements: {operations} x "
+        f"elements += element {add_time:.3f}s, "
+        f"elements -= last element {sub_time:.3f}s, "
+        f"elements.copy() {copy_time:.3f}s"
+    )
+    # NumpyColumnBackend 1000000 elements: 10000 x ~0.08s, ~0.22s, ~0.016s
+    # ArrayColumnBackend 1000000 elements: 10000 x ~0.10s, ~0.19s, ~0.010s
+    # (-= includes the first build of the id index, ~0.19s)
+    # previous copy of all the columns for each operation (numpy), extrapolated from 100 ops:
+    # ~60s, ~1600s (the id index was rebuilt by every copy), ~55s
+
+
+def _benchmark_lazy(number_of_elements: int = 10**6) -> None:
+    elements = _random_elements(number_of_elements)
+    for label, eager, lazy in [
+        (
+            "elements[elements % 2 == 1]",
+            lambda: elements[elements % 2 == 1],
+            lambda: elements[elements.lazy() % 2 == 1],
+        ),
+        (
+            "(elements.gt(100).lt(900) % 7).ne(0)",
+            lambda: (elements.gt(100).lt(900) % 7).ne(0),
+            lambda: (elements.lazy().gt(100).lt(900) % 7).ne(0).collect(),
+        ),
+    ]:
+        start = perf_counter()
+        eager()
+        eager_time = perf_counter() - start
+        start = perf_counter()
+        lazy()
+        lazy_time = perf_counter() - start
+        print(
+            f"{type(_BACKEND).__name__} {number_of_elements} elements: {label} "
+            f"eager {eager_time:.3f}s, lazy {lazy_time:.3f}s"
+        )
+    # NumpyColumnBackend elements[elements % 2 == 1]: eager ~0.07s, lazy ~0.011s
+    # NumpyColumnBackend (elements.gt(100).lt(900) % 7).ne(0): eager ~0.03s, lazy ~0.017s
+    # ArrayColumnBackend elements[elements % 2 == 1]: eager ~0.51s, lazy ~0.27s
+    # ArrayColumnBackend (elements.gt(100).lt(900) % 7).ne(0): eager ~0.90s, lazy ~0.42s
+
+
+def _benchmark_sorted_index(number_of_elements: int = 10**6) -> None:
+    elements = _random_elements(number_of_elements)
+    indexed = elements.copy()
+    start = perf_counter()
+    indexed.create_sorted_index()
+    build_time = perf_counter() - start
+    timings = []
+    for label, query in [
+        ("eq(500)", lambda elements: elements.eq(500)),
+        ("gt(998)", lambda elements: elements.gt(998)),
+        ("lt(10)", lambda elements: elements.lt(10)),
+        ("ge(100) (90% of the rows)", lambda elements: elements.ge(100)),
+    ]:
+        start = perf_counter()
+        query(elements)
+        scan_time = perf_counter() - start
+        start = perf_counter()
+        query(indexed)
+        timings.append(f"{label} scan {scan_time:.4f}s index {perf_counter() - start:.4f}s")
+    added = [SmartElement(random.randrange(1000), "added") for _ in range(10**4)]
+    start = perf_counter()
+    for element in added:
+        indexed += element
+    add_time = perf_counter() - start
+    start = perf_counter()
+    indexed.sort()
+    sort_time = perf_counter() - start
+    start = perf_counter()
+    elements.sort()
+    print(
+        f"{type(_BACKEND).__name__} {number_of_elements} elements: "
+        f"create_sorted_index {build_time:.3f}s, " + ", ".join(timings) + ", "
+        f"10^4 x += {add_time:.3f}s, sort() indexed {sort_time:.3f}s "
+        f"not indexed {perf_counter() - start:.3f}s"
+    )
+    # NumpyColumnBackend: create_sorted_index ~0.16s, eq(500) scan ~0.0015s index ~0.0002s,
+    # gt(998) scan ~0.0015s index ~0.0001s, lt(10) scan ~0.0015s index ~0.0002s,
+    # ge(100) falls back to the scan, 10^4 x += ~0.15s (~0.08s not indexed),
+    # sort() indexed ~0.1s not indexed ~0.1s
+    # ArrayColumnBackend: create_sorted_index ~0.9s, eq(500) scan ~0.08s index ~0.0005s,
+    # gt(998) scan ~0.08s index ~0.0005s, lt(10) scan ~0.09s index ~0.004s,
+    # ge(100) falls back to the scan, 10^4 x += ~0.15s, sort() indexed ~0.3s not indexed ~0.7s
+
+
+def _benchmark_groupby(number_of_elements: int = 10**6, number_of_groups: int = 1000) -> None:
+    contents = [f"group {group}" for group in range(number_of_groups)]
+    elements = SmartElementList(
+        [
+            SmartElement(random.randrange(1000), random.choice(contents))
+            for _ in range(number_of_elements)
+        ]
+    )
+    start = perf_counter()
+    groups = {}
+    for element in elements.elements:
+        groups.setdefault(element.string_content, []).append(element.ordering_value)
+    {
+        string_content: (len(values), sum(values), min(values), max(values))
+        + (sum(values) / len(values),)
+        for string_content, values in groups.items()
+    }
+    loop_time = perf_counter() - start
+    start = perf_counter()
+    elements.groupby("string_content").agg("count", "sum", "min", "max", "mean")
+    print(
+        f"{type(_BACKEND).__name__} {number_of_elements} elements, {number_of_groups} groups: "
+        f"loop over elements {loop_time:.3f}s, groupby().agg() {perf_counter() - start:.3f}s"
+    )
+    # NumpyColumnBackend 1000000 elements, 1000 groups: loop ~1.4s, groupby().agg() ~0.11s
+    # ArrayColumnBackend 1000000 elements, 1000 groups: loop ~1.6s, groupby().agg() ~0.19s
+
+
+def _benchmark_join(number_of_elements: int = 10**6) -> None:
+    def random_list(number_of_elements: int) -> SmartElementList:
+        return SmartElementList(
+            [
+                SmartElement(random.randrange(10 * number_of_elements), "bench")
+                for _ in range(number_of_elements)
+            ]
+        )
+
+    small_left, small_right = random_list(1000), random_list(1000)
+    start = perf_counter()
+    [
+        (left, right)
+        for left in small_left.elements
+        for right in small_right.elements
+        if left.ordering_value == right.ordering_value
+    ]
+    loop_time = perf_counter() - start
+    left, right = random_list(number_of_elements), random_list(number_of_elements)
+    timings = []
+    for label, join in [
+        ("inner on ordering_value", lambda: left.join(right, "ordering_value")),
+        ("anti on id", lambda: left.join(left[::2], "id", "anti")),
+        ("left on indexed ordering_value", lambda: left.join(right, "ordering_value", "left")),
+    ]:
+        if label.startswith("left"):
+            right.create_sorted_index()
+        start = perf_counter()
+        result = join()
+        timings.append(f"{label} ({result.strategy}) {perf_counter() - start:.3f}s")
+    print(
+        f"{type(_BACKEND).__name__}: nested loop join of 1000 x 1000 elements {loop_time:.3f}s, "
+        f"join of {number_of_elements} x {number_of_elements} elements: " + ", ".join(timings)
+    )
+    # NumpyColumnBackend: nested loop ~0.6s, inner on ordering_value (hash) ~1.0s,
+    # anti on id (hash) ~0.3s, left on indexed ordering_value (merge) ~0.33s
+    # ArrayColumnBackend: nested loop ~0.7s, inner on ordering_value (hash) ~1.0s,
+    # anti on id (hash) ~0.3s, left on indexed ordering_value (hash) ~1.2s
+    # the nested loop is quadratic, 10^6 x 10^6 elements would take ~7 days
+
+
+def _benchmark_mapped(number_of_elements: int = 10**7) -> None:
+    import resource
+    import tempfile
+
+    contents = [f"group {group}" for group in range(100)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "elements.col")
+        start = perf_counter()
+        with ColumnFileWriter(path) as writer:
+            # written chunk by chunk, the whole list is never in memory
+            for chunk_start in range(0, number_of_elements, _CHUNK_ROWS):
+                rows = min(_CHUNK_ROWS, number_of_elements - chunk_start)
+                writer.write(
+                    ElementColumns(
+                        _BACKEND.int_column(range(chunk_start, chunk_start + rows)),
+                        _BACKEND.int_column(random.choices(range(1000), k=rows)),
+                        _BACKEND.str_column(random.choices(contents, k=rows)),
+                    )
+                )
+        write_time = perf_counter() - start
+        with MappedSmartElementList(path) as elements:
+            start = perf_counter()
+            elements.gt(998)
+            filter_time = perf_counter() - start
+            start = perf_counter()
+            elements.groupby("string_content").agg("count", "mean")
+            groupby_time = perf_counter() - start
+        print(
+            f"{type(_BACKEND).__name__} {number_of_elements} elements, "
+            f"{os.path.getsize(path) / 2**20:.0f}MB file: write {write_time:.2f}s, "
+            f"gt(998) {filter_time:.2f}s, groupby().agg() {groupby_time:.2f}s, "
+            "peak resident memory "
+            f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10:.0f}MB"
+        )
+    # NumpyColumnBackend 10000000 elements, 305MB file: write ~5.2s, gt(998) ~0.27s,
+    # groupby().agg() ~3.5s, peak resident memory ~48MB
+    # ArrayColumnBackend 10000000 elements, 305MB file: write ~5.4s, gt(998) ~0.87s,
+    # groupby().agg() ~3.3s, peak resident memory ~36MB
+    # a list of 10^7 SmartElement would take ~1.7GB
+
+
+def _benchmark_io(sizes: Iterable[int] = (10**6, 10**7)) -> None:
+    import tempfile
+
+    contents = [f"content {content}" for content in range(100)]
+    with tempfile.TemporaryDirectory() as directory:
+        for number_of_elements in sizes:
+            elements = SmartElementList.from_columns(
+                random.choices(range(1000), k=number_of_elements),
+                random.choices(contents, k=number_of_elements),
+            )
+            timings = []
+            for file_format in ("csv", "jsonl", "binary"):
+                path = os.path.join(directory, f"elements.{file_format}")
+                getattr(elements, f"to_{file_format}")(path)
+                start = perf_counter()
+                getattr(SmartElementList, f"from_{file_format}")(path)
+                timings.append(
+                    f"{file_format} {number_of_elements / (perf_counter() - start) / 10**6:.2f}M"
+                )
+            if number_of_elements <= 10**6:
+                # previous way, a SmartElement for each row
+                start = perf_counter()
+                with open(os.path.join(directory, "elements.csv"), newline="") as file:
+                    reader = csv.reader(file)
+                    next(reader)
+                    SmartElementList([SmartElement(int(row[1]), row[2]) for row in reader])
+                timings.append(
+                    "csv with SmartElement objects "
+                    f"{number_of_elements / (perf_counter() - start) / 10**6:.2f}M"
+                )
+            print(
+                f"{type(_BACKEND).__name__} load {number_of_elements} elements, rows/s: "
+                + ", ".join(timings)
+            )
+    # NumpyColumnBackend rows/s: csv ~1.25M, jsonl ~0.68M, binary ~3.8M (10^6 elements),
+    # csv ~0.96M, jsonl ~0.59M, binary ~3.3M (10^7 elements)
+    # ArrayColumnBackend rows/s: csv ~0.95M, jsonl ~0.49M, binary ~2.8M (10^6 elements),
+    # csv ~0.92M, jsonl ~0.58M, binary ~2.8M (10^7 elements)
+    # a SmartElement for each csv row: ~0.3M rows/s
+
+
+def _benchmark_compact(number_of_elements: int = 10**6) -> None:
+    ordering_values = [random.randrange(1000) for _ in range(number_of_elements)]
+    for element_type in (SmartElement, CompactSmartElement):
+        tracemalloc.start()
+        created = [element_type(value, "bench") for value in ordering_values]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        pivot = element_type(500, "pivot")
+        start = perf_counter()
+        for element in created:
+            element > 500
+        int_time = perf_counter() - start
+        start = perf_counter()
+        for element in created:
+            element > pivot
+        element_time = perf_counter() - start
+        print(
+            f"{element_type.__name__}: {size / number_of_elements:.0f} bytes per element, "
+            f"> int {number_of_elements / int_time / 10**6:.1f}M/s, "
+            f"> element {number_of_elements / element_time / 10**6:.1f}M/s"
+        )
+        del created
+
+    elements = SmartElementList.from_columns(ordering_values, repeat("bench", number_of_elements))
+    start = perf_counter()
+    for position in range(0, number_of_elements, number_of_elements // 1000):
+        elements.elements[position]
+    lazy_time = perf_counter() - start
+    start = perf_counter()
+    materialized = elements._columns.rows()
+    for position in range(0, number_of_elements, number_of_elements // 1000):
+        materialized[position]
+    print(
+        f"{type(_BACKEND).__name__} {number_of_elements} elements, 1000 rows accessed: "
+        f"lazy rows {lazy_time:.3f}s, all rows materialized {perf_counter() - start:.3f}s"
+    )
+    # SmartElement: 132 bytes per element, > int 5.8M/s, > element 6.1M/s
+    # CompactSmartElement: 92 bytes per element, > int 7.0M/s, > element 6.1M/s
+    # (bytes include the ordering_value int and the list slot)
+    # 1000 rows of 10^6 elements: lazy rows ~0.005s, all rows materialized ~1.3s
+
+
+def _benchmark_parallel(number_of_elements: int = 10**7) -> None:
+    elements = SmartElementList.from_columns(
+        [random.randrange(1000) for _ in range(number_of_elements)],
+        repeat("bench", number_of_elements),
+    )
+    plan = (elements.lazy() % 7).gt(2)
+    for workers in range(1, max(os.cpu_count() or 1, 2) + 1):
+        # the first call starts the pool
+        plan.agg("count", workers=workers)
+        start = perf_counter()
+        plan.collect(workers=workers)
+        collect_time = perf_counter() - start
+        start = perf_counter()
+        plan.agg(workers=workers)
+        print(
+            f"{type(_BACKEND).__name__} {number_of_elements} elements, {workers} workers: "
+            f"(% 7).gt(2).collect() {collect_time:.3f}s, .agg() {perf_counter() - start:.3f}s"
+        )
+    if _SHARD_POOL is not None:
+        _SHARD_POOL.shutdown()
+    # measured on a single core, so 2 workers only show the overhead of the shared memory
+    # copy and of gathering the shards (~0.19s numpy, ~1.7s array for 10^7 elements);
+    # the fused pass of each worker is 1 / workers of the single process one
+    # NumpyColumnBackend 1 worker: collect() ~0.26s, agg() ~0.12s
+    # NumpyColumnBackend 2 workers: collect() ~0.45s, agg() ~0.19s
+    # ArrayColumnBackend 1 worker: collect() ~4.0s, agg() ~1.9s
+    # ArrayColumnBackend 2 workers: collect() ~5.8s, agg() ~2.9s
+
+
+if __name__ == "__main__":
+    if "--benchmark" in argv:
+        _benchmark_filter()
+        _benchmark_ids()
+        _benchmark_in_place()
+        _benchmark_lazy()
+        _benchmark_sorted_index()
+        _benchmark_groupby()
+        _benchmark_join()
+        _benchmark_mapped()
+        _benchmark_io()
+        _benchmark_compact()
+        _benchmark_parallel()
+    else:
+        _example()
@@ -1,15 +1,6 @@
 import logging
 from typing import Any
 
-stream_handler = logging.StreamHandler()
-stream_handler.setLevel(logging.INFO)
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(levelname)s: %(asctime)s %(module)s [%(funcName)s -> %(lineno)d]: %(message)s",
-    handlers=[stream_handler],
-)
-from http.server import HTTPServer
 from os.path import dirname, join
 
 from dotenv import load_dotenv
@@ -17,16 +8,50 @@ from os import environ
 
 # set FAVICO_PATH env path so that we can find and load the file content
 environ["FAVICO_PATH"] = join(dirname(__file__), "favicon.ico")
-from rest_server import HttpMethod, RouteWebserver, BadRequestException
+from rest_server import (
+    HttpMethod,
+    RouteWebserver,
+    BadRequestException,
+    GracefulHTTPServer,
+    attach_queue_listener,
+    start_access_log,
+)
+
+stream_handler = logging.StreamHandler()
+stream_handler.setLevel(logging.INFO)
+stream_handler.setFormatter(
+    logging.Formatter(
+        "%(levelname)s: %(asctime)s %(module)s [%(funcName)s -> %(lineno)d]: %(message)s"
+    )
+)
+logging.getLogger().setLevel(logging.DEBUG)
 
 _LOGGER = logging.getLogger("inspired_by_flask")
 
 DOTENV_PATH = join(dirname(__file__), ".env")
 load_dotenv(DOTENV_PATH)
 PORT = int(environ.get("APP_PORT", 8000))
-
-
-WebApp = HTTPServer(("0.0.0.0", PORT), RouteWebserver)
+# fraction of successful requests written in the access log, errors are always written
+ACCESS_LOG_SAMPLE_RATE = float(environ.get("APP_ACCESS_LOG_SAMPLE_RATE", 1.0))
+# seconds given to in-flight requests to complete after SIGTERM
+DRAIN_TIMEOUT = float(environ.get("APP_DRAIN_TIMEOUT", 30))
+# seconds the server keeps accepting after failing the readiness probe, at least one
+# interval of the load balancer's health checks
+READINESS_GRACE = float(environ.get("APP_READINESS_GRACE", 5))
+
+# worker processes executing the cpu_bound routes, defaults to os.cpu_count()
+CPU_WORKERS = int(environ["APP_CPU_WORKERS"]) if environ.get("APP_CPU_WORKERS") else None
+# seconds waited for a cpu_bound route before answering 504
+CPU_TIMEOUT = float(environ["APP_CPU_TIMEOUT"]) if environ.get("APP_CPU_TIMEOUT") else None
+
+# keep-alive connections are closed by WebApp while draining
+RouteWebserver.protocol_version = "HTTP/1.1"
+WebApp = GracefulHTTPServer(
+    ("0.0.0.0", PORT),
+    RouteWebserver,
+    drain_timeout=DRAIN_TIMEOUT,
+    readiness_grace=READINESS_GRACE,
+)
 
 
 @RouteWebserver.route("/", [HttpMethod.GET])
@@ -68,6 +93,16 @@ def get_multi_params(*, HttpMethod_type: "HttpMethod", first, second):
     }
 
 
+@RouteWebserver.get("/sum_of_squares/<int:n>", cpu_bound=True)
+def get_sum_of_squares(*, n: int, **kwargs):
+    # executed in a worker process, other requests are served meanwhile
+    return {
+        "response": "GET /sum_of_squares/<int:n> HelloWorld!",
+        "n": n,
+        "sum": sum(i * i for i in range(n)),
+    }
+
+
 class Foo:
     __my_id = 0  # type: int
 
@@ -127,5 +162,17 @@ class Foo:
 ollare = Foo(558)
 
 
+# the cpu_bound workers are forked once all the routes are registered, before any thread starts
+RouteWebserver.configure_cpu_bound_pool(max_workers=CPU_WORKERS, timeout=CPU_TIMEOUT)
+# request threads only enqueue the records, stream_handler writes them from the listener thread
+log_listener = attach_queue_listener(logging.getLogger(), stream_handler)
+access_log_listener = start_access_log(sample_rate=ACCESS_LOG_SAMPLE_RATE)
+
 _LOGGER.info("Serving server on http://localhost:{}".format(PORT))
-WebApp.serve_forever()
+try:
+    WebApp.serve_until_shutdown()
+finally:
+    # in-flight requests had their drain_timeout, handlers still running are terminated
+    RouteWebserver.shutdown_cpu_bound_pool()
+    access_log_listener.stop()
+    log_listener.stop()
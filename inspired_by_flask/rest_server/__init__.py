@@ -1 +1,4 @@
 from .route_web_server import RouteWebserver, HttpMethod, BadRequestException
+from .router import RequestValidationError
+from .access_log import attach_queue_listener, start_access_log
+from .lifecycle import GracefulHTTPServer, LIVENESS_URL, READINESS_URL
@@ -0,0 +1,219 @@
+import json
+import logging
+import random
+from logging.handlers import QueueHandler
+from queue import Empty, SimpleQueue
+from threading import Thread
+from typing import List, Optional, TextIO
+
+ACCESS_LOGGER_NAME = "rest_server.access"
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that only enqueues the record, message formatting is left to the
+    handlers served by the BatchingQueueListener thread
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # QueueHandler.prepare() merges msg and args in the caller's thread,
+        # records never leave the process so they can be enqueued untouched
+        return record
+
+
+class SuccessSamplingFilter(logging.Filter):
+    """
+    Keep only a sample_rate fraction of the access records of successful requests,
+    records with status >= 400 (and records without access infos) always pass
+    """
+
+    def __init__(self, sample_rate: float) -> None:
+        super().__init__()
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1, got {}".format(sample_rate))
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        access = getattr(record, "access", None)
+        if access is None or access["status"] >= 400:
+            return True
+        return random.random() < self.sample_rate
+
+
+class JsonAccessFormatter(logging.Formatter):
+    """Format records as JSON lines, access records are dumped with all their fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        access = getattr(record, "access", None)
+        if access is None:
+            return json.dumps(
+                {"ts": record.created, "level": record.levelname, "message": record.getMessage()},
+                ensure_ascii=False,
+            )
+        return json.dumps({"ts": record.created, **access}, ensure_ascii=False)
+
+
+class BatchingStreamHandler(logging.StreamHandler):
+    """
+    StreamHandler that buffers the formatted records and writes them with a single
+    write + flush when batch_size records are buffered or when flush() is called
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, batch_size: int = 512) -> None:
+        super().__init__(stream)
+        self.batch_size = batch_size
+        self._buffer = []  # type: List[str]
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._buffer.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if self._buffer and self.stream:
+                self.stream.write(self.terminator.join(self._buffer) + self.terminator)
+                self._buffer.clear()
+                self.stream.flush()
+        finally:
+            self.release()
+
+
+class BatchingQueueListener:
+    """
+    Like logging.handlers.QueueListener, but records are taken from the queue in batches
+    of at most batch_size and the handlers are flushed once per batch.
+    Under load batches grow, so the cost of the I/O is paid once for many records.
+    """
+
+    _sentinel = None
+
+    def __init__(
+        self,
+        queue: SimpleQueue,
+        *handlers: logging.Handler,
+        batch_size: int = 512,
+        flush_interval: float = 0.5,
+    ) -> None:
+        self.queue = queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._thread = None  # type: Optional[Thread]
+
+    def start(self) -> None:
+        self._thread = Thread(target=self._monitor, name="BatchingQueueListener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write all the records still in the queue, then stop the listener thread"""
+        if self._thread is None:
+            return
+        self.queue.put_nowait(self._sentinel)
+        self._thread.join()
+        self._thread = None
+
+    def handle(self, record: logging.LogRecord) -> None:
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def flush(self) -> None:
+        for handler in self.handlers:
+            handler.flush()
+
+    def _monitor(self) -> None:
+        while True:
+            try:
+                record = self.queue.get(timeout=self.flush_interval)
+            except Empty:
+                continue
+            batch_len = 0
+            while record is not self._sentinel:
+                self.handle(record)
+                batch_len += 1
+                if batch_len >= self.batch_size:
+                    break
+                try:
+                    record = self.queue.get_nowait()
+                except Empty:
+                    break
+            self.flush()
+            if record is self._sentinel:
+                return
+
+
+def attach_queue_listener(
+    logger: logging.Logger,
+    *handlers: logging.Handler,
+    batch_size: int = 512,
+    flush_interval: float = 0.5,
+    filters: Optional[List[logging.Filter]] = None,
+) -> BatchingQueueListener:
+    """
+    Detach the I/O of handlers from the threads logging to logger:
+    the logger only enqueues records, a BatchingQueueListener thread formats and writes them.
+
+    Args:
+        logger (logging.Logger): logger that will enqueue its records
+        handlers (logging.Handler): handlers that will be served by the listener thread
+        batch_size (int): max number of records handled before flushing the handlers
+        flush_interval (float): seconds waited for new records before checking the queue again
+        filters (List[logging.Filter], optional): filters applied in the logging thread before enqueuing
+
+    Returns:
+        BatchingQueueListener: the started listener, call stop() on exit to write all pending records
+    """
+    queue = SimpleQueue()
+    queue_handler = NonBlockingQueueHandler(queue)
+    for log_filter in filters or []:
+        queue_handler.addFilter(log_filter)
+    logger.addHandler(queue_handler)
+    listener = BatchingQueueListener(
+        queue, *handlers, batch_size=batch_size, flush_interval=flush_interval
+    )
+    listener.start()
+    return listener
+
+
+def start_access_log(
+    stream: Optional[TextIO] = None,
+    *,
+    sample_rate: float = 1.0,
+    batch_size: int = 512,
+    flush_interval: float = 0.5,
+) -> BatchingQueueListener:
+    """
+    Write the access logs of RouteWebserver as JSON lines to stream (default sys.stderr)
+    from a background thread, example line:
+
+    {"ts": 1666000000.0, "client": "127.0.0.1", "method": "GET", "path": "/foo?foo=bar",
+     "route": "/foo", "status": 200, "bytes": 52, "duration_ms": 0.41}
+
+    Args:
+        stream (TextIO, optional): where the JSON lines are written
+        sample_rate (float): fraction of successful requests logged, errors are always logged
+        batch_size (int): max number of records written with a single write
+        flush_interval (float): seconds waited for new records before checking the queue again
+
+    Returns:
+        BatchingQueueListener: the started listener, call stop() on exit to write all pending records
+    """
+    handler = BatchingStreamHandler(stream, batch_size)
+    handler.setFormatter(JsonAccessFormatter())
+    access_logger = logging.getLogger(ACCESS_LOGGER_NAME)
+    # access records are written only as JSON lines, not by the root handlers
+    access_logger.propagate = False
+    filters = [SuccessSamplingFilter(sample_rate)] if sample_rate < 1.0 else []
+    return attach_queue_listener(
+        access_logger,
+        handler,
+        batch_size=batch_size,
+        flush_interval=flush_interval,
+        filters=filters,
+    )
@@ -0,0 +1,244 @@
+import logging
+import multiprocessing
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from threading import Condition, Lock, Thread
+from time import monotonic
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+
+from .router.router import NamedSingletonMeta
+
+_LOGGER = logging.getLogger(__name__)
+
+# handlers registered as cpu bound, forked workers inherit this list so a call
+# only pickles the handler index, the params and the result
+_CPU_BOUND_HANDLERS = []  # type: List[Callable]
+_CAN_FORK = "fork" in multiprocessing.get_all_start_methods()
+
+
+class HandlerTimeoutError(Exception):
+    pass
+
+
+def _reset_signals() -> None:
+    """Executed in the worker process, forked workers inherit the handlers of the server"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+def _call_handler(handler: Union[int, Callable], params: dict) -> Any:
+    """Executed in the worker process"""
+    if isinstance(handler, int):
+        handler = _CPU_BOUND_HANDLERS[handler]
+    return handler(**params)
+
+
+class CpuBoundPool(metaclass=NamedSingletonMeta):
+    """
+    ProcessPoolExecutor running the handlers routed with cpu_bound=True, so they don't
+    hold the GIL of the process serving the requests.\n
+    The pool is started by configure, its workers are forked right away so they already
+    know every registered handler: configure it after routing the handlers and before
+    starting any thread (logging listeners, serve_forever), forking a process running
+    other threads can deadlock the children. Where fork is not available handlers are
+    pickled by reference, so they must be functions importable from their module.\n
+    A call that times out can't be interrupted: a new pool is forked by a background thread,
+    the calls keep going to the current pool meanwhile (after a broken pool they wait for the
+    new one), then the old pool is retired and its workers are killed as soon as no other
+    call is waiting on them. That new pool is forked while serving, handlers running in it
+    must not rely on locks held by the threads of the server (the logging module resets its own).
+    """
+
+    def __init__(
+        self,
+        *,
+        instance_name: str,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.instance_name = instance_name
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.__handler_indexes = {}  # type: Dict[Callable, int]
+        self.__executor = None  # type: Optional[ProcessPoolExecutor]
+        # calls waiting on each executor, retired executors are terminated once idle
+        self.__waiting = {}  # type: Dict[ProcessPoolExecutor, int]
+        self.__retired = set()  # type: Set[ProcessPoolExecutor]
+        self.__lock = Lock()
+        # notified when a new pool replaces the current one, or fails to
+        self.__replaced = Condition(self.__lock)
+        self.__replacing = False
+        self.__replacements = 0
+        self.__closed = False
+
+    def configure(
+        self, *, max_workers: Optional[int] = None, timeout: Optional[float] = None
+    ) -> None:
+        """
+        Start the pool, forking its workers
+
+        Args:
+            max_workers (int, optional): number of worker processes, defaults to os.cpu_count()
+            timeout (float, optional): seconds waited for a handler result, None waits forever
+        """
+        with self.__lock:
+            self.max_workers = max_workers
+            self.timeout = timeout
+            self.__closed = False
+            self.__restart()
+
+    def register(self, handler: Callable) -> None:
+        with self.__lock:
+            if handler in self.__handler_indexes:
+                return
+            self.__handler_indexes[handler] = len(_CPU_BOUND_HANDLERS)
+            _CPU_BOUND_HANDLERS.append(handler)
+            # workers forked before the registration don't know the new handler
+            if _CAN_FORK and self.__executor is not None:
+                self.__restart()
+
+    def run(self, handler: Callable, params: dict) -> Any:
+        """Call handler(**params) in a worker process
+
+        Raises:
+            HandlerTimeoutError: if the result is not available after timeout seconds
+        """
+        with self.__lock:
+            executor = self.__current_executor()
+            self.__waiting[executor] = self.__waiting.get(executor, 0) + 1
+        try:
+            future = executor.submit(
+                _call_handler, self.__handler_indexes[handler] if _CAN_FORK else handler, params
+            )
+            return future.result(self.timeout)
+        except FutureTimeoutError as e:
+            # a running call can't be interrupted, its worker would stay busy until it returns
+            if not future.cancel():
+                with self.__lock:
+                    self.__replace(executor)
+            raise HandlerTimeoutError(
+                "{} didn't return in {} seconds".format(
+                    getattr(handler, "__qualname__", handler), self.timeout
+                )
+            ) from e
+        except BrokenProcessPool:
+            with self.__lock:
+                # retired pools and pools shut down are broken on purpose
+                if executor is self.__executor:
+                    _LOGGER.exception("cpu bound worker died, restarting the pool")
+                    # nothing can be submitted to a broken pool, calls wait for the new one
+                    self.__executor = None
+                    self.__retire(executor)
+                    self.__replace(None)
+            raise
+        finally:
+            with self.__lock:
+                self.__waiting[executor] -= 1
+                if not self.__waiting[executor]:
+                    del self.__waiting[executor]
+                    if executor in self.__retired:
+                        self.__retired.discard(executor)
+                        _terminate(executor)
+
+    def shutdown(self, timeout: float = 0) -> None:
+        """Stop the pools, the workers still running a call after timeout seconds are terminated"""
+        with self.__lock:
+            executors = list(self.__retired)
+            if self.__executor is not None:
+                executors.append(self.__executor)
+            self.__executor = None
+            self.__retired.clear()
+            # a pool being forked is terminated as soon as it's ready
+            self.__closed = True
+        deadline = monotonic() + timeout
+        # shutdown forgets the workers
+        processes = [process for executor in executors for process in _processes(executor)]
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.join(max(deadline - monotonic(), 0))
+            if process.is_alive():
+                process.kill()
+
+    def __current_executor(self) -> ProcessPoolExecutor:
+        """Executor the next call is submitted to, waiting for the new pool if there's none
+        (called with the lock held)
+
+        Raises:
+            BrokenProcessPool: if the pool is shut down or the new pool couldn't be started
+        """
+        if self.__closed:
+            raise BrokenProcessPool("the cpu bound pool is shut down")
+        if self.__executor is None and not self.__replacing:
+            # configure was not called, or the last replacement failed
+            self.__replace(None)
+        while self.__executor is None:
+            replacements = self.__replacements
+            self.__replaced.wait()
+            if self.__executor is None and self.__replacements != replacements:
+                raise BrokenProcessPool("the cpu bound pool couldn't be started")
+        return self.__executor
+
+    def __replace(self, executor: Optional[ProcessPoolExecutor]) -> None:
+        """Fork a new pool in a background thread to replace executor, if it's the current
+        one (None if there is no current pool) and no replacement is being forked yet"""
+        if executor is not self.__executor or self.__replacing:
+            return
+        self.__replacing = True
+        Thread(target=self.__fork_replacement, name="CpuBoundPool-restart", daemon=True).start()
+
+    def __fork_replacement(self) -> None:
+        try:
+            executor = self.__new_executor()
+        except Exception:
+            _LOGGER.exception("cpu bound pool couldn't be restarted")
+            executor = None
+        with self.__lock:
+            self.__replacing = False
+            self.__replacements += 1
+            self.__replaced.notify_all()
+            if executor is None:
+                return
+            if self.__closed:
+                _terminate(executor)
+                return
+            if self.__executor is not None:
+                self.__retire(self.__executor)
+            self.__executor = executor
+
+    def __retire(self, executor: ProcessPoolExecutor) -> None:
+        """Terminate executor once no call is waiting on it"""
+        if self.__waiting.get(executor, 0):
+            self.__retired.add(executor)
+        else:
+            _terminate(executor)
+
+    def __restart(self) -> None:
+        """Replace the current executor with a new one, forking its workers in this thread"""
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False)
+        self.__executor = self.__new_executor()
+
+    def __new_executor(self) -> ProcessPoolExecutor:
+        executor = ProcessPoolExecutor(
+            self.max_workers,
+            mp_context=multiprocessing.get_context("fork") if _CAN_FORK else None,
+            initializer=_reset_signals,
+        )
+        # the fork context starts all the workers on the first submit
+        executor.submit(int).result()
+        return executor
+
+
+def _processes(executor: ProcessPoolExecutor) -> List[multiprocessing.Process]:
+    # ProcessPoolExecutor doesn't expose its workers, _processes is None once shut down
+    return list((getattr(executor, "_processes", None) or {}).values())
+
+
+def _terminate(executor: ProcessPoolExecutor) -> None:
+    """Kill the workers of executor, the calls still running raise BrokenProcessPool"""
+    for process in _processes(executor):
+        if process.is_alive():
+            process.kill()
+    executor.shutdown(wait=False, cancel_futures=True)
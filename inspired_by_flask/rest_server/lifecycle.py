@@ -0,0 +1,169 @@
+import logging
+import signal
+import socket
+import socketserver
+from http.server import ThreadingHTTPServer
+from threading import Condition, Thread
+from time import monotonic, sleep
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+LIVENESS_URL = "/livez"
+READINESS_URL = "/readyz"
+
+
+class GracefulHTTPServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer with a managed lifecycle, usage:\n
+
+        WebApp = GracefulHTTPServer(("0.0.0.0", 8000), RouteWebserver, drain_timeout=30)\n
+        WebApp.serve_until_shutdown()\n
+
+    On SIGTERM (or SIGINT) the server:\n
+        1. answers 503 on READINESS_URL, so the load balancer stops routing to it\n
+        2. waits readiness_grace seconds still accepting connections, long enough for the
+           load balancer to probe READINESS_URL at least once\n
+        3. stops accepting and closes the idle keep-alive connections\n
+        4. waits up to drain_timeout seconds for the in-flight requests, their connections
+           are closed once the response is sent\n
+        5. closes the connections still open and answers 503 on LIVENESS_URL\n
+    A second signal skips the remaining waits.
+    A connection is busy from the moment it's accepted and from the first byte of each
+    request (see request_started), it's idle only while waiting between two requests.
+    """
+
+    # threads still running after the drain deadline must not keep the process alive
+    daemon_threads = True
+    block_on_close = False
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        RequestHandlerClass: Any,
+        *,
+        drain_timeout: float = 30.0,
+        readiness_grace: float = 5.0,
+        bind_and_activate: bool = True,
+    ) -> None:
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+        self.drain_timeout = drain_timeout
+        self.readiness_grace = readiness_grace
+        self.ready = False
+        self.alive = True
+        self.draining = False
+        # open connections mapped to True if a request is in flight, False if idle
+        self._connections = {}  # type: Dict[socket.socket, bool]
+        self._connections_changed = Condition()
+        self._force_close = False
+        self._drain_thread = None  # type: Optional[Thread]
+
+    def process_request(self, request: socket.socket, client_address: Tuple[str, int]) -> None:
+        with self._connections_changed:
+            # its first request is on the way
+            self._connections[request] = True
+        super().process_request(request, client_address)
+
+    def shutdown_request(self, request: socket.socket) -> None:
+        with self._connections_changed:
+            self._connections.pop(request, None)
+            self._connections_changed.notify_all()
+        super().shutdown_request(request)
+
+    def request_started(self, request: socket.socket) -> None:
+        """Called by the request handler once the first byte of a request arrived on the
+        connection, before reading the request line"""
+        with self._connections_changed:
+            if request in self._connections:
+                self._connections[request] = True
+
+    def request_finished(self, request: socket.socket) -> None:
+        """Called by the request handler once the response was sent on the connection"""
+        with self._connections_changed:
+            if request in self._connections:
+                self._connections[request] = False
+
+    def serve_until_shutdown(
+        self,
+        poll_interval: float = 0.5,
+        signals: Iterable[signal.Signals] = (signal.SIGTERM, signal.SIGINT),
+    ) -> None:
+        """
+        serve_forever until one of signals is received, then drain the connections and return
+        """
+        for signum in signals:
+            signal.signal(signum, self._handle_signal)
+        self.ready = True
+        try:
+            self.serve_forever(poll_interval)
+        finally:
+            if self._drain_thread is not None:
+                self._drain_thread.join()
+            self.server_close()
+
+    def _handle_signal(self, signum: int, frame: Any) -> None:
+        # the handler runs in the thread blocked in serve_forever, shutdown() would deadlock
+        if self._drain_thread is None:
+            _LOGGER.info("received {}, draining connections".format(signal.Signals(signum).name))
+            self._drain_thread = Thread(target=self.drain, name="GracefulHTTPServer-drain")
+            self._drain_thread.start()
+        else:
+            _LOGGER.warning(
+                "received {} while draining, closing all connections".format(
+                    signal.Signals(signum).name
+                )
+            )
+            with self._connections_changed:
+                self._force_close = True
+                self._connections_changed.notify_all()
+
+    def drain(self) -> None:
+        """Stop serving following the steps described in the class __doc__"""
+        self.ready = False
+        grace_deadline = monotonic() + self.readiness_grace
+        while not self._force_close and monotonic() < grace_deadline:
+            sleep(min(0.1, self.readiness_grace))
+        self.draining = True
+        self.shutdown()
+        self.socket.close()
+
+        deadline = monotonic() + self.drain_timeout
+        with self._connections_changed:
+            # requests in flight will close their connection after answering,
+            # idle keep-alive connections are woken up from their blocking read
+            for connection, busy in self._connections.items():
+                if not busy:
+                    self._close_connection(connection)
+            while self._connections and not self._force_close:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    break
+                self._connections_changed.wait(remaining)
+            if self._connections:
+                _LOGGER.warning(
+                    "drain deadline reached, closing {} connections".format(len(self._connections))
+                )
+                for connection in self._connections:
+                    self._close_connection(connection)
+        self.alive = False
+        _LOGGER.info("server drained")
+
+    @staticmethod
+    def _close_connection(connection: socket.socket) -> None:
+        try:
+            connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            # connection already closed by the peer
+            pass
+
+
+def probe_status(server: socketserver.BaseServer, url: str) -> bool:
+    """
+    Status of the LIVENESS_URL or READINESS_URL probe for server,
+    servers without a managed lifecycle are always alive and ready
+    """
+    if not isinstance(server, GracefulHTTPServer):
+        return True
+    if url == READINESS_URL:
+        return server.ready
+    return server.alive
@@ -4,10 +4,21 @@ import socketserver
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler
 from os import environ
-from typing import Any, Callable, List, Tuple
+from time import perf_counter
+from typing import Any, Callable, List, Optional, Tuple
 from urllib.parse import parse_qs, urlparse, unquote
 
-from .router import HttpMethod, Route, RouteNotFoundError, Router
+from .access_log import ACCESS_LOGGER_NAME
+from .cpu_offload import CpuBoundPool, HandlerTimeoutError
+from .lifecycle import LIVENESS_URL, READINESS_URL, GracefulHTTPServer, probe_status
+from .router import (
+    HttpMethod,
+    RequestValidationError,
+    Route,
+    RouteNotFoundError,
+    Router,
+    SimpleRoute,
+)
 
 
 class BadRequestException(Exception):
@@ -15,6 +26,8 @@ class BadRequestException(Exception):
 
 
 _LOGGER = logging.getLogger(__name__)
+_ACCESS_LOGGER = logging.getLogger(ACCESS_LOGGER_NAME)
+_CPU_BOUND_POOL_NAME = "RouteWebserver_CpuBoundPool"
 _FAVICO_CONTENT = b""
 if "FAVICO_PATH" in environ:
     with open(environ.get("FAVICO_PATH"), "rb") as favicon_file:
@@ -25,6 +38,12 @@ else:
 
 
 class RouteWebserver(BaseHTTPRequestHandler):
+    # infos of the request being handled, used to write its access log record
+    _request_start = 0.0  # type: float
+    _response_status = None  # type: Optional[int]
+    _response_bytes = 0  # type: int
+    _route_url = None  # type: Optional[str]
+
     def __init__(
         self,
         request: bytes,
@@ -43,10 +62,67 @@ class RouteWebserver(BaseHTTPRequestHandler):
         )
 
     def log_message(self, format: str, *args) -> None:
-        _LOGGER.info("%s - - %s\n" % (self.address_string(), format % args))
+        # args are merged lazily, by the thread writing the record
+        if _LOGGER.isEnabledFor(logging.INFO):
+            _LOGGER.info("%s - - " + format, self.address_string(), *args)
 
     def log_error(self, format: str, *args) -> None:
-        _LOGGER.error("%s - -%s\n" % (self.address_string(), format % args))
+        if _LOGGER.isEnabledFor(logging.ERROR):
+            _LOGGER.error("%s - - " + format, self.address_string(), *args)
+
+    def log_request(self, code="-", size="-") -> None:
+        """Requests are logged by __log_access once handled, see access_log.start_access_log"""
+        pass
+
+    def __log_access(self) -> None:
+        if not _ACCESS_LOGGER.isEnabledFor(logging.INFO):
+            return
+        access = {
+            "client": self.client_address[0],
+            "method": self.command,
+            # path is not set if the request line couldn't be parsed
+            "path": getattr(self, "path", None),
+            "route": self._route_url,
+            "status": self._response_status,
+            "bytes": self._response_bytes,
+            "duration_ms": round((perf_counter() - self._request_start) * 1000, 3),
+        }
+        _ACCESS_LOGGER.info(
+            '%s "%s %s" %s %s',
+            access["client"],
+            access["method"],
+            access["path"],
+            access["status"],
+            access["bytes"],
+            extra={"access": access},
+        )
+
+    def parse_request(self) -> bool:
+        # the request line was just read, idle time of keep-alive connections is not counted
+        self._request_start = perf_counter()
+        return super().parse_request()
+
+    def handle_one_request(self) -> None:
+        self._request_start = perf_counter()
+        self._response_status = None
+        self._response_bytes = 0
+        self._route_url = None
+        if isinstance(self.server, GracefulHTTPServer):
+            # idle until the next request arrives (or the connection is closed), then busy
+            # before its request line is read: a draining server never closes it midway
+            self.rfile.peek(1)
+            self.server.request_started(self.request)
+        super().handle_one_request()
+        if self._response_status is not None:
+            self.__log_access()
+        if isinstance(self.server, GracefulHTTPServer):
+            self.server.request_finished(self.request)
+            if self.server.draining:
+                self.close_connection = True
+
+    def send_response(self, code: int, message: Optional[str] = None) -> None:
+        self._response_status = int(code)
+        super().send_response(code, message)
 
     @classmethod
     def route(
@@ -54,6 +130,7 @@ class RouteWebserver(BaseHTTPRequestHandler):
         url: str,
         methods: List["HttpMethod"] = [HttpMethod.GET],
         default_params: dict[str, Any] = {},
+        cpu_bound: bool = False,
     ) -> Route:
         """
         Classmethod decorator to route an url to a function.\n
@@ -75,10 +152,20 @@ class RouteWebserver(BaseHTTPRequestHandler):
 
         To communicate wrong infos passed raise BadRequestException, returning 501 BAD_REQUEST.
         Other exceptions will return 500 INTERNAL_SERVER_ERROR
+
+        Params are validated against the function signature before the call: missing
+        required params, unexpected params (without **kwargs) and params not matching
+        their int, float, str, bool, dict or list annotation return 400 BAD_REQUEST
+        with the field level errors.
+
+        Functions doing heavy CPU work should be routed with cpu_bound=True, they will be
+        executed in the worker processes of the pool set with configure_cpu_bound_pool.
+        Only the params and the returned value are pickled. If the result isn't
+        available after the configured timeout 504 GATEWAY_TIMEOUT is returned.
         """
 
         def decorator(func):
-            return cls.route_method(func, url, methods, default_params)
+            return cls.route_method(func, url, methods, default_params, cpu_bound)
 
         return decorator
 
@@ -87,6 +174,7 @@ class RouteWebserver(BaseHTTPRequestHandler):
         cls,
         url: str,
         default_params: dict[str, Any] = {},
+        cpu_bound: bool = False,
     ) -> Route:
         """
         Classmethod decorator to route an POST request of an url to a function.\n
@@ -100,7 +188,7 @@ class RouteWebserver(BaseHTTPRequestHandler):
         """
 
         def decorator(func):
-            return cls.route_method(func, url, [HttpMethod.POST], default_params)
+            return cls.route_method(func, url, [HttpMethod.POST], default_params, cpu_bound)
 
         return decorator
 
@@ -109,6 +197,7 @@ class RouteWebserver(BaseHTTPRequestHandler):
         cls,
         url: str,
         default_params: dict[str, Any] = {},
+        cpu_bound: bool = False,
     ) -> Route:
         """
         Classmethod decorator to route an GET request of an url to a function.\n
@@ -124,7 +213,7 @@ class RouteWebserver(BaseHTTPRequestHandler):
         """
 
         def decorator(func):
-            return cls.route_method(func, url, [HttpMethod.GET], default_params)
+            return cls.route_method(func, url, [HttpMethod.GET], default_params, cpu_bound)
 
         return decorator
 
@@ -135,6 +224,7 @@ class RouteWebserver(BaseHTTPRequestHandler):
         url: str,
         methods: List["HttpMethod"] = [HttpMethod.GET],
         default_params: dict[str, Any] = {},
+        cpu_bound: bool = False,
     ) -> Route:
         """
         Classmethod to route an url to a method of a class.\n
@@ -172,47 +262,109 @@ class RouteWebserver(BaseHTTPRequestHandler):
         To communicate wrong infos passed raise BadRequestException, returning 501 BAD_REQUEST.
         Other exceptions will return 500 INTERNAL_SERVER_ERROR
         """
-        return Router(instance_name="RouteWebserver_Router").add_route(
-            url, func, methods, default_params
+        route = Router(instance_name="RouteWebserver_Router").add_route(
+            url, func, methods, default_params, cpu_bound
+        )
+        if isinstance(route, SimpleRoute) and route.cpu_bound:
+            CpuBoundPool(instance_name=_CPU_BOUND_POOL_NAME).register(route.handler)
+        return route
+
+    @classmethod
+    def configure_cpu_bound_pool(
+        cls, *, max_workers: Optional[int] = None, timeout: Optional[float] = None
+    ) -> None:
+        """
+        Classmethod to configure the process pool executing the cpu_bound routes, its workers
+        are forked: call it after routing the handlers, before starting any thread.
+
+        Args:
+            max_workers (int, optional): number of worker processes, defaults to os.cpu_count()
+            timeout (float, optional): seconds waited for a handler result before returning
+                504 GATEWAY_TIMEOUT, None waits forever
+        """
+        CpuBoundPool(instance_name=_CPU_BOUND_POOL_NAME).configure(
+            max_workers=max_workers, timeout=timeout
         )
 
-    def __send_headers(self, http_code: HTTPStatus = HTTPStatus.OK):
+    @classmethod
+    def shutdown_cpu_bound_pool(cls, timeout: float = 0) -> None:
+        """Classmethod to stop the worker processes, call it on exit
+
+        Args:
+            timeout (float): seconds given to the running handlers before terminating their workers
+        """
+        CpuBoundPool(instance_name=_CPU_BOUND_POOL_NAME).shutdown(timeout)
+
+    def __call_handler(self, route: Route, handler: Callable, params: dict) -> Any:
+        if route.cpu_bound:
+            return CpuBoundPool(instance_name=_CPU_BOUND_POOL_NAME).run(handler, params)
+        return handler(**params)
+
+    def __send_connection_header(self):
+        # while the server drains, connections are closed after the response
+        if isinstance(self.server, GracefulHTTPServer) and self.server.draining:
+            self.send_header("Connection", "close")
+
+    def __send_headers(self, http_code: HTTPStatus = HTTPStatus.OK, content_length: int = 0):
         self.send_response(http_code.value)
         self.send_header("Content-type", "application/json")
+        self.send_header("Content-Length", str(content_length))
         self.send_header("Access-Control-Allow-Methods", "POST, GET")
+        self.__send_connection_header()
         self.end_headers()
 
     def __send_json_response(
         self, response: dict, http_code: HTTPStatus = HTTPStatus.OK
     ):
-        self.__send_headers(http_code)
-        self.wfile.write(json.dumps(response, ensure_ascii=False).encode())
+        body = json.dumps(response, ensure_ascii=False).encode()
+        self.__send_headers(http_code, len(body))
+        self.wfile.write(body)
+        self._response_bytes = len(body)
 
     def __send_favicon(self):
         self.send_response(200)
         self.send_header("Content-type", "image/x-icon")
+        self.send_header("Content-Length", str(len(_FAVICO_CONTENT)))
         self.send_header("Access-Control-Allow-Origin", "*")
+        self.__send_connection_header()
         self.end_headers()
         self.wfile.write(_FAVICO_CONTENT)
+        self._response_bytes = len(_FAVICO_CONTENT)
+
+    def __send_probe(self, url: str):
+        """Answer the liveness and readiness probes of the load balancer"""
+        if probe_status(self.server, url):
+            self.__send_json_response({"status": "ok"})
+        else:
+            self.__send_json_response({"status": "unavailable"}, HTTPStatus.SERVICE_UNAVAILABLE)
 
     def do_GET(self):
         url = self.path
         if url == "/favicon.ico":
             return self.__send_favicon()
+        if url in (LIVENESS_URL, READINESS_URL):
+            return self.__send_probe(url)
         parsed_url = urlparse(unquote(url))
         url = parsed_url.path
         get_params = parse_qs(parsed_url.query)
         get_params["HttpMethod_type"] = HttpMethod.GET
         try:
-            handler, params = Router(instance_name="RouteWebserver_Router").get_handler(
+            route, handler, params = Router(instance_name="RouteWebserver_Router").match(
                 url, HttpMethod.GET
             )
         except RouteNotFoundError:
             return self.__default_func(**get_params)
+        self._route_url = route.url
 
         try:
-            params = {**get_params, **params}
-            self.__send_json_response(handler(**params))
+            params = route.validate_params({**get_params, **params})
+            self.__send_json_response(self.__call_handler(route, handler, params))
+        except RequestValidationError as e:
+            self.__send_json_response(
+                {"error": str(e), "fields": e.errors}, HTTPStatus.BAD_REQUEST
+            )
+        except HandlerTimeoutError as e:
+            self.__send_json_response({"error": str(e)}, HTTPStatus.GATEWAY_TIMEOUT)
         except BadRequestException as e:
             self.__send_json_response({"error": str(e)}, HTTPStatus.BAD_REQUEST)
         except Exception as e:
@@ -236,15 +388,22 @@ class RouteWebserver(BaseHTTPRequestHandler):
             post_params = {}
         post_params["HttpMethod_type"] = HttpMethod.POST
         try:
-            handler, params = Router(instance_name="RouteWebserver_Router").get_handler(
+            route, handler, params = Router(instance_name="RouteWebserver_Router").match(
                 url, HttpMethod.POST
             )
         except RouteNotFoundError:
             return self.__default_func(**post_params)
+        self._route_url = route.url
 
         try:
-            params = {**post_params, **params}
-            self.__send_json_response(handler(**params))
+            params = route.validate_params({**post_params, **params})
+            self.__send_json_response(self.__call_handler(route, handler, params))
+        except RequestValidationError as e:
+            self.__send_json_response(
+                {"error": str(e), "fields": e.errors}, HTTPStatus.BAD_REQUEST
+            )
+        except HandlerTimeoutError as e:
+            self.__send_json_response({"error": str(e)}, HTTPStatus.GATEWAY_TIMEOUT)
         except BadRequestException as e:
             self.__send_json_response({"error": str(e)}, HTTPStatus.BAD_REQUEST)
         except Exception as e:
@@ -1,4 +1,5 @@
 from .router import Router
 from .routing_logics.http_method import HttpMethod
-from .routing_logics.routes import Route
+from .routing_logics.routes import Route, SimpleRoute
 from .routing_logics.route_logic import RouteNotFoundError
+from .routing_logics.validation import RequestValidationError
@@ -42,8 +42,19 @@ class Router(metaclass=NamedSingletonMeta):
         get handler for specified __url and method
         if return is Callable,None, the default_handler is returned
         """
+        _, handler, params = self.match(__url, method)
+        return handler, params
+
+    def match(
+        self, __url: str, method: "HttpMethod"
+    ) -> Tuple["Route", Callable, Optional[dict]]:
+        """
+        same as get_handler, but the matched Route is returned too
+        """
         __url_list = url_split(__url)
-        return self.routes.get_route(__url_list, method).parse_url(__url_list)
+        route = self.routes.get_route(__url_list, method)
+        handler, params = route.parse_url(__url_list)
+        return route, handler, params
 
     def add_route(
         self,
@@ -51,7 +62,12 @@ class Router(metaclass=NamedSingletonMeta):
         handler: Union[Callable, "Route"],
         accepted_methods: List["HttpMethod"] = [HttpMethod.GET],
         default_params: dict[str, Any] = {},
+        cpu_bound: bool = False,
     ) -> "Route":
+        """
+        map url to handler for the accepted_methods, if handler is a SimpleRoute a NestedRoute
+        is created using default_params for the missing url params (cpu_bound is inherited)
+        """
 
         new_route = None
         if isinstance(handler, SimpleRoute):
@@ -63,7 +79,7 @@ class Router(metaclass=NamedSingletonMeta):
                 )
             new_route = NestedRoute(url, handler, set(accepted_methods), default_params)
         elif isinstance(handler, Callable):
-            new_route = SimpleRoute(url, handler, set(accepted_methods))
+            new_route = SimpleRoute(url, handler, set(accepted_methods), cpu_bound)
         else:
             raise ValueError(
                 "routing not implemented for handler of type {}".format(type(handler))
@@ -5,6 +5,7 @@ from re import compile
 from typing import Any, List, Callable, Generic, Iterator, TypeVar, Tuple
 
 from .http_method import HttpMethod
+from .validation import Validator, compile_validator
 
 _URL_PARAMS_FINDER = compile(r"(\<.+?\>)")
 _URL_PARAMS_TYPE_FINDER = compile(r"\<((?P<type>.+):)?(?P<name>.+){1}\>")
@@ -125,8 +126,11 @@ def from_url_get_required_params_names(url_format: List[str]) -> Iterator[str]:
 
 
 class Route(ABC):
+    url = ""  # type: str
     mapped_url = []  # type:List[str]
     accepted_methods = []  # type: set["HttpMethod"]
+    # the handler is executed in a worker process, see rest_server.cpu_offload
+    cpu_bound = False  # type: bool
 
     @abstractmethod
     def __init__(self) -> None:
@@ -157,9 +161,19 @@ class Route(ABC):
     def parse_url(self, url: List[str]) -> Tuple[Callable, dict]:
         raise NotImplementedError()
 
+    @abstractmethod
+    def validate_params(self, params: dict) -> dict:
+        """Check and convert the request params following the handler signature
+
+        Raises:
+            RequestValidationError: if params don't match the handler signature
+        """
+        raise NotImplementedError()
+
 
 class SimpleRoute(Route):
     handler = print  # type: Callable
+    validator = None  # type: Validator | None
     __reqired_url_params = {}  # type: dict[str, "UrlParamFormatter"]
 
     def __init__(
@@ -167,11 +181,15 @@ class SimpleRoute(Route):
         url: str,
         handler: Callable,
         accepted_methods: set["HttpMethod"],
+        cpu_bound: bool = False,
     ) -> None:
+        self.url = url
         self.mapped_url = url_split(url)
         self.accepted_methods = accepted_methods
+        self.cpu_bound = cpu_bound
         self.__reqired_url_params = from_url_get_required_params(url)
         self.handler = handler
+        self.validator = compile_validator(handler)
         update_wrapper(wrapper=self, wrapped=self.handler)
 
     @property
@@ -196,6 +214,11 @@ class SimpleRoute(Route):
             },
         )
 
+    def validate_params(self, params: dict) -> dict:
+        if self.validator is None:
+            return params
+        return self.validator(params)
+
     def __call__(self, *args, **kwargs) -> Any:
         return self.handler(*args, **kwargs)
 
@@ -211,11 +234,13 @@ class NestedRoute(Route):
         accepted_methods: set["HttpMethod"],
         default_url_params: dict[str, Any],
     ) -> None:
+        self.url = url
         self.mapped_url = url_split(url)
         self.accepted_methods = accepted_methods
         # extract url params names in order so we can append in the url
         # the default values in the correct order
         self.mapped_route = mapped_route
+        self.cpu_bound = mapped_route.cpu_bound
         self.__default_url_params_str = [
             str(default_url_params[param_name])
             for param_name in from_url_get_required_params_names(
@@ -235,5 +260,8 @@ class NestedRoute(Route):
     def parse_url(self, url: List[str]) -> Tuple[Callable, dict]:
         return self.mapped_route.parse_url(url + self.__default_url_params_str)
 
+    def validate_params(self, params: dict) -> dict:
+        return self.mapped_route.validate_params(params)
+
     def __call__(self, *args, **kwargs) -> Any:
         return self.mapped_route(*args, **kwargs)
@@ -0,0 +1,235 @@
+import inspect
+from types import NoneType, UnionType
+from typing import Any, Callable, Dict, List, Optional, Union, get_args, get_origin, get_type_hints
+
+# parameter injected by RouteWebserver in every request, never validated
+_INJECTED_PARAMS = frozenset(["HttpMethod_type"])
+_MISSING_FIELD = "missing required field"
+_UNEXPECTED_FIELD = "unexpected field"
+
+Validator = Callable[[dict], dict]
+
+
+class RequestValidationError(ValueError):
+    """Raised when request params don't match the handler signature, errors maps field -> reason"""
+
+    def __init__(self, errors: Dict[str, str]) -> None:
+        super().__init__("request validation failed for fields: {}".format(", ".join(errors)))
+        self.errors = errors
+
+
+def _unwrap_query_value(value: Any) -> Any:
+    """url query params are parsed as lists, a single value is expected for scalar fields"""
+    if value.__class__ is list and len(value) == 1:
+        return value[0]
+    return value
+
+
+def _to_int(value: Any) -> int:
+    value = _unwrap_query_value(value)
+    if value.__class__ is int:
+        return value
+    if value.__class__ is str:
+        return int(value)
+    raise TypeError()
+
+
+def _to_float(value: Any) -> float:
+    value = _unwrap_query_value(value)
+    if value.__class__ is float:
+        return value
+    if value.__class__ in (int, str):
+        return float(value)
+    raise TypeError()
+
+
+def _to_str(value: Any) -> str:
+    value = _unwrap_query_value(value)
+    if value.__class__ is str:
+        return value
+    raise TypeError()
+
+
+_BOOL_STRINGS = {"true": True, "1": True, "false": False, "0": False}
+
+
+def _to_bool(value: Any) -> bool:
+    value = _unwrap_query_value(value)
+    if value.__class__ is bool:
+        return value
+    if value.__class__ is str:
+        return _BOOL_STRINGS[value.lower()]
+    raise TypeError()
+
+
+def _to_dict(value: Any) -> dict:
+    if value.__class__ is dict:
+        return value
+    raise TypeError()
+
+
+def _list_converter(item_converter: Optional[Callable[[Any], Any]]) -> Callable[[Any], list]:
+    def _to_list(value: Any) -> list:
+        if value.__class__ is not list:
+            raise TypeError()
+        if item_converter is None:
+            return value
+        return [item_converter(item) for item in value]
+
+    return _to_list
+
+
+def _optional_converter(converter: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    def _to_optional(value: Any) -> Any:
+        if value is None:
+            return None
+        return converter(value)
+
+    return _to_optional
+
+
+_SCALAR_CONVERTERS = {
+    int: _to_int,
+    float: _to_float,
+    str: _to_str,
+    bool: _to_bool,
+    dict: _to_dict,
+}
+
+
+def _converter_for(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """Converter for the annotation, None if values of this type are not checked"""
+    if annotation in _SCALAR_CONVERTERS:
+        return _SCALAR_CONVERTERS[annotation]
+    if annotation is list:
+        return _list_converter(None)
+    origin = get_origin(annotation)
+    if origin in (list, List):
+        args = get_args(annotation)
+        return _list_converter(_converter_for(args[0]) if args else None)
+    if origin in (Union, UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not NoneType]
+        if len(args) == 1 and len(args) != len(get_args(annotation)):
+            converter = _converter_for(args[0])
+            return _optional_converter(converter) if converter is not None else None
+    return None
+
+
+def _type_name(annotation: Any) -> str:
+    return getattr(annotation, "__name__", None) or str(annotation)
+
+
+def _resolve_annotations(handler: Callable) -> Dict[str, Any]:
+    try:
+        return get_type_hints(handler)
+    except Exception:
+        # forward references that can't be resolved are not validated
+        return {
+            name: annotation
+            for name, annotation in getattr(handler, "__annotations__", {}).items()
+            if not isinstance(annotation, str)
+        }
+
+
+def compile_validator(handler: Callable) -> Optional[Validator]:
+    """
+    Generate, once at route registration, a function validating the params of a request
+    to be passed to handler, following its signature:\n
+        - parameters without default are required\n
+        - unknown params are rejected if handler has no **kwargs\n
+        - params annotated int, float, str, bool, dict, list[...] or Optional[...]
+          are checked and converted (url query values are unwrapped from their list)\n
+
+    The generated function contains one specialized block per parameter, so no signature
+    inspection or type dispatching is done per request.
+    RequestValidationError is raised with all the field level errors.
+
+    Args:
+        handler (Callable): function routed to an url
+
+    Returns:
+        Optional[Validator]: the validator, None if there is nothing to validate
+    """
+    try:
+        signature = inspect.signature(handler)
+    except (TypeError, ValueError):
+        return None
+    annotations = _resolve_annotations(handler)
+
+    accepts_any_param = False
+    accepted_names = set(_INJECTED_PARAMS)
+    namespace = {
+        "RequestValidationError": RequestValidationError,
+        "_MISSING_FIELD": _MISSING_FIELD,
+        "_UNEXPECTED_FIELD": _UNEXPECTED_FIELD,
+    }
+    lines = ["def validate(params):", "    errors = {}"]
+    for index, parameter in enumerate(signature.parameters.values()):
+        if parameter.kind == parameter.VAR_KEYWORD:
+            accepts_any_param = True
+            continue
+        if parameter.kind not in (parameter.KEYWORD_ONLY, parameter.POSITIONAL_OR_KEYWORD):
+            continue
+        name = parameter.name
+        accepted_names.add(name)
+        if name in _INJECTED_PARAMS:
+            continue
+        annotation = annotations.get(name, parameter.annotation)
+        converter = _converter_for(annotation)
+        required = parameter.default is parameter.empty
+        if converter is None and not required:
+            continue
+
+        if required:
+            lines += [
+                "    try:",
+                "        value = params[{!r}]".format(name),
+                "    except KeyError:",
+                "        errors[{!r}] = _MISSING_FIELD".format(name),
+            ]
+            if converter is None:
+                continue
+            lines.append("    else:")
+        else:
+            lines += [
+                "    value = params.get({!r}, _MISSING)".format(name),
+                "    if value is not _MISSING:",
+            ]
+            namespace["_MISSING"] = inspect.Parameter.empty
+
+        converter_name = "_convert_{}".format(index)
+        namespace[converter_name] = converter
+        fast_type = annotation if annotation in _SCALAR_CONVERTERS else None
+        indent = "        "
+        if fast_type is not None:
+            # values already of the annotated type skip the converter call
+            type_name = "_type_{}".format(index)
+            namespace[type_name] = fast_type
+            lines.append("        if value.__class__ is not {}:".format(type_name))
+            indent += "    "
+        lines += [
+            indent + "try:",
+            indent + "    params[{!r}] = {}(value)".format(name, converter_name),
+            indent + "except (KeyError, TypeError, ValueError):",
+            indent + "    errors[{!r}] = {!r}".format(name, "expected " + _type_name(annotation)),
+        ]
+
+    if not accepts_any_param:
+        namespace["_ACCEPTED_NAMES"] = frozenset(accepted_names)
+        lines += [
+            "    for name in params.keys() - _ACCEPTED_NAMES:",
+            "        errors[name] = _UNEXPECTED_FIELD",
+        ]
+    if len(lines) == 2:
+        return None
+    lines += [
+        "    if errors:",
+        "        raise RequestValidationError(errors)",
+        "    return params",
+    ]
+    exec("\n".join(lines), namespace)
+    validator = namespace["validate"]
+    validator.__qualname__ = "validate_{}".format(getattr(handler, "__qualname__", "handler"))
+    validator.__source__ = "\n".join(lines)
+    return validator
+